@@ -1,18 +1,26 @@
 """
 FK94 Security Platform - API Routes
 """
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from datetime import datetime, timezone
+import asyncio
+import hmac
+import json
+import os
 import uuid
-import io
+from typing import Literal, Optional
 import logging
+from pydantic import BaseModel
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 logger = logging.getLogger(__name__)
 limiter = Limiter(key_func=get_remote_address)
 
+ARCHIVE_POLL_SECONDS = 0.5
+ARCHIVE_CHUNK_BYTES = 64 * 1024
+
 
 def _safe_error(e: Exception, context: str = "operation") -> HTTPException:
     """Return user-friendly error without leaking internals."""
@@ -30,21 +38,31 @@ def _safe_error(e: Exception, context: str = "operation") -> HTTPException:
 from app.models.schemas import (
     EmailCheckRequest, PasswordCheckRequest, FullAuditRequest, AIAnalysisRequest,
     UsernameCheckRequest, PhoneCheckRequest, DomainCheckRequest,
-    NameCheckRequest, IPCheckRequest, WalletCheckRequest, MultiAuditRequest, AuditType,
-    BreachCheckResult, PasswordExposure, AuditResult, AIResponse, SecurityScore,
+    NameCheckRequest, IPCheckRequest, WalletCheckRequest, WalletBatchRequest, MultiAuditRequest, AuditType,
+    BreachCheckResult, PasswordExposure, AuditResult, AIResponse, AIAnalysisInfo, SecurityScore,
     UsernameResult, PhoneResult, DomainResult, NameResult, IPResult, WalletResult,
-    FullAuditJobRequest, MultiAuditJobRequest, JobCreateResponse, JobInfo, JobStatus,
+    FullAuditJobRequest, MultiAuditJobRequest, WalletBatchJobRequest, BatchReportJobRequest,
+    UsageSyncJobRequest, PhoneBatchJobRequest,
+    JobCreateResponse, JobInfo, JobItemsPage, JobStatus,
     ContactLeadRequest, LeadCreateResponse, EventTrackRequest, EventTrackResponse
 )
 from app.core.config import settings
+from app.core.diagnostics import loop_watchdog
 from app.services.osint_service import osint_service
 from app.services.deepseek_service import deepseek_service
+from app.services.ai_cache import ai_cache
 from app.services.scoring_service import scoring_service
-from app.services.pdf_service import pdf_service
+from app.services.pdf_renderer import RenderQueueFull
+from app.services.report_store import report_store
+from app.services.batch_reports import archive_path as batch_archive_path
 from app.services.audit_runner import run_full_audit, run_multi_audit
 from app.services import job_store
+from app.services.job_worker import job_worker
+from app.services.job_events import TERMINAL_STATUSES, job_event, job_events
 from app.services import event_store
 from app.services.email_service import email_service
+from app.services.wallet_batch import dedupe_addresses, screen_wallets
+from app.services.phone_batch import parse_csv_numbers
 from app.services.multi_audit_service import (
     check_username, check_phone, check_domain, check_name, check_ip, check_wallet
 )
@@ -53,6 +71,14 @@ from app.services.multi_audit_service import (
 router = APIRouter()
 
 
+def _require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Admin and bulk endpoints need X-Admin-Key == ADMIN_API_KEY; they 404 while no key is set."""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+
 # === QUICK CHECKS ===
 
 @router.post("/check/email", response_model=BreachCheckResult)
@@ -134,12 +160,36 @@ async def check_wallet_endpoint(request: Request, payload: WalletCheckRequest):
     Check crypto wallet for identity linking and sanctions.
     """
     try:
-        result = await check_wallet(payload.address, payload.chain)
+        result = await check_wallet(payload.address, payload.chain, payload.chains)
         return result
     except Exception as e:
         raise _safe_error(e, "wallet check")
 
 
+@router.post("/check/wallet/batch", dependencies=[Depends(_require_admin)])
+@limiter.limit("5/minute")
+async def check_wallet_batch(request: Request, payload: WalletBatchRequest):
+    """
+    Screen many wallets at once. Duplicates are dropped and results are
+    streamed as NDJSON (one WalletBatchItem per line) as each scan finishes.
+    Needs the admin key and takes up to WALLET_BATCH_SYNC_MAX unique
+    addresses; larger lists go through POST /automation/wallet/batch.
+    """
+    unique = len(dedupe_addresses(payload.addresses))
+    if unique > settings.WALLET_BATCH_SYNC_MAX:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.WALLET_BATCH_SYNC_MAX} addresses per request; "
+                   f"enqueue larger lists with /automation/wallet/batch",
+        )
+
+    async def item_lines():
+        async for item in screen_wallets(payload.addresses, payload.chain, payload.chains):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(item_lines(), media_type="application/x-ndjson")
+
+
 @router.post("/check/password", response_model=PasswordExposure)
 async def check_password_exposure(request: Request, payload: PasswordCheckRequest):
     """
@@ -180,19 +230,83 @@ async def run_multi_audit_endpoint(request: Request, payload: MultiAuditRequest)
         raise _safe_error(e, "multi audit")
 
 
+def _job_status(job_id: str) -> Optional[dict]:
+    """Job row without payload or result: cheap enough for every poll and event."""
+    return job_store.get_job(settings.JOB_DB_PATH, job_id, include_result=False, include_payload=False)
+
+
+def _ai_analysis_info(job_id: str) -> AIAnalysisInfo:
+    job = _job_status(job_id)
+    if not job or job["job_type"] != "ai_analysis":
+        raise HTTPException(status_code=404, detail="AI analysis not found")
+    result = None
+    if job["status"] == JobStatus.COMPLETED.value:
+        result = job_store.get_job_result(settings.JOB_DB_PATH, job_id, fields=("ai_analysis",))
+    return AIAnalysisInfo(
+        job_id=job["id"],
+        status=JobStatus(job["status"]),
+        ai_analysis=(result or {}).get("ai_analysis"),
+        error=job["error"],
+    )
+
+
+@router.get("/audit/ai/{job_id}", response_model=AIAnalysisInfo)
+async def get_ai_analysis(job_id: str):
+    """Get a deferred AI analysis (see `defer_ai` on audit requests)."""
+    return _ai_analysis_info(job_id)
+
+
+@router.get("/audit/ai/{job_id}/stream")
+async def stream_ai_analysis(request: Request, job_id: str):
+    """
+    Server-Sent Events stream for a deferred AI analysis: one `status` event
+    per state change, ending with the completed or failed result. Driven by
+    JobWorker events, with a status re-read at every keep-alive.
+    """
+    _ai_analysis_info(job_id)  # 404 before the stream starts
+
+    async def events():
+        with job_events.subscribe(job_id) as queue:
+            current = _ai_analysis_info(job_id)  # re-read once subscribed so no transition is missed
+            last_status = None
+            while True:
+                if current.status != last_status:
+                    last_status = current.status
+                    yield f"event: status\ndata: {current.model_dump_json()}\n\n"
+                if current.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+                    return
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=settings.JOB_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                current = _ai_analysis_info(job_id)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def _enqueue_job(job_type: str, request: BaseModel) -> JobCreateResponse:
+    """Queue a job from its *JobRequest; run_at and callback_url go on the job, not in the payload."""
+    payload = request.model_dump()
+    run_at = payload.pop("run_at", None)
+    callback_url = payload.pop("callback_url", None)
+    job = job_store.create_job(
+        db_path=settings.JOB_DB_PATH,
+        job_type=job_type,
+        payload=payload,
+        run_at=run_at,
+        callback_url=callback_url,
+    )
+    job_worker.wake()
+    return JobCreateResponse(job_id=job["id"], status=JobStatus.QUEUED, job_type=job_type)
+
+
 @router.post("/automation/audit/full", response_model=JobCreateResponse)
 async def enqueue_full_audit(request: FullAuditJobRequest):
     """Enqueue a full audit to run asynchronously."""
     try:
-        payload = request.model_dump()
-        run_at = payload.pop("run_at", None)
-        job = job_store.create_job(
-            db_path=settings.JOB_DB_PATH,
-            job_type="full_audit",
-            payload=payload,
-            run_at=run_at,
-        )
-        return JobCreateResponse(job_id=job["id"], status=JobStatus.QUEUED, job_type="full_audit")
+        return _enqueue_job("full_audit", request)
     except Exception as e:
         raise _safe_error(e, "job enqueue")
 
@@ -201,23 +315,165 @@ async def enqueue_full_audit(request: FullAuditJobRequest):
 async def enqueue_multi_audit(request: MultiAuditJobRequest):
     """Enqueue a multi audit to run asynchronously."""
     try:
-        payload = request.model_dump()
-        run_at = payload.pop("run_at", None)
-        job = job_store.create_job(
-            db_path=settings.JOB_DB_PATH,
-            job_type="multi_audit",
-            payload=payload,
-            run_at=run_at,
-        )
-        return JobCreateResponse(job_id=job["id"], status=JobStatus.QUEUED, job_type="multi_audit")
+        return _enqueue_job("multi_audit", request)
+    except Exception as e:
+        raise _safe_error(e, "job enqueue")
+
+
+@router.post("/automation/wallet/batch", response_model=JobCreateResponse)
+async def enqueue_wallet_batch(request: WalletBatchJobRequest):
+    """Enqueue a batch wallet screening to run asynchronously."""
+    try:
+        return _enqueue_job("wallet_batch", request)
+    except Exception as e:
+        raise _safe_error(e, "job enqueue")
+
+
+@router.post("/automation/report/batch", response_model=JobCreateResponse)
+async def enqueue_batch_report(request: BatchReportJobRequest):
+    """
+    Enqueue PDF reports for many emails and/or completed audit jobs, bundled
+    into one ZIP. Download it from /automation/jobs/{job_id}/archive.
+    """
+    try:
+        return _enqueue_job("batch_report", request)
+    except Exception as e:
+        raise _safe_error(e, "job enqueue")
+
+
+@router.post("/automation/phone/batch", response_model=JobCreateResponse)
+async def enqueue_phone_batch(
+    request: Request,
+    country_code: str = "AR",
+    run_at: Optional[datetime] = None,
+    callback_url: Optional[str] = None,
+):
+    """
+    Enqueue screening of a phone list. Send a PhoneBatchJobRequest as JSON, or
+    a CSV file (Content-Type: text/csv) with a phone/telefono/number column or
+    the numbers in the first column; CSV uploads take country_code, run_at and
+    callback_url from the query string. Page results from /automation/jobs/{job_id}/items.
+    """
+    try:
+        body = await request.body()
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith(("text/csv", "text/plain")):
+            phones = parse_csv_numbers(body.decode("utf-8-sig", errors="replace"))
+            batch = PhoneBatchJobRequest(
+                phones=phones, country_code=country_code, run_at=run_at, callback_url=callback_url
+            )
+        else:
+            batch = PhoneBatchJobRequest.model_validate_json(body)
+        return _enqueue_job("phone_batch", batch)
+    except Exception as e:
+        raise _safe_error(e, "job enqueue")
+
+
+@router.post("/automation/usage/sync", response_model=JobCreateResponse)
+async def enqueue_usage_sync(request: UsageSyncJobRequest):
+    """Enqueue a push of user events into Supabase api_usage, resuming from the last sync."""
+    try:
+        return _enqueue_job("usage_sync", request)
     except Exception as e:
         raise _safe_error(e, "job enqueue")
 
 
+def _read_from(path: str, offset: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(ARCHIVE_CHUNK_BYTES)
+
+
+@router.get("/automation/jobs/{job_id}/archive")
+async def download_batch_archive(request: Request, job_id: str):
+    """
+    Download a batch_report ZIP. While the job is running the archive is
+    streamed as it grows, and the response ends when the job finishes.
+    """
+    job = _job_status(job_id)
+    if not job or job["job_type"] != "batch_report":
+        raise HTTPException(status_code=404, detail="Batch report not found")
+    path = batch_archive_path(job_id)
+    if job["status"] == "completed":
+        return FileResponse(path, media_type="application/zip", filename=f"FK94_Reports_{job_id[:8]}.zip")
+    if job["status"] != "running" or not os.path.exists(path):
+        raise HTTPException(status_code=409, detail=f"Batch report is {job['status']}")
+
+    async def archive_chunks():
+        offset = 0
+        while True:
+            chunk = await asyncio.to_thread(_read_from, path, offset)
+            if chunk:
+                offset += len(chunk)
+                yield chunk
+                continue
+            status = _job_status(job_id)["status"]
+            if status != "running":
+                # Drain whatever was written between the last read and completion
+                while chunk := await asyncio.to_thread(_read_from, path, offset):
+                    offset += len(chunk)
+                    yield chunk
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(ARCHIVE_POLL_SECONDS)
+
+    return StreamingResponse(
+        archive_chunks(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=FK94_Reports_{job_id[:8]}.zip"},
+    )
+
+
+async def _wait_for_job(job_id: str, timeout: float) -> Optional[dict]:
+    """
+    Status-only job row as soon as it is completed or failed, or as it stands
+    after `timeout` seconds. Woken by JobWorker events; the row is also
+    re-read every JOB_EVENTS_KEEPALIVE_SECONDS in case another process runs it.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    with job_events.subscribe(job_id) as queue:
+        job = _job_status(job_id)
+        while job and job["status"] not in TERMINAL_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=min(remaining, settings.JOB_EVENTS_KEEPALIVE_SECONDS))
+                if "progress" in event:
+                    continue  # still running: no need to re-read
+            except asyncio.TimeoutError:
+                pass
+            job = _job_status(job_id)
+    return job
+
+
 @router.get("/automation/jobs/{job_id}", response_model=JobInfo)
-async def get_job_status(job_id: str):
-    """Get async job status/result."""
-    job = job_store.get_job(settings.JOB_DB_PATH, job_id)
+async def get_job_status(
+    job_id: str,
+    view: Literal["full", "status"] = "full",
+    fields: Optional[str] = None,
+    wait: float = Query(0, ge=0),
+):
+    """
+    Get async job status/result. view=status skips the result entirely (cheap
+    to poll); fields=summary,items returns only those top-level result keys.
+    wait=N long-polls: the response is held until the job completes or fails,
+    for at most N seconds (capped at JOB_LONG_POLL_MAX_SECONDS).
+    """
+    if wait > 0:
+        if not await _wait_for_job(job_id, min(wait, settings.JOB_LONG_POLL_MAX_SECONDS)):
+            raise HTTPException(status_code=404, detail="Job not found")
+    field_names = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    job = job_store.get_job(
+        settings.JOB_DB_PATH,
+        job_id,
+        include_result=view == "full",
+        include_payload=False,
+        include_result_size=True,
+        fields=field_names,
+    )
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -230,10 +486,76 @@ async def get_job_status(job_id: str):
         started_at=job["started_at"],
         finished_at=job["finished_at"],
         result=job["result"],
+        result_size=job["result_size"],
         error=job["error"],
     )
 
 
+@router.get("/automation/jobs/{job_id}/events")
+async def stream_job_events(request: Request, job_id: str):
+    """
+    Server-Sent Events stream of a job's state transitions: one `status`
+    event (job event JSON, without the result) per change, plus `progress`
+    events from batch jobs that report them, ending once the job completes
+    or fails.
+    """
+    if not _job_status(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        with job_events.subscribe(job_id) as queue:
+            current = job_event(_job_status(job_id))
+            last_status = None
+            while True:
+                if current["status"] != last_status:
+                    last_status = current["status"]
+                    yield f"event: status\ndata: {json.dumps(current)}\n\n"
+                if current["status"] in TERMINAL_STATUSES:
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.JOB_EVENTS_KEEPALIVE_SECONDS)
+                    if "progress" in event:
+                        yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+                        continue
+                    current = event
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    current = job_event(_job_status(job_id))
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.get("/automation/jobs/{job_id}/items", response_model=JobItemsPage)
+async def get_job_items(job_id: str, offset: int = 0, limit: int = 100):
+    """
+    Page through the items of a batch job (wallet_batch, phone_batch). While
+    the job runs this serves its last checkpoint.
+    """
+    offset = max(0, offset)
+    limit = min(max(1, limit), 1000)
+    job = job_store.get_job(settings.JOB_DB_PATH, job_id, include_payload=False, fields=("summary", "items"))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    result = job["result"] or {}
+    if "items" not in result and job["status"] == "completed":
+        raise HTTPException(status_code=400, detail="Job result has no items")
+    items = result.get("items", [])
+
+    return JobItemsPage(
+        job_id=job["id"],
+        status=JobStatus(job["status"]),
+        job_type=job["job_type"],
+        summary=result.get("summary"),
+        total=len(items),
+        offset=offset,
+        limit=limit,
+        items=items[offset:offset + limit],
+    )
+
+
 # === SECURITY SCORE ===
 
 @router.post("/score", response_model=SecurityScore)
@@ -416,21 +738,123 @@ async def api_status(request: Request):
     apis["hunter"] = {"configured": bool(settings.HUNTER_API_KEY), "reachable": None}
     apis["stripe"] = {"configured": bool(settings.STRIPE_SECRET_KEY), "reachable": None}
 
+    from app.services.telegram_truecaller_service import telegram_truecaller_service
+    telegram_health = telegram_truecaller_service.health()
+    apis["telegram"] = {
+        "configured": bool(settings.TELEGRAM_API_ID is not None and settings.TELEGRAM_API_HASH and settings.TELEGRAM_SESSION),
+        "reachable": telegram_health["connected"] if telegram_health["supervised"] else None,
+    }
+
     configured_count = sum(1 for v in apis.values() if v["configured"])
     return {
         "apis": apis,
         "configured_count": configured_count,
         "total_apis": len(apis),
-        "minimal_configured": apis["ai"]["configured"] or apis["deepseek"]["configured"]
+        "minimal_configured": apis["ai"]["configured"] or apis["deepseek"]["configured"],
+        "ai_cache": ai_cache.stats(),
     }
 
 
+# === ADMIN ===
+
+@router.get("/admin/diagnostics/loop", dependencies=[Depends(_require_admin)])
+async def get_loop_diagnostics(limit: int = 20):
+    """Worst event-loop blocking call sites seen since start (or the last reset)."""
+    return loop_watchdog.report(limit=max(1, min(limit, 200)))
+
+
+@router.delete("/admin/diagnostics/loop", dependencies=[Depends(_require_admin)])
+async def reset_loop_diagnostics():
+    loop_watchdog.reset()
+    return {"status": "reset"}
+
+
 # === PDF REPORT ===
 
+def _parse_byte_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single `bytes=` Range header into an inclusive (start, end).
+    Returns None when the whole file should be served (other units, multiple
+    ranges); raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start = size - int(last)
+            end = size - 1
+    except ValueError:
+        return None
+    start = max(start, 0)
+    end = min(end, size - 1)
+    if start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def _read_range(path: str, start: int, end: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start + 1)
+
+
+async def _serve_report(request: Request, digest: str, path: str, filename: str) -> Response:
+    """Serve a stored report with ETag / If-None-Match and single-range support."""
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        # Content-addressed, so it never changes; private because reports hold personal data
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "X-Report-Digest": digest,
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if range_header:
+        size = os.path.getsize(path)
+        try:
+            byte_range = _parse_byte_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range:
+            start, end = byte_range
+            content = await asyncio.to_thread(_read_range, path, start, end)
+            return Response(
+                content=content,
+                status_code=206,
+                media_type="application/pdf",
+                headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"},
+            )
+
+    return FileResponse(path, media_type="application/pdf", filename=filename, headers=headers)
+
+
+@router.get("/report/pdf/{digest}")
+async def get_stored_pdf_report(request: Request, digest: str):
+    """Download a previously generated report by its content digest (shareable link)."""
+    try:
+        path = report_store.get(digest)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if not path:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return await _serve_report(request, digest, path, f"FK94_Security_Report_{digest[:12]}.pdf")
+
+
 @router.post("/report/pdf")
-async def generate_pdf_report(request: FullAuditRequest):
+async def generate_pdf_report(request_http: Request, request: FullAuditRequest):
     """
     Run full audit and generate downloadable PDF report.
+    The response carries the report digest (ETag, X-Report-Digest), usable
+    with GET /report/pdf/{digest}.
     """
     try:
         # First run the full audit
@@ -471,25 +895,23 @@ async def generate_pdf_report(request: FullAuditRequest):
             recommendations=recommendations
         )
 
-        # Generate PDF
-        pdf_bytes = pdf_service.generate_report(audit_result)
+        # Generate PDF (in the render pool, off the event loop) or reuse a stored one
+        digest, path = await report_store.get_or_render(audit_result)
+        return await _serve_report(request_http, digest, path, f"FK94_Security_Report_{digest[:12]}.pdf")
 
-        # Return as downloadable file
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=FK94_Security_Report_{audit_id}.pdf"
-            }
+    except RenderQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many reports are being generated. Please try again shortly.",
+            headers={"Retry-After": "5"},
         )
-
     except Exception as e:
         raise _safe_error(e, "PDF report generation")
 
 
 # === STRIPE PAYMENTS ===
 
-from pydantic import BaseModel, field_validator
+from pydantic import field_validator
 from urllib.parse import urlparse
 
 ALLOWED_REDIRECT_HOSTS = {
@@ -568,8 +990,9 @@ async def create_portal_session(request: PortalRequest):
 
 @router.post("/stripe/webhook")
 async def stripe_webhook(request: Request):
-    """Handle Stripe webhook events"""
+    """Verify and store a Stripe webhook event; it is processed in the background"""
     from app.services.stripe_service import stripe_service
+    from app.services.webhook_worker import webhook_worker
 
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature", "")
@@ -579,24 +1002,8 @@ async def stripe_webhook(request: Request):
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
 
-    # Mirror key billing lifecycle events into event store for automation.
-    action = result.get("action", "")
-    mapped_event = None
-    if action == "upgrade_to_pro":
-        mapped_event = "checkout_success"
-    elif action == "payment_failed":
-        mapped_event = "payment_failed"
-    elif action == "downgrade_to_free":
-        mapped_event = "subscription_canceled"
-
-    if mapped_event:
-        event_store.track_event(
-            db_path=settings.EVENT_DB_PATH,
-            event_type=mapped_event,
-            user_id=result.get("user_id"),
-            source="stripe_webhook",
-            payload=result,
-        )
+    if not result["duplicate"]:
+        webhook_worker.wake()
 
     return result
 
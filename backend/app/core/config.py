@@ -21,14 +21,25 @@ class Settings(BaseSettings):
     DEEPSEEK_BASE_URL: str = "https://api.deepseek.com"
     DEEPSEEK_MODEL: str = "deepseek-chat"
 
+    # AI analysis cache (keyed on the bucketed audit context)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_DB_PATH: str = "ai_cache.sqlite3"
+    AI_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    AI_CACHE_MAX_ENTRIES: int = 5000
+
     # Stripe
     STRIPE_SECRET_KEY: str = ""
     STRIPE_PUBLISHABLE_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
+    STRIPE_PRODUCT_CACHE_TTL_SECONDS: int = 3600
 
     # Supabase admin (backend side)
     SUPABASE_URL: str = ""
     SUPABASE_SERVICE_ROLE_KEY: str = ""
+    SUPABASE_MAX_CONNECTIONS: int = 10
+    SUPABASE_BATCH_SIZE: int = 200  # profile IDs per in.(...) PATCH / api_usage rows per POST
+    SUPABASE_MAX_RETRIES: int = 3
+    SUPABASE_RETRY_BASE_SECONDS: float = 0.5
 
     # Email provider (optional, for lead notifications)
     RESEND_API_KEY: str = ""
@@ -50,6 +61,16 @@ class Settings(BaseSettings):
     # Etherscan (optional, free tier: 5 req/s with key, 1 req/5s without)
     ETHERSCAN_API_KEY: str = ""
 
+    # Chain adapters (wallet deep scan)
+    SOLANA_RPC_URL: str = "https://api.mainnet-beta.solana.com"
+    SOLANA_MAX_SIGNATURES: int = 200
+    SOLANA_RATE_LIMIT_PER_SECOND: float = 4.0
+    EVM_RATE_LIMIT_PER_SECOND: float = 5.0
+    CHAIN_MAX_CONNECTIONS: int = 10
+    OFAC_CACHE_TTL_SECONDS: int = 3600
+    WALLET_BATCH_CONCURRENCY: int = 8  # wallet scans in flight across all batches
+    WALLET_BATCH_SYNC_MAX: int = 25  # /check/wallet/batch limit; larger lists use the job
+
     # Truecaller (método directo - opcional)
     TRUECALLER_TOKEN: str = ""
 
@@ -57,6 +78,17 @@ class Settings(BaseSettings):
     TELEGRAM_API_ID: Optional[int] = None
     TELEGRAM_API_HASH: str = ""
     TELEGRAM_SESSION: str = ""  # Se genera una vez con el script de setup
+    TELEGRAM_LOOKUP_TIMEOUT_SECONDS: float = 10.0
+    TELEGRAM_HEALTH_INTERVAL_SECONDS: float = 60.0  # keep-alive check; also the max reconnect backoff
+    TELEGRAM_HEALTH_TIMEOUT_SECONDS: float = 10.0
+
+    # Phone intel (cache + provider hedging)
+    PHONE_CACHE_TTL_SECONDS: int = 24 * 3600
+    PHONE_CACHE_MAX_ENTRIES: int = 10000
+    PHONE_HEDGE_DELAY_SECONDS: float = 1.5  # race the direct API if the bot is slower than this
+    PHONE_BATCH_RATE_PER_SECOND: float = 1.0  # uncached lookups per second across all phone batches
+    PHONE_BATCH_CONCURRENCY: int = 4
+    PHONE_BATCH_CHECKPOINT_SECONDS: float = 5.0  # how often progress is saved to the job row
 
     # Rate limiting
     FREE_CHECKS_PER_DAY: int = 50
@@ -65,8 +97,45 @@ class Settings(BaseSettings):
     JOB_DB_PATH: str = "jobs.sqlite3"
     JOB_WORKER_POLL_SECONDS: int = 5
     ENABLE_JOB_WORKER: bool = True
+    JOB_BATCH_CONCURRENCY: int = 2  # long batch jobs run beside the main queue, at most this many at once
+    JOB_LONG_POLL_MAX_SECONDS: float = 60.0  # cap for ?wait= on job status
+    JOB_EVENTS_KEEPALIVE_SECONDS: float = 15.0  # SSE keep-alive; also the status re-read fallback
+    JOB_CALLBACK_SECRET: str = ""  # signs callback bodies (X-FK94-Signature) when set
+    JOB_CALLBACK_TIMEOUT_SECONDS: float = 10.0
+    JOB_CALLBACK_MAX_ATTEMPTS: int = 5
+    JOB_CALLBACK_RETRY_BASE_SECONDS: float = 2.0
+    JOB_CALLBACK_RETRY_MAX_SECONDS: float = 300.0
     EVENT_DB_PATH: str = "events.sqlite3"
 
+    # Webhook inbox (verified deliveries are stored, acked, then processed in the background)
+    WEBHOOK_DB_PATH: str = "webhooks.sqlite3"
+    ENABLE_WEBHOOK_WORKER: bool = True
+    WEBHOOK_POLL_SECONDS: float = 2.0
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BASE_SECONDS: float = 10.0
+    WEBHOOK_RETRY_MAX_SECONDS: float = 3600.0
+
+    # PDF rendering (process pool; 0 workers renders in a thread)
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_MAX_PENDING: int = 16
+    REPORT_STORE_DIR: str = "report_store"
+    REPORT_STORE_MAX_BYTES: int = 512 * 1024 * 1024
+    BATCH_REPORT_DIR: str = "batch_reports"
+    BATCH_REPORT_CONCURRENCY: int = 4
+
+    # Metrics (/metrics, Prometheus text format)
+    METRICS_ENABLED: bool = True
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    METRICS_ALLOWED_IPS: list = []  # scrapers allowed without X-Admin-Key
+    # Also open tracing spans on the OpenTelemetry tracer (needs opentelemetry-api)
+    OTEL_ENABLED: bool = False
+
+    # Diagnostics: event-loop blocking detector, read via /admin/diagnostics/loop
+    ADMIN_API_KEY: str = ""  # admin endpoints are disabled while empty
+    DIAGNOSTICS_ENABLED: bool = False
+    DIAGNOSTICS_BLOCK_THRESHOLD_MS: int = 100
+    DIAGNOSTICS_SAMPLE_INTERVAL_MS: int = 10
+
     # CORS
     CORS_ORIGINS: list = [
         "https://fk94platform.vercel.app",
@@ -0,0 +1,163 @@
+"""
+FK94 Security Platform - Event-Loop Diagnostics
+Finds code that blocks the event loop. A heartbeat task stamps the time every
+few milliseconds; a watchdog thread notices when the stamp goes stale, samples
+the loop thread's Python stack while it stays blocked, and attributes each
+stall to the innermost frame it saw most often. The worst offenders are kept
+for the admin diagnostics endpoint.
+
+Off by default (DIAGNOSTICS_ENABLED): sampling costs one thread wake-up per
+sample interval.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 12
+MAX_OFFENDERS = 200
+
+
+class LoopWatchdog:
+    def __init__(self, threshold_ms: float, sample_interval_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.sample_interval = sample_interval_ms / 1000
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # stall in progress: heartbeat it started after -> sampled stacks
+        self._stall_beat: Optional[float] = None
+        self._stall_samples: Counter = Counter()
+        self._stall_stacks: dict[str, list[str]] = {}
+        self._offenders: dict[str, dict] = {}
+        self._stalls = 0
+        self._blocked_seconds = 0.0
+        self._max_stall = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start on the running loop (call from inside it)."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Loop watchdog on: threshold {self.threshold * 1000:.0f}ms")
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, 1.0)
+            self._thread = None
+
+    async def _beat(self) -> None:
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.sample_interval)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            beat = self._last_beat
+            blocked_for = time.monotonic() - beat
+            # The heartbeat itself sleeps sample_interval between stamps
+            if blocked_for - self.sample_interval >= self.threshold:
+                if self._stall_beat != beat:
+                    self._finish_stall()
+                    self._stall_beat = beat
+                self._sample()
+            elif self._stall_beat is not None:
+                self._finish_stall()
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)[-STACK_DEPTH:]
+        leaf = stack[-1]
+        key = f"{leaf.filename}:{leaf.lineno} in {leaf.name}"
+        self._stall_samples[key] += 1
+        if key not in self._stall_stacks:
+            self._stall_stacks[key] = [f"{f.filename}:{f.lineno} in {f.name}" for f in stack]
+
+    def _finish_stall(self) -> None:
+        if self._stall_beat is None:
+            return
+        # Blocked from the stamp the heartbeat should have renewed until the next one
+        resumed = self._last_beat if self._last_beat != self._stall_beat else time.monotonic()
+        duration = max(0.0, resumed - self._stall_beat - self.sample_interval)
+        if self._stall_samples:
+            key, _ = self._stall_samples.most_common(1)[0]
+            self._record(key, self._stall_stacks[key], duration)
+        self._stall_beat = None
+        self._stall_samples = Counter()
+        self._stall_stacks = {}
+
+    def _record(self, key: str, stack: list[str], duration: float) -> None:
+        with self._lock:
+            self._stalls += 1
+            self._blocked_seconds += duration
+            self._max_stall = max(self._max_stall, duration)
+            offender = self._offenders.get(key)
+            if offender is None:
+                if len(self._offenders) >= MAX_OFFENDERS:
+                    smallest = min(self._offenders, key=lambda k: self._offenders[k]["total_ms"])
+                    del self._offenders[smallest]
+                offender = self._offenders[key] = {
+                    "location": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "stack": stack,
+                }
+            offender["count"] += 1
+            offender["total_ms"] += duration * 1000
+            offender["max_ms"] = max(offender["max_ms"], duration * 1000)
+            offender["last_seen"] = datetime.now(timezone.utc).isoformat()
+        logger.warning(f"Event loop blocked {duration * 1000:.0f}ms at {key}")
+
+    def report(self, limit: int = 20) -> dict:
+        with self._lock:
+            offenders = sorted(self._offenders.values(), key=lambda o: o["total_ms"], reverse=True)[:limit]
+            return {
+                "enabled": self.running,
+                "threshold_ms": round(self.threshold * 1000, 1),
+                "sample_interval_ms": round(self.sample_interval * 1000, 1),
+                "stalls": self._stalls,
+                "blocked_ms": round(self._blocked_seconds * 1000, 1),
+                "max_stall_ms": round(self._max_stall * 1000, 1),
+                "offenders": [
+                    {**o, "total_ms": round(o["total_ms"], 1), "max_ms": round(o["max_ms"], 1)}
+                    for o in offenders
+                ],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._offenders.clear()
+            self._stalls = 0
+            self._blocked_seconds = 0.0
+            self._max_stall = 0.0
+
+
+loop_watchdog = LoopWatchdog(settings.DIAGNOSTICS_BLOCK_THRESHOLD_MS, settings.DIAGNOSTICS_SAMPLE_INTERVAL_MS)
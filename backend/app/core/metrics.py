@@ -0,0 +1,418 @@
+"""
+FK94 Security Platform - Metrics
+Minimal Prometheus text-format metrics: counters, gauges and histograms with
+fixed label names. Each label set is a child object whose exposition strings
+are formatted once when it is created (route and upstream label sets are
+created up front), so the hot path is a dict lookup plus an increment.
+
+Outbound httpx calls are timed per upstream by `instrument_httpx()`, and
+`LoopLagMonitor` samples event-loop lag. Scrape-time gauges (`collect=`) are
+computed by `collect_gauges()` in a worker thread before `render()`.
+"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+UPSTREAM_OUTCOMES = ("ok", "throttled", "server_error", "timeout", "error")
+JOB_TYPES = ("full_audit", "multi_audit", "ai_analysis", "wallet_batch", "batch_report", "usage_sync", "phone_batch")
+JOB_OUTCOMES = ("completed", "failed")
+CACHES = ("ai", "ofac", "phone")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_string(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        if not labelnames:
+            self._children[()] = self._new_child(())
+        registry.append(self)
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child(values)
+        return child
+
+    def preallocate(self, label_sets: Iterable[tuple[str, ...]]) -> None:
+        for values in label_sets:
+            self.labels(*values)
+
+    @abstractmethod
+    def _new_child(self, values: tuple[str, ...]):
+        ...
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for child in self._children.values():
+            child.render(lines)
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value", "_line")
+
+    def __init__(self, name: str, labels: str):
+        self.value = 0.0
+        self._line = f"{name}{labels} "
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def render(self, lines: list[str]) -> None:
+        lines.append(f"{self._line}{self.value:g}")
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self, values):
+        return _CounterChild(self.name, _label_string(self.labelnames, values))
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Gauge(_Metric):
+    """Gauge set by the code, or computed at scrape time (collect_gauges) when `collect` is given."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), collect: Optional[Callable[[], dict]] = None):
+        self._collect = collect
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self, values):
+        return _GaugeChild(self.name, _label_string(self.labelnames, values))
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+    def _run_collect(self) -> dict:
+        try:
+            return self._collect()
+        except Exception as e:
+            logger.warning(f"Metric collector {self.name} failed: {e}")
+            return {}
+
+    def _store(self, collected: dict) -> None:
+        for values, value in collected.items():
+            key = values if isinstance(values, tuple) else (values,)
+            self.labels(*key).set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_bucket_lines", "_sum_line", "_count_line")
+
+    def __init__(self, name: str, names: tuple[str, ...], values: tuple[str, ...], bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        les = [f'le="{b:g}"' for b in bounds] + ['le="+Inf"']
+        self._bucket_lines = [f"{name}_bucket{_label_string(names, values, le)} " for le in les]
+        labels = _label_string(names, values)
+        self._sum_line = f"{name}_sum{labels} "
+        self._count_line = f"{name}_count{labels} "
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def render(self, lines: list[str]) -> None:
+        cumulative = 0
+        for line, n in zip(self._bucket_lines, self.counts):
+            cumulative += n
+            lines.append(f"{line}{cumulative}")
+        lines.append(f"{self._sum_line}{self.sum:g}")
+        lines.append(f"{self._count_line}{cumulative}")
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self, values):
+        return _HistogramChild(self.name, self.labelnames, values, self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+
+registry: list[_Metric] = []
+
+
+async def collect_gauges() -> None:
+    """
+    Run the scrape-time collectors in a worker thread (some query SQLite),
+    then store their values on the loop, where render() reads them.
+    """
+    gauges = [m for m in registry if isinstance(m, Gauge) and m._collect is not None]
+    results = await asyncio.to_thread(lambda: [gauge._run_collect() for gauge in gauges])
+    for gauge, collected in zip(gauges, results):
+        gauge._store(collected)
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# === HTTP SERVER ===
+
+http_request_duration = Histogram(
+    "fk94_http_request_duration_seconds", "API request latency by route template.", ("method", "route"),
+)
+http_requests = Counter(
+    "fk94_http_requests_total", "API responses by route template and status class.",
+    ("method", "route", "status"),
+)
+UNMATCHED_ROUTE = "unmatched"
+_HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def preallocate_routes(routes: Iterable) -> None:
+    """Create the label sets for every (method, route template) pair."""
+    for route in routes:
+        path = getattr(route, "path", None)
+        for method in getattr(route, "methods", None) or ():
+            if path:
+                http_request_duration.labels(method, path)
+                http_requests.preallocate((method, path, status) for status in STATUS_CLASSES)
+
+
+def observe_request(method: str, route: Optional[str], status_code: int, seconds: float) -> None:
+    if route is None:
+        # Unrouted requests carry client-chosen paths and methods; keep the label set bounded
+        route = UNMATCHED_ROUTE
+        method = method if method in _HTTP_METHODS else "OTHER"
+    http_request_duration.labels(method, route).observe(seconds)
+    http_requests.labels(method, route, STATUS_CLASSES[min(max(status_code // 100, 1), 5) - 1]).inc()
+
+
+# === UPSTREAM CALLS ===
+
+_UPSTREAM_HOSTS = {
+    "haveibeenpwned.com": "hibp",
+    "api.pwnedpasswords.com": "hibp",
+    "api.dehashed.com": "dehashed",
+    "api.hunter.io": "hunter",
+    "rdap.org": "rdap",
+    "api.etherscan.io": "etherscan",
+    "api.moonshot.ai": "moonshot",
+    "api.deepseek.com": "deepseek",
+    "www.gravatar.com": "gravatar",
+    "ip-api.com": "ipapi",
+    "blockchain.info": "blockchain_info",
+    "api.mainnet-beta.solana.com": "solana",
+}
+UPSTREAMS = tuple(dict.fromkeys([*_UPSTREAM_HOSTS.values(), "blockscout", "other"]))
+_MAX_HOST_CACHE = 512
+
+upstream_duration = Histogram(
+    "fk94_upstream_request_duration_seconds", "Outbound API call latency by upstream.", ("upstream",),
+)
+upstream_requests = Counter(
+    "fk94_upstream_requests_total",
+    "Outbound API calls by upstream and outcome (ok, throttled, server_error, timeout, error).",
+    ("upstream", "outcome"),
+)
+upstream_duration.preallocate((u,) for u in UPSTREAMS)
+upstream_requests.preallocate((u, o) for u in UPSTREAMS for o in UPSTREAM_OUTCOMES)
+
+# host -> (duration child, {outcome: counter child}); filled on first call per host
+_host_children: dict[str, tuple[_HistogramChild, dict[str, _CounterChild]]] = {}
+
+
+def _configured_hosts() -> dict[str, str]:
+    hosts = dict(_UPSTREAM_HOSTS)
+    for url, upstream in (
+        (settings.AI_BASE_URL, "moonshot"),
+        (settings.DEEPSEEK_BASE_URL, "deepseek"),
+        (settings.SOLANA_RPC_URL, "solana"),
+    ):
+        host = urlparse(url).hostname
+        if host:
+            hosts[host] = upstream
+    return hosts
+
+
+def upstream_for_host(host: str) -> str:
+    if host.endswith(".blockscout.com"):
+        return "blockscout"
+    return _configured_hosts().get(host, "other")
+
+
+def _children_for_host(host: str) -> tuple[_HistogramChild, dict[str, _CounterChild]]:
+    children = _host_children.get(host)
+    if children is None:
+        upstream = upstream_for_host(host)
+        children = (
+            upstream_duration.labels(upstream),
+            {o: upstream_requests.labels(upstream, o) for o in UPSTREAM_OUTCOMES},
+        )
+        if len(_host_children) < _MAX_HOST_CACHE:
+            _host_children[host] = children
+    return children
+
+
+def observe_upstream(host: str, status_code: Optional[int], seconds: float, exc: Optional[BaseException] = None) -> None:
+    duration, outcomes = _children_for_host(host)
+    duration.observe(seconds)
+    if exc is not None:
+        outcome = "timeout" if isinstance(exc, httpx.TimeoutException) else "error"
+    elif status_code == 429:
+        outcome = "throttled"
+    elif status_code >= 500:
+        outcome = "server_error"
+    else:
+        outcome = "ok"
+    outcomes[outcome].inc()
+
+
+_original_handle_async_request = httpx.AsyncHTTPTransport.handle_async_request
+
+
+async def _timed_handle_async_request(self, request: httpx.Request) -> httpx.Response:
+    start = time.perf_counter()
+    try:
+        response = await _original_handle_async_request(self, request)
+    except Exception as exc:
+        observe_upstream(request.url.host, None, time.perf_counter() - start, exc)
+        raise
+    # Time to response headers; bodies are read by the caller afterwards
+    observe_upstream(request.url.host, response.status_code, time.perf_counter() - start)
+    return response
+
+
+def instrument_httpx() -> None:
+    """
+    Time every request sent through httpx's default async transport. The
+    services create their own clients, so the transport class is patched
+    once instead of threading a transport through every call site.
+    """
+    httpx.AsyncHTTPTransport.handle_async_request = _timed_handle_async_request
+
+
+# === CACHES ===
+
+cache_lookups = Counter("fk94_cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result"))
+cache_lookups.preallocate((c, r) for c in CACHES for r in ("hit", "miss"))
+CACHE_HIT = {c: cache_lookups.labels(c, "hit") for c in CACHES}
+CACHE_MISS = {c: cache_lookups.labels(c, "miss") for c in CACHES}
+
+
+def _cache_hit_ratios() -> dict:
+    ratios = {}
+    for cache in CACHES:
+        hits, misses = CACHE_HIT[cache].value, CACHE_MISS[cache].value
+        ratios[cache] = hits / (hits + misses) if hits + misses else 0.0
+    return ratios
+
+
+Gauge("fk94_cache_hit_ratio", "Hit ratio since process start.", ("cache",), collect=_cache_hit_ratios)
+
+
+# === JOBS ===
+
+def _job_queue_depth() -> dict:
+    from app.services import job_store
+
+    counts = job_store.count_jobs_by_status(settings.JOB_DB_PATH)
+    return {status: counts.get(status, 0) for status in ("queued", "running")}
+
+
+Gauge("fk94_job_queue_depth", "Jobs waiting or running.", ("status",), collect=_job_queue_depth)
+job_wait = Histogram(
+    "fk94_job_wait_seconds", "Time from a job becoming due to a worker picking it up.",
+    ("job_type",), buckets=JOB_BUCKETS,
+)
+job_run = Histogram(
+    "fk94_job_run_seconds", "Job processing time by type and outcome.",
+    ("job_type", "outcome"), buckets=JOB_BUCKETS,
+)
+job_wait.preallocate((t,) for t in JOB_TYPES)
+job_run.preallocate((t, o) for t in JOB_TYPES for o in JOB_OUTCOMES)
+
+
+# === EVENT LOOP ===
+
+loop_lag = Histogram("fk94_event_loop_lag_seconds", "Event-loop scheduling delay.", buckets=LAG_BUCKETS)
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` seconds in a loop; any extra delay is time the loop was blocked."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            loop_lag.observe(max(0.0, loop.time() - start - self.interval))
+
+
+loop_lag_monitor = LoopLagMonitor(settings.METRICS_LOOP_LAG_INTERVAL_SECONDS)
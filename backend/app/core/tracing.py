@@ -0,0 +1,147 @@
+"""
+FK94 Security Platform - Tracing
+Lightweight per-audit spans. `collect()` opens a trace for the current task
+(and the tasks it gathers, through contextvars); `span()` / `@traced` time a
+stage inside it. Outside a trace, spans cost one contextvar lookup.
+
+With OTEL_ENABLED and opentelemetry-api installed, every span is also opened
+on the globally configured OpenTelemetry tracer (e.g. set up by
+`opentelemetry-instrument`), whether or not a trace is being collected.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.core.config import settings
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # optional dependency
+    otel_trace = None
+
+_tracer = otel_trace.get_tracer("fk94") if otel_trace is not None and settings.OTEL_ENABLED else None
+
+
+class Span:
+    __slots__ = ("name", "parent", "start", "duration_ms", "error", "attributes", "_otel")
+
+    def __init__(self, name: str, parent: Optional[str], attributes: dict):
+        self.name = name
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.attributes = attributes
+        self._otel = None
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+        if self._otel is not None:
+            self._otel.set_attribute(key, value)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, key: str, value) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Trace:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: list[Span] = []
+        self.total_ms: Optional[float] = None
+
+    def timings(self) -> dict:
+        """Span breakdown in the shape of schemas.AuditTimings."""
+        total_ms = self.total_ms
+        if total_ms is None:
+            total_ms = (time.perf_counter() - self.start) * 1000
+        return {
+            "total_ms": round(total_ms, 1),
+            "spans": [
+                {
+                    "name": s.name,
+                    "parent": s.parent,
+                    "start_ms": round((s.start - self.start) * 1000, 1),
+                    "duration_ms": round(s.duration_ms, 1) if s.duration_ms is not None else None,
+                    "error": s.error,
+                    "attributes": dict(s.attributes),
+                }
+                for s in self.spans
+            ],
+            "cache_hits": [s.name for s in self.spans if s.attributes.get("cache") == "hit"],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("fk94_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("fk94_span", default=None)
+
+
+@contextmanager
+def collect(enabled: bool = True) -> Iterator[Optional[Trace]]:
+    """Collect spans opened in this block (yields None when not enabled)."""
+    if not enabled:
+        yield None
+        return
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.total_ms = (time.perf_counter() - trace.start) * 1000
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    trace = _current_trace.get()
+    if trace is None and _tracer is None:
+        yield _NOOP
+        return
+
+    parent = _current_span.get()
+    record = Span(name, parent.name if parent else None, attributes)
+    if trace is not None:
+        trace.spans.append(record)
+    token = _current_span.set(record)
+    otel_cm = _tracer.start_as_current_span(name, attributes=attributes) if _tracer else None
+    if otel_cm is not None:
+        record._otel = otel_cm.__enter__()
+    try:
+        yield record
+    except BaseException as exc:
+        record.error = type(exc).__name__
+        if otel_cm is not None:
+            otel_cm.__exit__(type(exc), exc, exc.__traceback__)
+            otel_cm = None
+        raise
+    finally:
+        record.duration_ms = (time.perf_counter() - record.start) * 1000
+        _current_span.reset(token)
+        if otel_cm is not None:
+            otel_cm.__exit__(None, None, None)
+
+
+def annotate(key: str, value) -> None:
+    """Set an attribute (e.g. cache="hit") on the innermost open span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(key, value)
+
+
+def traced(name: str, **attributes):
+    """Run an async function inside span(name)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
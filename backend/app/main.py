@@ -3,19 +3,29 @@ FK94 Security Platform - Main Application
 """
 import time
 import logging
-from fastapi import FastAPI, Request
+from typing import Optional
+from fastapi import Depends, FastAPI, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from contextlib import asynccontextmanager
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
+from app.core import metrics
+from app.core.diagnostics import loop_watchdog
 from app.core.config import settings
-from app.api.routes import router
+from app.api.routes import _require_admin, router
 from app.services import job_store
 from app.services import event_store
+from app.services import webhook_store
 from app.services.job_worker import job_worker
+from app.services.webhook_worker import webhook_worker
+from app.services.chain_adapters import close_adapters
+from app.services.supabase_admin_service import supabase_admin_service
+from app.services.telegram_truecaller_service import telegram_truecaller_service
+from app.services.ai_cache import ai_cache
+from app.services.pdf_renderer import pdf_render_pool
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +38,37 @@ async def lifespan(app: FastAPI):
     # Startup
     job_store.init_db(settings.JOB_DB_PATH)
     event_store.init_db(settings.EVENT_DB_PATH)
+    webhook_store.init_db(settings.WEBHOOK_DB_PATH)
+    if settings.AI_CACHE_ENABLED:
+        ai_cache.init_db()
     if settings.ENABLE_JOB_WORKER:
         await job_worker.start()
+    if settings.ENABLE_WEBHOOK_WORKER:
+        await webhook_worker.start()
+    await telegram_truecaller_service.start()
+    if settings.METRICS_ENABLED:
+        metrics.instrument_httpx()
+        metrics.loop_lag_monitor.start()
+    if settings.DIAGNOSTICS_ENABLED:
+        loop_watchdog.start()
     logger.info(f"Starting {settings.APP_NAME}")
     logger.info(f"AI API: {'Configured' if settings.AI_API_KEY else ('DeepSeek' if settings.DEEPSEEK_API_KEY else 'Not configured')}")
     logger.info(f"HIBP API: {'Configured' if settings.HIBP_API_KEY else 'Not configured'}")
     logger.info("Rate Limiting: Enabled (60 req/min general, 10 req/min checks, 5 req/min audits)")
     yield
     # Shutdown
+    await metrics.loop_lag_monitor.stop()
+    await loop_watchdog.stop()
     if settings.ENABLE_JOB_WORKER:
         await job_worker.stop()
+    if settings.ENABLE_WEBHOOK_WORKER:
+        await webhook_worker.stop()
+    await telegram_truecaller_service.close()
+    await close_adapters()
+    await supabase_admin_service.close()
+    if settings.AI_CACHE_ENABLED:
+        ai_cache.flush()
+    pdf_render_pool.shutdown()
     logger.info("Shutting down...")
 
 
@@ -84,11 +115,23 @@ async def limit_request_body(request: Request, call_next):
     return await call_next(request)
 
 
+def _route_template(request: Request):
+    """Matched route path (e.g. /api/v1/jobs/{job_id}); set by the router after call_next."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None)
+
+
 @app.middleware("http")
 async def log_response_time(request: Request, call_next):
     start = time.perf_counter()
-    response = await call_next(request)
-    elapsed_ms = (time.perf_counter() - start) * 1000
+    try:
+        response = await call_next(request)
+    except Exception:
+        metrics.observe_request(request.method, _route_template(request), 500, time.perf_counter() - start)
+        raise
+    elapsed = time.perf_counter() - start
+    metrics.observe_request(request.method, _route_template(request), response.status_code, elapsed)
+    elapsed_ms = elapsed * 1000
     if elapsed_ms > 1000:
         logger.warning(f"{request.method} {request.url.path} took {elapsed_ms:.0f}ms")
     else:
@@ -106,6 +149,21 @@ async def log_response_time(request: Request, call_next):
 app.include_router(router, prefix="/api/v1")
 
 
+def _require_metrics_access(request: Request, x_admin_key: Optional[str] = Header(None)) -> None:
+    """/metrics needs X-Admin-Key, unless the client address is in METRICS_ALLOWED_IPS."""
+    if request.client and request.client.host in settings.METRICS_ALLOWED_IPS:
+        return
+    _require_admin(x_admin_key)
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(_require_metrics_access)])
+async def metrics_endpoint():
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    await metrics.collect_gauges()
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -117,6 +175,9 @@ async def root():
     }
 
 
+metrics.preallocate_routes(app.routes)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,10 +1,12 @@
 """
 FK94 Security Platform - Data Models
 """
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import BaseModel, EmailStr, field_validator, model_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+from urllib.parse import urlparse
+import ipaddress
 import re
 
 
@@ -143,38 +145,88 @@ class IPCheckRequest(BaseModel):
         raise ValueError("Invalid IP address format")
 
 
+WALLET_CHAINS = {"ethereum", "bitcoin", "solana", "polygon", "bsc", "arbitrum", "base", "optimism"}
+EVM_WALLET_CHAINS = {"ethereum", "polygon", "bsc", "arbitrum", "base", "optimism"}
+MAX_WALLET_BATCH_SIZE = 500
+
+
+def _validate_wallet_address(v: str) -> str:
+    v = v.strip()
+    if not v or len(v) > 128:
+        raise ValueError("Invalid wallet address")
+    # ETH-like
+    if v.startswith("0x") and len(v) == 42:
+        return v
+    # BTC legacy
+    if v.startswith(("1", "3")) and 25 <= len(v) <= 34:
+        return v
+    # BTC bech32
+    if v.startswith("bc1") and 42 <= len(v) <= 62:
+        return v
+    # Solana
+    if len(v) >= 32 and len(v) <= 44 and re.match(r'^[1-9A-HJ-NP-Za-km-z]+$', v):
+        return v
+    raise ValueError("Unrecognized wallet address format")
+
+
+def _validate_wallet_chain(v: str) -> str:
+    v = v.strip().lower()
+    if v not in WALLET_CHAINS:
+        raise ValueError(f"Unsupported chain. Use: {', '.join(WALLET_CHAINS)}")
+    return v
+
+
+def _validate_evm_chains(v: Optional[List[str]]) -> Optional[List[str]]:
+    if v is None:
+        return v
+    chains = list(dict.fromkeys(c.strip().lower() for c in v))
+    if not chains or any(c not in EVM_WALLET_CHAINS for c in chains):
+        raise ValueError(f"Unsupported chains. Use: {', '.join(EVM_WALLET_CHAINS)}")
+    return chains
+
+
 class WalletCheckRequest(BaseModel):
     address: str
     chain: str = "ethereum"  # ethereum, bitcoin, solana, etc.
+    chains: Optional[List[str]] = None  # EVM only: scan several chains at once
 
     @field_validator("address")
     @classmethod
     def validate_address(cls, v: str) -> str:
-        v = v.strip()
-        if not v or len(v) > 128:
-            raise ValueError("Invalid wallet address")
-        # ETH-like
-        if v.startswith("0x") and len(v) == 42:
-            return v
-        # BTC legacy
-        if v.startswith(("1", "3")) and 25 <= len(v) <= 34:
-            return v
-        # BTC bech32
-        if v.startswith("bc1") and 42 <= len(v) <= 62:
-            return v
-        # Solana
-        if len(v) >= 32 and len(v) <= 44 and re.match(r'^[1-9A-HJ-NP-Za-km-z]+$', v):
-            return v
-        raise ValueError("Unrecognized wallet address format")
+        return _validate_wallet_address(v)
 
     @field_validator("chain")
     @classmethod
     def validate_chain(cls, v: str) -> str:
-        allowed = {"ethereum", "bitcoin", "solana", "polygon", "bsc"}
-        v = v.strip().lower()
-        if v not in allowed:
-            raise ValueError(f"Unsupported chain. Use: {', '.join(allowed)}")
-        return v
+        return _validate_wallet_chain(v)
+
+    @field_validator("chains")
+    @classmethod
+    def validate_chains(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return _validate_evm_chains(v)
+
+
+class WalletBatchRequest(BaseModel):
+    addresses: List[str]
+    chain: str = "ethereum"  # default chain; address format still wins (see check_wallet)
+    chains: Optional[List[str]] = None
+
+    @field_validator("addresses")
+    @classmethod
+    def validate_addresses(cls, v: List[str]) -> List[str]:
+        if not v or len(v) > MAX_WALLET_BATCH_SIZE:
+            raise ValueError(f"Provide 1-{MAX_WALLET_BATCH_SIZE} addresses")
+        return [_validate_wallet_address(a) for a in v]
+
+    @field_validator("chain")
+    @classmethod
+    def validate_chain(cls, v: str) -> str:
+        return _validate_wallet_chain(v)
+
+    @field_validator("chains")
+    @classmethod
+    def validate_chains(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return _validate_evm_chains(v)
 
 
 class FullAuditRequest(BaseModel):
@@ -183,20 +235,120 @@ class FullAuditRequest(BaseModel):
     check_breaches: bool = True
     check_osint: bool = True
     check_dark_web: bool = False
+    defer_ai: bool = False  # return before the AI analysis; fetch it via ai_job_id
+    include_timings: bool = False  # add a per-stage `timings` breakdown to the result
 
 
 class MultiAuditRequest(BaseModel):
     audit_type: AuditType
     value: str
     extra_data: Optional[dict] = None
+    defer_ai: bool = False  # return before the AI analysis; fetch it via ai_job_id
+    include_timings: bool = False  # add a per-stage `timings` breakdown to the result
 
 
-class FullAuditJobRequest(FullAuditRequest):
-    run_at: Optional[datetime] = None
+MAX_BATCH_REPORTS = 200
 
 
-class MultiAuditJobRequest(MultiAuditRequest):
+class BatchReportRequest(BaseModel):
+    emails: List[EmailStr] = []  # run a fresh full audit per email
+    job_ids: List[str] = []  # reuse completed full_audit / multi_audit jobs
+
+    @field_validator("job_ids")
+    @classmethod
+    def validate_job_ids(cls, v: List[str]) -> List[str]:
+        return [j.strip() for j in v if j.strip()]
+
+    @model_validator(mode="after")
+    def validate_size(self) -> "BatchReportRequest":
+        total = len(self.emails) + len(self.job_ids)
+        if not total or total > MAX_BATCH_REPORTS:
+            raise ValueError(f"Provide 1-{MAX_BATCH_REPORTS} emails or job IDs")
+        return self
+
+
+MAX_PHONE_BATCH_SIZE = 5000
+
+
+class PhoneBatchRequest(BaseModel):
+    phones: List[str]
+    country_code: str = "AR"  # for numbers without an international prefix
+
+    @field_validator("phones")
+    @classmethod
+    def validate_phones(cls, v: List[str]) -> List[str]:
+        v = [p.strip() for p in v if p and p.strip()]
+        if not v or len(v) > MAX_PHONE_BATCH_SIZE:
+            raise ValueError(f"Provide 1-{MAX_PHONE_BATCH_SIZE} phone numbers")
+        if any(len(p) > 32 for p in v):
+            raise ValueError("Phone numbers must be at most 32 characters")
+        return v
+
+    @field_validator("country_code")
+    @classmethod
+    def validate_country_code(cls, v: str) -> str:
+        v = v.strip().upper()
+        if not re.match(r"^[A-Z]{2}$", v):
+            raise ValueError("country_code must be a 2-letter ISO code")
+        return v
+
+
+class JobOptions(BaseModel):
+    """Scheduling and notification options shared by every enqueue request."""
     run_at: Optional[datetime] = None
+    callback_url: Optional[str] = None  # POSTed the job event when it completes or fails
+
+    @field_validator("callback_url")
+    @classmethod
+    def validate_callback_url(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return v
+        parsed = urlparse(v)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError("callback_url must be an http(s) URL")
+        if len(v) > 2048:
+            raise ValueError("callback_url is too long")
+        host = parsed.hostname.lower()
+        if host == "localhost" or host.endswith((".localhost", ".local", ".internal")):
+            raise ValueError("callback_url must be a public host")
+        try:
+            ip = ipaddress.ip_address(host)
+        except ValueError:
+            return v
+        if not ip.is_global:
+            raise ValueError("callback_url must be a public host")
+        return v
+
+
+class FullAuditJobRequest(FullAuditRequest, JobOptions):
+    pass
+
+
+class MultiAuditJobRequest(MultiAuditRequest, JobOptions):
+    pass
+
+
+class WalletBatchJobRequest(WalletBatchRequest, JobOptions):
+    pass
+
+
+class BatchReportJobRequest(BatchReportRequest, JobOptions):
+    pass
+
+
+class PhoneBatchJobRequest(PhoneBatchRequest, JobOptions):
+    pass
+
+
+class UsageSyncJobRequest(JobOptions):
+    max_batches: Optional[int] = None  # stop after this many api_usage inserts; rerun to continue
+
+    @field_validator("max_batches")
+    @classmethod
+    def validate_max_batches(cls, v: Optional[int]) -> Optional[int]:
+        if v is not None and v < 1:
+            raise ValueError("max_batches must be at least 1")
+        return v
 
 
 class AIAnalysisRequest(BaseModel):
@@ -347,6 +499,7 @@ class ExchangeInteraction(BaseModel):
     tx_hash: str
     value: Optional[str] = None
     timestamp: Optional[str] = None
+    chain: Optional[str] = None
 
 
 class WalletResult(BaseModel):
@@ -363,6 +516,7 @@ class WalletResult(BaseModel):
     deep_scan: bool = False
     exchange_interactions: List[ExchangeInteraction] = []
     exchanges_detected: List[str] = []
+    exchange_volume: dict = {}  # {"Binance": {"ETH": 1.25}}
     is_traceable: bool = False
     traceability_score: int = 0
     traceability_details: List[str] = []
@@ -373,6 +527,14 @@ class WalletResult(BaseModel):
     last_tx_date: Optional[str] = None
     unique_counterparties: int = 0
     scan_warnings: List[str] = []
+    chains_scanned: List[str] = []
+    chain_breakdown: dict = {}  # {"base": {"balance": ..., "tx_count": ..., "exchanges_detected": [...]}}
+
+
+class WalletBatchItem(BaseModel):
+    address: str
+    result: Optional[WalletResult] = None
+    error: Optional[str] = None
 
 
 class SecurityScore(BaseModel):
@@ -385,6 +547,21 @@ class SecurityScore(BaseModel):
     issues_low: int
 
 
+class SpanTiming(BaseModel):
+    name: str
+    parent: Optional[str] = None
+    start_ms: float  # offset from the start of the audit
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+    attributes: dict = {}
+
+
+class AuditTimings(BaseModel):
+    total_ms: float
+    spans: list[SpanTiming] = []
+    cache_hits: list[str] = []  # spans answered from a cache
+
+
 class AuditResult(BaseModel):
     id: str
     audit_type: AuditType = AuditType.EMAIL
@@ -402,7 +579,10 @@ class AuditResult(BaseModel):
     ip_result: Optional[IPResult] = None
     wallet_result: Optional[WalletResult] = None
     ai_analysis: Optional[str] = None
+    ai_analysis_status: Optional[str] = None  # completed, pending, failed
+    ai_job_id: Optional[str] = None  # set when the analysis was deferred
     recommendations: list[str] = []
+    timings: Optional[AuditTimings] = None  # only with include_timings
 
 
 class AIResponse(BaseModel):
@@ -428,6 +608,13 @@ class JobCreateResponse(BaseModel):
     job_type: str
 
 
+class AIAnalysisInfo(BaseModel):
+    job_id: str
+    status: JobStatus
+    ai_analysis: Optional[str] = None
+    error: Optional[str] = None
+
+
 class JobInfo(BaseModel):
     job_id: str
     status: JobStatus
@@ -437,9 +624,22 @@ class JobInfo(BaseModel):
     started_at: Optional[str] = None
     finished_at: Optional[str] = None
     result: Optional[dict] = None
+    result_size: Optional[int] = None  # bytes of the stored result JSON
     error: Optional[str] = None
 
 
+class JobItemsPage(BaseModel):
+    """One page of the items of a batch job result (partial while the job runs)."""
+    job_id: str
+    status: JobStatus
+    job_type: str
+    summary: Optional[dict] = None
+    total: int
+    offset: int
+    limit: int
+    items: List[dict] = []
+
+
 # === API Status ===
 
 class APIStatus(BaseModel):
@@ -0,0 +1,197 @@
+"""
+FK94 Security Platform - AI Response Cache
+LRU + TTL cache for AI audit analyses, persisted in SQLite so it survives
+restarts. Entries are loaded into memory once at startup; lookups never
+touch the disk. Stores and expiries are written by a single writer thread,
+in order, so SQLite commits stay off the event loop. Hits only record
+last_used in memory; those timestamps are written in one batch every
+LAST_USED_FLUSH_SECONDS and on shutdown.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LAST_USED_FLUSH_SECONDS = 30.0
+
+
+def _get_connection(db_path: str) -> sqlite3.Connection:
+    return sqlite3.connect(db_path, check_same_thread=False)
+
+
+def make_key(*parts: object) -> str:
+    """Stable digest of JSON-serializable parts (dict key order does not matter)."""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class AICache:
+    def __init__(self, db_path: Optional[str], max_entries: int, ttl_seconds: int):
+        self.db_path = db_path
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at epoch, provider, response); most recently used last
+        self._entries: OrderedDict[str, tuple[float, str, str]] = OrderedDict()
+        self._persist = False
+        self.misses = 0
+        self._provider_stats: dict[str, dict[str, int]] = {}
+        # key -> last_used epoch, not yet written to SQLite
+        self._touched: dict[str, float] = {}
+        self._touched_since = time.monotonic()
+        # One thread, so writes reach SQLite in the order they were made
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-cache-writer")
+
+    def init_db(self) -> None:
+        """Create the table and warm memory with the most recently used live entries."""
+        if not self.db_path:
+            return
+        now = time.time()
+        with _get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ai_cache (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (now,))
+            rows = conn.execute(
+                "SELECT key, provider, response, expires_at FROM ai_cache ORDER BY last_used DESC LIMIT ?",
+                (self.max_entries,),
+            ).fetchall()
+            conn.commit()
+        self._entries.clear()
+        for key, provider, response, expires_at in reversed(rows):
+            self._entries[key] = (expires_at, provider, response)
+        self._persist = True
+        logger.info(f"AI cache loaded {len(rows)} entries")
+
+    def get(self, key: str) -> Optional[tuple[str, str]]:
+        """Return (provider, response) for a live entry, else None."""
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                self._delete(key)
+            self.misses += 1
+            metrics.CACHE_MISS["ai"].inc()
+            return None
+
+        self._entries.move_to_end(key)
+        _, provider, response = entry
+        self._stats_for(provider)["hits"] += 1
+        metrics.CACHE_HIT["ai"].inc()
+        if self._persist:
+            self._touched[key] = now
+            if time.monotonic() - self._touched_since >= LAST_USED_FLUSH_SECONDS:
+                self._flush_in_background()
+        return provider, response
+
+    def flush(self) -> None:
+        """Write pending last_used timestamps and wait for queued writes (e.g. on shutdown)."""
+        batch, self._touched = self._touched, {}
+        self._touched_since = time.monotonic()
+        self._writer.submit(self._write_last_used, batch).result()
+
+    def _flush_in_background(self) -> None:
+        batch, self._touched = self._touched, {}
+        self._touched_since = time.monotonic()
+        self._submit(self._write_last_used, batch)
+
+    def _submit(self, write, *args) -> None:
+        """Queue a write on the writer thread; outside an event loop, wait for it."""
+        future = self._writer.submit(write, *args)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            future.result()
+
+    def _write_last_used(self, batch: dict[str, float]) -> None:
+        if not batch:
+            return
+        try:
+            with _get_connection(self.db_path) as conn:
+                conn.executemany(
+                    "UPDATE ai_cache SET last_used = ? WHERE key = ?",
+                    [(last_used, key) for key, last_used in batch.items()],
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"AI cache last_used flush failed: {e}")
+
+    def put(self, key: str, provider: str, response: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._entries[key] = (expires_at, provider, response)
+        self._entries.move_to_end(key)
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            evicted.append(self._entries.popitem(last=False)[0])
+        self._stats_for(provider)["stores"] += 1
+
+        if self._persist:
+            self._submit(self._write_entry, (key, provider, response, expires_at, now), evicted)
+
+    def _write_entry(self, row: tuple, evicted: list[str]) -> None:
+        try:
+            with _get_connection(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ai_cache (key, provider, response, expires_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    row,
+                )
+                conn.executemany("DELETE FROM ai_cache WHERE key = ?", [(k,) for k in evicted])
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"AI cache store failed: {e}")
+
+    def _delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._touched.pop(key, None)
+        if self._persist:
+            self._submit(self._delete_rows, [key])
+
+    def _delete_rows(self, keys: list[str]) -> None:
+        try:
+            with _get_connection(self.db_path) as conn:
+                conn.executemany("DELETE FROM ai_cache WHERE key = ?", [(k,) for k in keys])
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"AI cache delete failed: {e}")
+
+    def _stats_for(self, provider: str) -> dict[str, int]:
+        return self._provider_stats.setdefault(provider, {"hits": 0, "stores": 0})
+
+    def stats(self) -> dict:
+        hits = sum(s["hits"] for s in self._provider_stats.values())
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "providers": {name: dict(s) for name, s in self._provider_stats.items()},
+        }
+
+
+# Singleton instance
+ai_cache = AICache(
+    settings.AI_CACHE_DB_PATH,
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+)
@@ -4,14 +4,18 @@ FK94 Security Platform - Audit Runner
 from datetime import datetime, timezone
 import logging
 
+from app.core import tracing
+from app.core.config import settings
 from app.models.schemas import (
     AuditResult,
+    AuditTimings,
     AuditType,
     FullAuditRequest,
     MultiAuditRequest,
     RiskLevel,
     SecurityScore,
 )
+from app.services import job_store
 from app.services.deepseek_service import deepseek_service
 from app.services.multi_audit_service import (
     check_domain,
@@ -27,8 +31,41 @@ from app.services.scoring_service import scoring_service
 logger = logging.getLogger(__name__)
 
 
+async def _ai_analysis_fields(audit_data: dict, defer: bool) -> dict:
+    """
+    AI analysis for an audit, inline or deferred to an `ai_analysis` job.
+    Returns the AuditResult fields to set. Deferral needs the job worker;
+    without it the analysis runs inline.
+    """
+    if defer and settings.ENABLE_JOB_WORKER:
+        from app.services.job_worker import job_worker
+
+        job = job_store.create_job(
+            db_path=settings.JOB_DB_PATH,
+            job_type="ai_analysis",
+            payload={"audit_data": audit_data},
+        )
+        job_worker.wake()
+        return {"ai_analysis_status": "pending", "ai_job_id": job["id"]}
+
+    try:
+        ai_analysis = await deepseek_service.analyze_audit(audit_data)
+        return {"ai_analysis": ai_analysis, "ai_analysis_status": "completed"}
+    except Exception as e:
+        logger.warning("AI analysis failed: %s", e)
+        return {"ai_analysis_status": "failed"}
+
+
 async def run_full_audit(request: FullAuditRequest) -> AuditResult:
     """Run comprehensive security audit on an email."""
+    with tracing.collect(request.include_timings) as trace:
+        result = await _run_full_audit(request)
+    if trace is not None:
+        result.timings = AuditTimings.model_validate(trace.timings())
+    return result
+
+
+async def _run_full_audit(request: FullAuditRequest) -> AuditResult:
     audit_id = str(datetime.now(timezone.utc).timestamp()).replace(".", "")[-8:]
     email = request.email
 
@@ -66,13 +103,13 @@ async def run_full_audit(request: FullAuditRequest) -> AuditResult:
             logger.warning("OSINT check failed for %s: %s", email, e)
             service_warnings.append("OSINT provider temporarily unavailable")
 
-    security_score = scoring_service.calculate_score(
-        breach_result=breach_result,
-        password_exposure=password_exposure,
-        osint_result=osint_result,
-    )
-
-    recommendations = scoring_service.get_recommendations(security_score, breach_result)
+    with tracing.span("scoring"):
+        security_score = scoring_service.calculate_score(
+            breach_result=breach_result,
+            password_exposure=password_exposure,
+            osint_result=osint_result,
+        )
+        recommendations = scoring_service.get_recommendations(security_score, breach_result)
 
     audit_data = {
         "email": email,
@@ -82,11 +119,8 @@ async def run_full_audit(request: FullAuditRequest) -> AuditResult:
         "osint_result": osint_result.model_dump() if osint_result else None,
     }
 
-    ai_analysis = None
-    try:
-        ai_analysis = await deepseek_service.analyze_audit(audit_data)
-    except Exception as e:
-        logger.warning("AI analysis failed for %s: %s", email, e)
+    ai_fields = await _ai_analysis_fields(audit_data, request.defer_ai)
+    if ai_fields["ai_analysis_status"] == "failed":
         service_warnings.append("AI analysis temporarily unavailable")
 
     if service_warnings:
@@ -104,13 +138,21 @@ async def run_full_audit(request: FullAuditRequest) -> AuditResult:
         breach_check=breach_result,
         password_exposure=password_exposure,
         osint_result=osint_result,
-        ai_analysis=ai_analysis,
         recommendations=recommendations,
+        **ai_fields,
     )
 
 
 async def run_multi_audit(request: MultiAuditRequest) -> AuditResult:
     """Run audit on different data types: username, phone, domain, name, IP, wallet."""
+    with tracing.collect(request.include_timings) as trace:
+        result = await _run_multi_audit(request)
+    if trace is not None:
+        result.timings = AuditTimings.model_validate(trace.timings())
+    return result
+
+
+async def _run_multi_audit(request: MultiAuditRequest) -> AuditResult:
     audit_id = str(datetime.now(timezone.utc).timestamp()).replace(".", "")[-8:]
     audit_type = request.audit_type
     value = request.value
@@ -141,7 +183,8 @@ async def run_multi_audit(request: MultiAuditRequest) -> AuditResult:
         risk_level = ip_result.risk_level
     elif audit_type == AuditType.WALLET:
         chain = request.extra_data.get("chain", "ethereum") if request.extra_data else "ethereum"
-        wallet_result = await check_wallet(value, chain)
+        chains = request.extra_data.get("chains") if request.extra_data else None
+        wallet_result = await check_wallet(value, chain, chains)
         risk_level = wallet_result.risk_level
     else:
         raise ValueError(f"Unsupported audit type: {audit_type}")
@@ -189,7 +232,7 @@ async def run_multi_audit(request: MultiAuditRequest) -> AuditResult:
         "wallet_result": wallet_result.model_dump() if wallet_result else None,
     }
 
-    ai_analysis = await deepseek_service.analyze_audit(audit_data)
+    ai_fields = await _ai_analysis_fields(audit_data, request.defer_ai)
 
     return AuditResult(
         id=audit_id,
@@ -203,8 +246,8 @@ async def run_multi_audit(request: MultiAuditRequest) -> AuditResult:
         name_result=name_result,
         ip_result=ip_result,
         wallet_result=wallet_result,
-        ai_analysis=ai_analysis,
         recommendations=recommendations,
+        **ai_fields,
     )
 
 
@@ -0,0 +1,127 @@
+"""
+FK94 Security Platform - Batch Report Generation
+Runs many audits under a concurrency budget, renders their PDFs through the
+render pool / report store, and appends each one to a ZIP archive on disk as
+soon as it is ready.
+
+The archive is written in streaming mode (data descriptors, no seeking back),
+so the file only ever grows and a client can download it while it is built.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import zipfile
+from typing import Optional
+
+from app.core.config import settings
+from app.models.schemas import AuditResult, BatchReportRequest, FullAuditRequest
+from app.services import job_store
+from app.services.audit_runner import run_full_audit
+from app.services.job_events import job_events, progress_event
+from app.services.pdf_renderer import RenderQueueFull
+from app.services.report_store import report_store
+
+logger = logging.getLogger(__name__)
+
+RENDER_RETRIES = 5
+RENDER_RETRY_SECONDS = 1.0
+
+
+class _AppendOnlyFile:
+    """Write-only file wrapper without tell/seek, which makes ZipFile stream entries."""
+
+    def __init__(self, f):
+        self._f = f
+
+    def write(self, data: bytes) -> int:
+        return self._f.write(data)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+
+def archive_path(job_id: str) -> str:
+    return os.path.join(settings.BATCH_REPORT_DIR, f"{job_id}.zip")
+
+
+def _entry_name(index: int, label: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9._-]+", "_", label).strip("_") or "report"
+    return f"{index:03d}_{safe[:80]}.pdf"
+
+
+async def _load_audit(source: str, value: str) -> AuditResult:
+    if source == "email":
+        return await run_full_audit(FullAuditRequest(email=value))
+
+    job = job_store.get_job(settings.JOB_DB_PATH, value)
+    if not job or job["job_type"] not in ("full_audit", "multi_audit"):
+        raise ValueError("Audit job not found")
+    if job["status"] != "completed" or not job["result"]:
+        raise ValueError(f"Audit job is {job['status']}")
+    return AuditResult.model_validate(job["result"])
+
+
+async def _render(audit: AuditResult) -> tuple[str, str]:
+    for attempt in range(RENDER_RETRIES):
+        try:
+            return await report_store.get_or_render(audit)
+        except RenderQueueFull:
+            if attempt == RENDER_RETRIES - 1:
+                raise
+            await asyncio.sleep(RENDER_RETRY_SECONDS * (attempt + 1))
+
+
+async def _build_item(index: int, source: str, value: str, slots: asyncio.Semaphore) -> dict:
+    item = {"index": index, "source": source, "value": value}
+    async with slots:
+        try:
+            audit = await _load_audit(source, value)
+            digest, path = await _render(audit)
+            item.update(digest=digest, path=path, file=_entry_name(index, audit.query_value or value))
+        except Exception as exc:
+            logger.warning(f"Batch report item {source}:{value} failed: {exc}")
+            item["error"] = str(exc)[:200]
+    return item
+
+
+async def run_batch_report(request: BatchReportRequest, job_id: str, db_path: Optional[str] = None) -> dict:
+    """Build the archive for a batch_report job; progress is written to the job row."""
+    db_path = db_path or settings.JOB_DB_PATH
+    sources = [("email", e) for e in dict.fromkeys(e.lower() for e in request.emails)]
+    sources += [("job", j) for j in dict.fromkeys(request.job_ids)]
+
+    slots = asyncio.Semaphore(max(1, settings.BATCH_REPORT_CONCURRENCY))
+    tasks = [
+        asyncio.create_task(_build_item(i, source, value, slots))
+        for i, (source, value) in enumerate(sources, 1)
+    ]
+
+    path = archive_path(job_id)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    manifest: list[dict] = []
+    progress = {"total": len(tasks), "done": 0, "failed": 0, "archive": f"{job_id}.zip"}
+
+    with open(path, "wb") as raw, zipfile.ZipFile(_AppendOnlyFile(raw), "w", zipfile.ZIP_DEFLATED) as archive:
+        try:
+            # Append in completion order so fast items are downloadable first
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                if "error" in item:
+                    progress["failed"] += 1
+                else:
+                    await asyncio.to_thread(archive.write, item.pop("path"), item["file"])
+                    raw.flush()
+                progress["done"] += 1
+                manifest.append(item)
+                await asyncio.to_thread(job_store.update_job, db_path, job_id, result=dict(progress))
+                job_events.publish(progress_event(job_id, "batch_report", dict(progress)))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        manifest.sort(key=lambda item: item["index"])
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False))
+
+    return {**progress, "items": manifest}
@@ -0,0 +1,486 @@
+"""
+FK94 Security Platform - Chain Adapters
+Per-chain history and balance fetchers behind a common scanner interface.
+Each adapter owns its connection pool and rate limiter, so scanning the same
+address on several chains runs concurrently without one provider's limits
+throttling another.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import httpx
+
+from app.core import tracing
+from app.core.config import settings
+from app.services.rate_limiter import AsyncRateLimiter
+from app.services.wallet_deep_scan import (
+    BLOCKSCOUT_DECODERS,
+    ETHERSCAN_DECODERS,
+    KNOWN_EXCHANGE_ADDRESSES_ETH,
+    KNOWN_EXCHANGE_ADDRESSES_SOL,
+    TORNADO_CASH_ADDRESSES,
+    TxColumns,
+    classify_columns,
+    decode_solana_txs,
+    merge_columns,
+)
+
+logger = logging.getLogger(__name__)
+
+ETHERSCAN_V2_API = "https://api.etherscan.io/v2/api"
+
+# Listing path + extra params per history stream on Blockscout v2
+_BLOCKSCOUT_STREAMS = {
+    "transactions": ("transactions", {}),
+    "token_transfers": ("token-transfers", {"type": "ERC-20"}),
+    "internal": ("internal-transactions", {}),
+}
+# Etherscan V2 account action per history stream
+_ETHERSCAN_STREAMS = {
+    "transactions": "txlist",
+    "token_transfers": "tokentx",
+    "internal": "txlistinternal",
+}
+
+
+class ChainAdapter(ABC):
+    """
+    Common scanner interface. Subclasses must implement:
+    - fetch_balance(address) -> formatted native balance or None
+    - fetch_history(address, warnings) -> {stream_key: raw items}
+    - normalize_tx(address, stream_key, raw items) -> TxColumns
+    """
+
+    chain: str = ""
+    native_symbol: str = ""
+
+    def __init__(
+        self,
+        *,
+        exchange_labels: dict[str, str],
+        mixer_labels: Optional[dict[str, str]] = None,
+        rate_per_second: float = 5.0,
+        burst: int = 5,
+        timeout: float = 30.0,
+    ) -> None:
+        self.exchange_labels = exchange_labels
+        self.mixer_labels = mixer_labels or {}
+        self._limiter = AsyncRateLimiter(rate_per_second, burst=burst)
+        self._timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled client, created on first use and reused across scans."""
+        if self._client is None or self._client.is_closed:
+            max_connections = settings.CHAIN_MAX_CONNECTIONS
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+        return self._client
+
+    async def _get(self, url: str, params: Optional[dict] = None) -> httpx.Response:
+        await self._limiter.acquire()
+        return await self.client.get(url, params=params)
+
+    async def _post(self, url: str, json: object) -> httpx.Response:
+        await self._limiter.acquire()
+        return await self.client.post(url, json=json)
+
+    def canonical_address(self, address: str) -> str:
+        return address
+
+    @abstractmethod
+    async def fetch_balance(self, address: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def fetch_history(self, address: str, warnings: list[str]) -> dict[str, list[dict]]:
+        ...
+
+    @abstractmethod
+    def normalize_tx(self, address: str, stream: str, raw: list[dict]) -> TxColumns:
+        ...
+
+    async def scan(self, address: str) -> dict:
+        """Fetch balance and history concurrently, then classify in one pass."""
+        address = self.canonical_address(address)
+        warnings: list[str] = []
+
+        with tracing.span("chain.fetch", chain=self.chain):
+            balance, streams = await asyncio.gather(
+                self.fetch_balance(address),
+                self.fetch_history(address, warnings),
+                return_exceptions=True,
+            )
+        if isinstance(balance, Exception):
+            logger.warning("%s balance lookup failed: %s", self.chain, balance)
+            balance = None
+        if isinstance(streams, Exception):
+            warnings.append(f"{self.chain} history error: {str(streams)[:60]}")
+            streams = {}
+
+        with tracing.span("chain.classify", chain=self.chain) as span:
+            cols = merge_columns(
+                [self.normalize_tx(address, name, raw) for name, raw in streams.items()],
+                address,
+            )
+            result = classify_columns(
+                cols, address, self.exchange_labels, self.mixer_labels, self.chain
+            )
+            span.set("transactions", result["tx_count"])
+        result["chain"] = self.chain
+        result["balance"] = balance
+        result["warnings"] = warnings
+        return result
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+class EVMAdapter(ChainAdapter):
+    """
+    EVM chains: Blockscout v2 (free) first, Etherscan V2 multichain API as
+    fallback when ETHERSCAN_API_KEY is set. Normal transactions, ERC-20
+    transfers and internal transactions are fetched concurrently.
+    """
+
+    def __init__(
+        self,
+        chain: str,
+        *,
+        native_symbol: str,
+        blockscout_api: Optional[str],
+        etherscan_chain_id: int,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.chain = chain
+        self.native_symbol = native_symbol
+        self.blockscout_api = blockscout_api
+        self.etherscan_chain_id = etherscan_chain_id
+
+    def canonical_address(self, address: str) -> str:
+        return address.lower()
+
+    async def fetch_balance(self, address: str) -> Optional[str]:
+        if self.blockscout_api:
+            try:
+                resp = await self._get(f"{self.blockscout_api}/addresses/{address}")
+                if resp.status_code == 200:
+                    coin_bal = resp.json().get("coin_balance")
+                    if coin_bal:
+                        return f"{int(coin_bal) / 1e18:.6f} {self.native_symbol}"
+            except (ValueError, TypeError, httpx.HTTPError):
+                pass
+
+        api_key = settings.ETHERSCAN_API_KEY
+        if api_key:
+            try:
+                resp = await self._get(ETHERSCAN_V2_API, params={
+                    "chainid": self.etherscan_chain_id, "module": "account", "action": "balance",
+                    "address": address, "tag": "latest", "apikey": api_key,
+                })
+                if resp.status_code == 200:
+                    data = resp.json()
+                    if data.get("status") == "1":
+                        return f"{int(data.get('result', 0)) / 1e18:.6f} {self.native_symbol}"
+            except (ValueError, TypeError, httpx.HTTPError):
+                pass
+        return None
+
+    async def _fetch_blockscout_items(
+        self, address: str, path: str, base_params: dict, max_pages: int = 10
+    ) -> list[dict]:
+        """Fetch a paginated Blockscout v2 address listing (50 items per page)."""
+        items_out: list[dict] = []
+        url = f"{self.blockscout_api}/addresses/{address}/{path}"
+        next_page_params = None
+
+        for _ in range(max_pages):
+            params = dict(base_params)
+            if next_page_params:
+                params.update(next_page_params)
+            resp = await self._get(url, params=params)
+            if resp.status_code != 200:
+                break
+            data = resp.json()
+            items = data.get("items", [])
+            if not items:
+                break
+            items_out.extend(items)
+            next_page_params = data.get("next_page_params")
+            if not next_page_params:
+                break
+
+        return items_out
+
+    async def _fetch_etherscan_list(self, address: str, action: str, api_key: str) -> list[dict]:
+        """Fetch an account listing (txlist/tokentx/txlistinternal) from Etherscan V2."""
+        resp = await self._get(ETHERSCAN_V2_API, params={
+            "chainid": self.etherscan_chain_id,
+            "module": "account",
+            "action": action,
+            "address": address,
+            "startblock": 0,
+            "endblock": 99999999,
+            "page": 1,
+            "offset": 10000,
+            "sort": "asc",
+            "apikey": api_key,
+        })
+        if resp.status_code == 200:
+            result = resp.json().get("result", [])
+            if isinstance(result, list):
+                return result
+        return []
+
+    @staticmethod
+    async def _gather_streams(fetchers: dict, warnings: list[str], source: str) -> dict[str, list[dict]]:
+        """Run per-stream fetches concurrently; failures become warnings."""
+        results = await asyncio.gather(*fetchers.values(), return_exceptions=True)
+        streams: dict[str, list[dict]] = {}
+        for name, result in zip(fetchers, results):
+            if isinstance(result, Exception):
+                warnings.append(f"{source} {name.split(':', 1)[1]} error: {str(result)[:60]}")
+                streams[name] = []
+            else:
+                streams[name] = result
+        return streams
+
+    async def fetch_history(self, address: str, warnings: list[str]) -> dict[str, list[dict]]:
+        streams: dict[str, list[dict]] = {}
+        if self.blockscout_api:
+            streams = await self._gather_streams(
+                {
+                    f"blockscout:{name}": self._fetch_blockscout_items(address, path, params)
+                    for name, (path, params) in _BLOCKSCOUT_STREAMS.items()
+                },
+                warnings,
+                "Blockscout",
+            )
+
+        api_key = settings.ETHERSCAN_API_KEY
+        if not any(streams.values()) and api_key:
+            streams = await self._gather_streams(
+                {
+                    f"etherscan:{name}": self._fetch_etherscan_list(address, action, api_key)
+                    for name, action in _ETHERSCAN_STREAMS.items()
+                },
+                warnings,
+                "Etherscan",
+            )
+        elif not self.blockscout_api and not api_key:
+            warnings.append(f"Deep scan for {self.chain} requires ETHERSCAN_API_KEY")
+
+        return streams
+
+    def normalize_tx(self, address: str, stream: str, raw: list[dict]) -> TxColumns:
+        source, name = stream.split(":", 1)
+        decoders = BLOCKSCOUT_DECODERS if source == "blockscout" else ETHERSCAN_DECODERS
+        return decoders[name](raw, self.native_symbol)
+
+
+class SolanaAdapter(ChainAdapter):
+    """
+    Solana via JSON-RPC: `getSignaturesForAddress`, then the parsed
+    transactions in batched `getTransaction` requests.
+    """
+
+    chain = "solana"
+    native_symbol = "SOL"
+    TX_BATCH_SIZE = 25
+
+    def __init__(self, rpc_url: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.rpc_url = rpc_url
+
+    async def _rpc(self, method: str, params: list) -> object:
+        resp = await self._post(
+            self.rpc_url, {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("error"):
+            raise ValueError(f"Solana RPC {method}: {data['error'].get('message', data['error'])}")
+        return data.get("result")
+
+    async def _get_transactions(self, signatures: list[str]) -> list[dict]:
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "getTransaction",
+                "params": [sig, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}],
+            }
+            for i, sig in enumerate(signatures)
+        ]
+        resp = await self._post(self.rpc_url, batch)
+        resp.raise_for_status()
+        return [item.get("result") for item in resp.json() if item.get("result")]
+
+    async def fetch_balance(self, address: str) -> Optional[str]:
+        result = await self._rpc("getBalance", [address])
+        lamports = (result or {}).get("value")
+        if lamports is None:
+            return None
+        return f"{lamports / 1e9:.6f} SOL"
+
+    async def fetch_history(self, address: str, warnings: list[str]) -> dict[str, list[dict]]:
+        limit = settings.SOLANA_MAX_SIGNATURES
+        signatures = await self._rpc("getSignaturesForAddress", [address, {"limit": limit}]) or []
+        sigs = [s["signature"] for s in signatures if s.get("signature") and not s.get("err")]
+        if len(signatures) >= limit:
+            warnings.append(f"Solana history truncated to the latest {limit} transactions")
+
+        chunks = [sigs[i:i + self.TX_BATCH_SIZE] for i in range(0, len(sigs), self.TX_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self._get_transactions(chunk) for chunk in chunks), return_exceptions=True
+        )
+        txs: list[dict] = []
+        for result in results:
+            if isinstance(result, Exception):
+                warnings.append(f"Solana transaction batch error: {str(result)[:60]}")
+            else:
+                txs.extend(result)
+        return {"transactions": txs}
+
+    def normalize_tx(self, address: str, stream: str, raw: list[dict]) -> TxColumns:
+        return decode_solana_txs(raw, address)
+
+
+# Exchange hot wallets are EOAs, so their labels hold on every EVM chain.
+# Tornado Cash pool addresses differ per chain; only mainnet ones are labelled.
+EVM_CHAINS: dict[str, dict] = {
+    "ethereum": {
+        "native_symbol": "ETH",
+        "blockscout_api": "https://eth.blockscout.com/api/v2",
+        "etherscan_chain_id": 1,
+        "mixer_labels": TORNADO_CASH_ADDRESSES,
+    },
+    "arbitrum": {
+        "native_symbol": "ETH",
+        "blockscout_api": "https://arbitrum.blockscout.com/api/v2",
+        "etherscan_chain_id": 42161,
+    },
+    "base": {
+        "native_symbol": "ETH",
+        "blockscout_api": "https://base.blockscout.com/api/v2",
+        "etherscan_chain_id": 8453,
+    },
+    "optimism": {
+        "native_symbol": "ETH",
+        "blockscout_api": "https://optimism.blockscout.com/api/v2",
+        "etherscan_chain_id": 10,
+    },
+    "polygon": {
+        "native_symbol": "POL",
+        "blockscout_api": "https://polygon.blockscout.com/api/v2",
+        "etherscan_chain_id": 137,
+    },
+    "bsc": {
+        "native_symbol": "BNB",
+        "blockscout_api": None,
+        "etherscan_chain_id": 56,
+    },
+}
+
+_adapters: dict[str, ChainAdapter] = {}
+
+
+def _build_adapter(chain: str) -> ChainAdapter:
+    if chain in EVM_CHAINS:
+        config = dict(EVM_CHAINS[chain])
+        return EVMAdapter(
+            chain,
+            exchange_labels=KNOWN_EXCHANGE_ADDRESSES_ETH,
+            rate_per_second=settings.EVM_RATE_LIMIT_PER_SECOND,
+            burst=int(settings.EVM_RATE_LIMIT_PER_SECOND),
+            **config,
+        )
+    if chain == "solana":
+        return SolanaAdapter(
+            settings.SOLANA_RPC_URL,
+            exchange_labels=KNOWN_EXCHANGE_ADDRESSES_SOL,
+            rate_per_second=settings.SOLANA_RATE_LIMIT_PER_SECOND,
+            burst=int(settings.SOLANA_RATE_LIMIT_PER_SECOND),
+        )
+    raise ValueError(f"No chain adapter for {chain}")
+
+
+def get_adapter(chain: str) -> ChainAdapter:
+    """Return the process-wide adapter for a chain (created on first use)."""
+    adapter = _adapters.get(chain)
+    if adapter is None:
+        adapter = _adapters[chain] = _build_adapter(chain)
+    return adapter
+
+
+async def close_adapters() -> None:
+    for adapter in _adapters.values():
+        await adapter.close()
+
+
+async def scan_evm_chains(address: str, chains: list[str]) -> dict:
+    """
+    Scan the same EVM address on several chains concurrently and merge the
+    results. Per-chain balance and activity are kept in `chain_breakdown`.
+    """
+    results = await asyncio.gather(
+        *(get_adapter(chain).scan(address) for chain in chains), return_exceptions=True
+    )
+
+    merged: dict = {
+        "balance": None,
+        "tx_count": 0,
+        "exchange_interactions": [],
+        "exchanges_detected": set(),
+        "exchange_volume": {},
+        "mixer_interactions": [],
+        "used_mixer": False,
+        "counterparties": 0,
+        "first_tx_date": None,
+        "last_tx_date": None,
+        "warnings": [],
+        "chains_scanned": [],
+        "chain_breakdown": {},
+    }
+    for chain, result in zip(chains, results):
+        if isinstance(result, Exception):
+            merged["warnings"].append(f"{chain} scan error: {str(result)[:60]}")
+            continue
+        merged["chains_scanned"].append(chain)
+        merged["chain_breakdown"][chain] = {
+            "balance": result["balance"],
+            "tx_count": result["tx_count"],
+            "exchanges_detected": result["exchanges_detected"],
+        }
+        if merged["balance"] is None:
+            merged["balance"] = result["balance"]
+        merged["tx_count"] += result["tx_count"]
+        merged["exchange_interactions"].extend(result["exchange_interactions"])
+        merged["exchanges_detected"].update(result["exchanges_detected"])
+        for name, per_asset in result["exchange_volume"].items():
+            target = merged["exchange_volume"].setdefault(name, {})
+            for asset, amount in per_asset.items():
+                target[asset] = round(target.get(asset, 0.0) + amount, 6)
+        merged["mixer_interactions"].extend(result["mixer_interactions"])
+        merged["used_mixer"] = merged["used_mixer"] or result["used_mixer"]
+        merged["counterparties"] += result["counterparties"]
+        for key, pick in (("first_tx_date", min), ("last_tx_date", max)):
+            values = [v for v in (merged[key], result[key]) if v]
+            merged[key] = pick(values) if values else None
+        merged["warnings"].extend(f"[{chain}] {w}" for w in result["warnings"])
+
+    merged["exchanges_detected"] = sorted(merged["exchanges_detected"])
+    return merged
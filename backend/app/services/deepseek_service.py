@@ -1,9 +1,15 @@
 """
 FK94 Security Platform - DeepSeek AI Service
 """
+import asyncio
+import logging
 import httpx
 from typing import Optional
+from app.core import tracing
 from app.core.config import settings
+from app.services.ai_cache import ai_cache, make_key
+
+logger = logging.getLogger(__name__)
 
 
 SYSTEM_PROMPT = """Eres el asistente de FK94 Security. Respondés de forma CORTA y DIRECTA.
@@ -17,8 +23,17 @@ REGLAS:
 - Respondé en español"""
 
 
+def _count_bucket(n: int) -> str:
+    """0, 1, 2-3, 4-7, 8-15, ... (powers of two)."""
+    if n <= 1:
+        return str(max(n, 0))
+    low = 1 << (n.bit_length() - 1)
+    return f"{low}-{2 * low - 1}"
+
+
 class DeepSeekService:
     def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
         # Build ordered list of AI providers for fallback
         self.providers = []
         if settings.AI_API_KEY:
@@ -36,8 +51,10 @@ class DeepSeekService:
                 "model": settings.DEEPSEEK_MODEL,
             })
 
+    @tracing.traced("ai.provider")
     async def _call_provider(self, provider: dict, messages: list) -> str:
         """Call a single AI provider and return the response text."""
+        tracing.annotate("provider", provider["name"])
         async with httpx.AsyncClient() as client:
             response = await client.post(
                 f"{provider['base_url']}/v1/chat/completions",
@@ -58,17 +75,18 @@ class DeepSeekService:
             try:
                 return data["choices"][0]["message"]["content"]
             except (KeyError, IndexError, TypeError):
-                import logging
-                logging.getLogger(__name__).error(f"Unexpected AI response format: {str(data)[:200]}")
+                logger.error(f"Unexpected AI response format: {str(data)[:200]}")
                 raise ValueError("Unexpected response format from AI provider")
 
     async def analyze(self, prompt: str, context: Optional[dict] = None) -> str:
         """Send a prompt to AI and get analysis, with automatic provider fallback."""
-        import logging
-        logger = logging.getLogger(__name__)
+        text, _ = await self._complete(prompt, context)
+        return text
 
+    async def _complete(self, prompt: str, context: Optional[dict] = None) -> tuple[str, Optional[str]]:
+        """Like analyze(), but also return the provider that answered (None for fallbacks)."""
         if not self.providers:
-            return "Error: AI API key not configured (AI_API_KEY o DEEPSEEK_API_KEY)"
+            return "Error: AI API key not configured (AI_API_KEY o DEEPSEEK_API_KEY)", None
 
         # Build context message if audit data provided
         context_msg = ""
@@ -89,13 +107,13 @@ class DeepSeekService:
         for provider in self.providers:
             try:
                 result = await self._call_provider(provider, messages)
-                return result
+                return result, provider["name"]
             except Exception as e:
                 last_error = e
                 logger.warning(f"AI provider {provider['name']} failed: {e}, trying next...")
 
         logger.error(f"All AI providers failed. Last error: {last_error}")
-        return self._static_fallback(context)
+        return self._static_fallback(context), None
 
     def _static_fallback(self, context: Optional[dict] = None) -> str:
         """Generate a static fallback response when all AI providers are unavailable."""
@@ -133,6 +151,7 @@ class DeepSeekService:
 
         return "\n".join(parts)
 
+    @tracing.traced("ai.analyze_audit")
     async def analyze_audit(self, audit_result: dict) -> str:
         """Analyze full audit result and provide recommendations"""
 
@@ -151,7 +170,100 @@ class DeepSeekService:
 
 Máximo 150 palabras total."""
 
-        return await self.analyze(prompt, context=audit_result)
+        if not settings.AI_CACHE_ENABLED:
+            tracing.annotate("cache", "disabled")
+            return await self.analyze(prompt, context=audit_result)
+
+        # Audits with the same bucketed shape share one analysis. The audited
+        # identifiers are swapped for placeholders before storing, so a cached
+        # answer never carries another user's email or address.
+        identifiers = self._identifiers(audit_result)
+        key = make_key(SYSTEM_PROMPT, prompt, self._semantic_context(audit_result))
+        cached = ai_cache.get(key)
+        if cached:
+            tracing.annotate("cache", "hit")
+            return self._restore_identifiers(cached[1], identifiers)
+
+        # Concurrent audits with the same shape share one provider call
+        future = self._inflight.get(key)
+        tracing.annotate("cache", "shared" if future else "miss")
+        if future is None:
+            future = asyncio.ensure_future(self._analyze_and_store(key, prompt, audit_result, identifiers))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        scrubbed = await asyncio.shield(future)
+        return self._restore_identifiers(scrubbed, identifiers)
+
+    async def _analyze_and_store(self, key: str, prompt: str, audit_result: dict, identifiers: list[str]) -> str:
+        text, provider = await self._complete(prompt, context=audit_result)
+        scrubbed = self._scrub_identifiers(text, identifiers)
+        if provider:
+            ai_cache.put(key, provider, scrubbed)
+        return scrubbed
+
+    @staticmethod
+    def _identifiers(data: dict) -> list[str]:
+        """Values that identify the audited subject and must not be shared via the cache."""
+        wallet = data.get("wallet_result") or {}
+        values = [data.get("email"), data.get("value"), wallet.get("address")]
+        # Longest first so an email is replaced before a substring of it
+        return sorted({v for v in values if isinstance(v, str) and v}, key=len, reverse=True)
+
+    @staticmethod
+    def _scrub_identifiers(text: str, identifiers: list[str]) -> str:
+        for i, identifier in enumerate(identifiers):
+            text = text.replace(identifier, f"[[id{i}]]")
+        return text
+
+    @staticmethod
+    def _restore_identifiers(text: str, identifiers: list[str]) -> str:
+        for i, identifier in enumerate(identifiers):
+            text = text.replace(f"[[id{i}]]", identifier)
+        return text
+
+    def _semantic_context(self, data: dict) -> dict:
+        """
+        Canonical, bucketed view of what _build_context sends to the model:
+        same fields, minus identifiers, balances and exact dates, with counts
+        rounded into buckets so near-identical audits share a key.
+        """
+        key: dict = {"audit_type": data.get("audit_type", "email")}
+
+        score = data.get("security_score") or {}
+        score_val = score.get("score")
+        key["score"] = score_val // 10 * 10 if isinstance(score_val, int) else None
+        key["risk_level"] = score.get("risk_level")
+
+        bc = data.get("breach_check")
+        if bc:
+            key["breaches"] = _count_bucket(bc.get("breach_count", 0))
+            key["breach_names"] = sorted(b.get("name", "Unknown") for b in (bc.get("breaches") or [])[:5])
+
+        pe = data.get("password_exposure")
+        if pe and pe.get("found"):
+            key["password_exposed"] = _count_bucket(pe.get("count") or 0)
+
+        osint = data.get("osint_result")
+        if osint:
+            key["social_profiles"] = _count_bucket(len(osint.get("social_profiles") or []))
+            key["data_brokers"] = _count_bucket(len(osint.get("data_brokers") or []))
+
+        wr = data.get("wallet_result")
+        if wr:
+            key["wallet"] = {
+                "chain": wr.get("chain"),
+                "transactions": _count_bucket(wr.get("transaction_count") or 0),
+                "traceability": (wr.get("traceability_score") or 0) // 10 * 10,
+                "is_traceable": bool(wr.get("is_traceable")),
+                "exchanges": sorted(wr.get("exchanges_detected") or []),
+                "exchange_interactions": _count_bucket(len(wr.get("exchange_interactions") or [])),
+                "used_mixer": bool(wr.get("used_mixer")),
+                "ofac_sanctioned": bool(wr.get("ofac_sanctioned")),
+                "counterparties": _count_bucket(wr.get("unique_counterparties") or 0),
+                "active_years": [(wr.get("first_tx_date") or "")[:4], (wr.get("last_tx_date") or "")[:4]],
+            }
+
+        return key
 
     async def chat(self, message: str, history: list = None) -> str:
         """General security chat"""
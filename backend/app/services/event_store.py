@@ -48,7 +48,17 @@ def init_db(db_path: str) -> None:
             )
             """
         )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sync_cursors (
+                name TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                event_id TEXT NOT NULL
+            )
+            """
+        )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_events_type_created ON events(event_type, created_at DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_created_id ON events(created_at, id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_leads_email_created ON leads(email, created_at DESC)")
         conn.commit()
 
@@ -124,3 +134,55 @@ def count_events(db_path: str, event_type: Optional[str] = None) -> int:
         else:
             row = conn.execute("SELECT COUNT(*) FROM events").fetchone()
     return int(row[0]) if row else 0
+
+
+def fetch_user_events_after(
+    db_path: str,
+    cursor: Optional[tuple[str, str]] = None,
+    limit: int = 500,
+) -> list[dict]:
+    """Events with a user_id, ordered by (created_at, id), strictly after cursor."""
+    created_at, event_id = cursor or ("", "")
+    with _get_connection(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, event_type, user_id, session_id, source, payload, created_at
+            FROM events
+            WHERE user_id IS NOT NULL
+              AND (created_at > ? OR (created_at = ? AND id > ?))
+            ORDER BY created_at ASC, id ASC
+            LIMIT ?
+            """,
+            (created_at, created_at, event_id, limit),
+        ).fetchall()
+
+    return [
+        {
+            "id": row[0],
+            "event_type": row[1],
+            "user_id": row[2],
+            "session_id": row[3],
+            "source": row[4],
+            "payload": json.loads(row[5]),
+            "created_at": row[6],
+        }
+        for row in rows
+    ]
+
+
+def get_sync_cursor(db_path: str, name: str) -> Optional[tuple[str, str]]:
+    with _get_connection(db_path) as conn:
+        row = conn.execute("SELECT created_at, event_id FROM sync_cursors WHERE name = ?", (name,)).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def set_sync_cursor(db_path: str, name: str, created_at: str, event_id: str) -> None:
+    with _get_connection(db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO sync_cursors (name, created_at, event_id) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET created_at = excluded.created_at, event_id = excluded.event_id
+            """,
+            (name, created_at, event_id),
+        )
+        conn.commit()
@@ -0,0 +1,114 @@
+"""
+FK94 Security Platform - Job Completion Callbacks
+POSTs the job event (status fields, not the result) to the callback_url
+registered at enqueue time once the job completes or fails. When
+JOB_CALLBACK_SECRET is set the body is signed with HMAC-SHA256 in the
+X-FK94-Signature header. Failed deliveries are retried with exponential
+backoff; attempts and the last error are kept in job_callbacks.
+
+The callback host is resolved on every attempt and refused unless all of its
+addresses are public; the request then goes to the checked IP (TLS still
+verified against the hostname), so DNS tricks cannot reach internal services.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.services import job_store
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-FK94-Signature"
+
+
+def sign(body: bytes, secret: str) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class CallbackRefused(Exception):
+    """The callback URL points at a non-public address."""
+
+
+def _retryable(status_code: int) -> bool:
+    return status_code >= 500 or status_code in (408, 429)
+
+
+async def _resolve_host(host: str, port: int) -> list[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def _pin_url(url: str) -> tuple[str, str, str]:
+    """
+    (URL with the host replaced by a checked public IP, Host header, TLS
+    server name). Raises CallbackRefused when any resolved address is not global.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    addresses = await _resolve_host(host, port)
+    if not addresses or any(not ipaddress.ip_address(a.split("%")[0]).is_global for a in addresses):
+        raise CallbackRefused(f"Callback host {host} resolves to a non-public address")
+
+    ip = addresses[0]
+    ip_netloc = f"[{ip}]" if ":" in ip else ip
+    host_header = f"[{host}]" if ":" in host else host
+    if parts.port:
+        ip_netloc += f":{parts.port}"
+        host_header += f":{parts.port}"
+    return parts._replace(netloc=ip_netloc).geturl(), host_header, host
+
+
+async def deliver_callback(db_path: str, event: dict) -> bool:
+    """Deliver a terminal job event to its callback, if one is registered. True once delivered."""
+    job_id = event["job_id"]
+    callback = await asyncio.to_thread(job_store.get_callback, db_path, job_id)
+    if not callback or callback["delivered_at"]:
+        return False
+
+    body = json.dumps(event).encode()
+    headers = {"Content-Type": "application/json", "User-Agent": "FK94-Jobs/1.0"}
+    if settings.JOB_CALLBACK_SECRET:
+        headers[SIGNATURE_HEADER] = sign(body, settings.JOB_CALLBACK_SECRET)
+
+    async with httpx.AsyncClient(timeout=settings.JOB_CALLBACK_TIMEOUT_SECONDS) as client:
+        for attempt in range(1, settings.JOB_CALLBACK_MAX_ATTEMPTS + 1):
+            retry = True
+            try:
+                url, host_header, server_name = await _pin_url(callback["url"])
+                resp = await client.post(
+                    url,
+                    content=body,
+                    headers={**headers, "Host": host_header},
+                    extensions={"sni_hostname": server_name},
+                )
+                if resp.status_code < 300:
+                    await asyncio.to_thread(job_store.record_callback_attempt, db_path, job_id, delivered=True)
+                    return True
+                error = f"HTTP {resp.status_code}"
+                retry = _retryable(resp.status_code)
+            except CallbackRefused as exc:
+                error = str(exc)[:200]
+                retry = False
+            except (httpx.HTTPError, OSError) as exc:  # OSError: DNS resolution failed
+                error = f"{type(exc).__name__}: {exc}"[:200]
+
+            await asyncio.to_thread(
+                job_store.record_callback_attempt, db_path, job_id, delivered=False, error=error
+            )
+            if not retry or attempt == settings.JOB_CALLBACK_MAX_ATTEMPTS:
+                logger.warning(f"Callback for job {job_id} failed after {attempt} attempt(s): {error}")
+                return False
+            await asyncio.sleep(min(
+                settings.JOB_CALLBACK_RETRY_BASE_SECONDS * 2 ** (attempt - 1),
+                settings.JOB_CALLBACK_RETRY_MAX_SECONDS,
+            ))
+    return False
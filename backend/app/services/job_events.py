@@ -0,0 +1,73 @@
+"""
+FK94 Security Platform - Job Events
+In-process fan-out of job state transitions. JobWorker publishes one event
+per transition (running, completed, failed) and batch jobs add progress
+events; long-poll requests, SSE streams and completion callbacks subscribe
+here instead of polling the jobs table.
+
+Only jobs run by this process's worker produce events, so subscribers keep a
+slow status re-read as a fallback (e.g. when the worker runs elsewhere).
+"""
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# A subscriber that stops reading cannot hold more than this many events
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+def job_event(job: dict) -> dict:
+    """The public event for a job row (status fields only, never the result)."""
+    return {
+        "job_id": job["id"],
+        "job_type": job["job_type"],
+        "status": job["status"],
+        "error": job["error"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def progress_event(job_id: str, job_type: str, progress: dict) -> dict:
+    """Checkpoint of a running job (sent as an SSE `progress` event)."""
+    return {"job_id": job_id, "job_type": job_type, "status": "running", "progress": progress}
+
+
+class JobEvents:
+    def __init__(self):
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    @contextmanager
+    def subscribe(self, job_id: str) -> Iterator[asyncio.Queue]:
+        """
+        Queue receiving this job's events while the block runs. Subscribe
+        before reading the job's current status so no transition is missed.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(job_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[job_id]
+
+    def publish(self, event: dict) -> None:
+        for queue in self._subscribers.get(event["job_id"], ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"Dropping job event for slow subscriber of {event['job_id']}")
+
+    def subscriber_count(self, job_id: str) -> int:
+        return len(self._subscribers.get(job_id, ()))
+
+
+job_events = JobEvents()
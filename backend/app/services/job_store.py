@@ -1,13 +1,19 @@
 """
 FK94 Security Platform - Job Store (SQLite)
+Job results live in job_results as zlib-compressed JSON, apart from the small
+jobs row, so status polls never read or decode them. Rows written before the
+split keep their result in jobs.result and are read from there.
 """
 from __future__ import annotations
 
 import json
 import sqlite3
 import uuid
+import zlib
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterable, Optional
+
+RESULT_ENCODING = "zlib+json"
 
 
 def _utc_now() -> str:
@@ -36,14 +42,54 @@ def init_db(db_path: str) -> None:
             )
             """
         )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_results (
+                job_id TEXT PRIMARY KEY,
+                encoding TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_callbacks (
+                job_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                delivered_at TEXT,
+                last_error TEXT
+            )
+            """
+        )
         conn.commit()
 
 
+def _encode_result(result: dict) -> tuple[bytes, int]:
+    raw = json.dumps(result, separators=(",", ":")).encode()
+    return zlib.compress(raw), len(raw)
+
+
+def _decode_result(encoding: str, data: bytes) -> dict:
+    if encoding != RESULT_ENCODING:
+        raise ValueError(f"Unknown job result encoding: {encoding}")
+    return json.loads(zlib.decompress(data))
+
+
+def _select_fields(result: dict, fields: Optional[Iterable[str]]) -> dict:
+    if fields is None:
+        return result
+    return {key: result[key] for key in fields if key in result}
+
+
 def create_job(
     db_path: str,
     job_type: str,
     payload: dict,
-    run_at: Optional[datetime] = None
+    run_at: Optional[datetime] = None,
+    callback_url: Optional[str] = None
 ) -> dict:
     job_id = str(uuid.uuid4())
     run_at_value = run_at.isoformat() if run_at else None
@@ -69,6 +115,8 @@ def create_job(
                 None,
             ),
         )
+        if callback_url:
+            conn.execute("INSERT INTO job_callbacks (job_id, url) VALUES (?, ?)", (job_id, callback_url))
         conn.commit()
 
     return {
@@ -79,43 +127,92 @@ def create_job(
     }
 
 
-def get_job(db_path: str, job_id: str) -> Optional[dict]:
+def get_job(
+    db_path: str,
+    job_id: str,
+    *,
+    include_result: bool = True,
+    include_payload: bool = True,
+    include_result_size: bool = False,
+    fields: Optional[Iterable[str]] = None
+) -> Optional[dict]:
+    """
+    Job row as a dict. With include_result=False "result" is None and the
+    result is not read at all; `fields` keeps only those top-level result keys.
+    Status reads also pass include_payload=False ("payload" is None) so large
+    payloads are not decoded. include_result_size adds "result_size", from the
+    same query.
+    """
+    columns = "j.id, j.job_type, j.status, j.error, j.run_at, j.created_at, j.started_at, j.finished_at"
+    columns += ", j.payload" if include_payload else ", NULL"
+    columns += ", r.size" if include_result_size else ", NULL"
+    join = " LEFT JOIN job_results r ON r.job_id = j.id" if include_result_size else ""
     with _get_connection(db_path) as conn:
-        row = conn.execute(
-            "SELECT id, job_type, status, payload, result, error, run_at, created_at, started_at, finished_at FROM jobs WHERE id = ?",
-            (job_id,),
-        ).fetchone()
+        row = conn.execute(f"SELECT {columns} FROM jobs j{join} WHERE j.id = ?", (job_id,)).fetchone()
+        result = _read_result(conn, job_id) if row and include_result else None
 
     if not row:
         return None
 
-    return {
+    job = {
         "id": row[0],
         "job_type": row[1],
         "status": row[2],
-        "payload": json.loads(row[3]),
-        "result": json.loads(row[4]) if row[4] else None,
-        "error": row[5],
-        "run_at": row[6],
-        "created_at": row[7],
-        "started_at": row[8],
-        "finished_at": row[9],
+        "payload": json.loads(row[8]) if include_payload else None,
+        "result": _select_fields(result, fields) if result is not None else None,
+        "error": row[3],
+        "run_at": row[4],
+        "created_at": row[5],
+        "started_at": row[6],
+        "finished_at": row[7],
     }
+    if include_result_size:
+        job["result_size"] = row[9]
+    return job
+
+
+def _read_result(conn: sqlite3.Connection, job_id: str) -> Optional[dict]:
+    row = conn.execute("SELECT encoding, data FROM job_results WHERE job_id = ?", (job_id,)).fetchone()
+    if row:
+        return _decode_result(row[0], row[1])
+    legacy = conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return json.loads(legacy[0]) if legacy and legacy[0] else None
 
 
-def fetch_due_jobs(db_path: str, limit: int = 5) -> list[dict]:
-    now = _utc_now()
+def get_job_result(db_path: str, job_id: str, fields: Optional[Iterable[str]] = None) -> Optional[dict]:
+    """Only the stored result of a job (None when it has none yet)."""
+    with _get_connection(db_path) as conn:
+        result = _read_result(conn, job_id)
+    return _select_fields(result, fields) if result is not None else None
+
+
+def fetch_due_jobs(
+    db_path: str,
+    limit: int = 5,
+    *,
+    job_types: Optional[tuple[str, ...]] = None,
+    exclude_types: Optional[tuple[str, ...]] = None
+) -> list[dict]:
+    """Queued jobs that are due, oldest first, optionally only / not of the given types."""
+    where = ["status = 'queued'", "(run_at IS NULL OR run_at <= ?)"]
+    params: list = [_utc_now()]
+    if job_types is not None:
+        where.append(f"job_type IN ({', '.join('?' for _ in job_types) or 'NULL'})")
+        params.extend(job_types)
+    if exclude_types:
+        where.append(f"job_type NOT IN ({', '.join('?' for _ in exclude_types)})")
+        params.extend(exclude_types)
+    params.append(limit)
     with _get_connection(db_path) as conn:
         rows = conn.execute(
-            """
-            SELECT id, job_type, status, payload, run_at
+            f"""
+            SELECT id, job_type, status, payload, run_at, created_at
             FROM jobs
-            WHERE status = 'queued'
-              AND (run_at IS NULL OR run_at <= ?)
+            WHERE {' AND '.join(where)}
             ORDER BY created_at ASC
             LIMIT ?
             """,
-            (now, limit),
+            tuple(params),
         ).fetchall()
 
     jobs = []
@@ -127,11 +224,57 @@ def fetch_due_jobs(db_path: str, limit: int = 5) -> list[dict]:
                 "status": row[2],
                 "payload": json.loads(row[3]),
                 "run_at": row[4],
+                "created_at": row[5],
             }
         )
     return jobs
 
 
+def get_callback(db_path: str, job_id: str) -> Optional[dict]:
+    """Completion callback registered for a job, if any."""
+    with _get_connection(db_path) as conn:
+        row = conn.execute(
+            "SELECT url, attempts, delivered_at, last_error FROM job_callbacks WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+    if not row:
+        return None
+    return {"url": row[0], "attempts": row[1], "delivered_at": row[2], "last_error": row[3]}
+
+
+def record_callback_attempt(db_path: str, job_id: str, *, delivered: bool, error: Optional[str] = None) -> None:
+    with _get_connection(db_path) as conn:
+        conn.execute(
+            """
+            UPDATE job_callbacks
+            SET attempts = attempts + 1, delivered_at = ?, last_error = ?
+            WHERE job_id = ?
+            """,
+            (_utc_now() if delivered else None, error, job_id),
+        )
+        conn.commit()
+
+
+def requeue_running_jobs(db_path: str, job_types: tuple[str, ...]) -> int:
+    """Put jobs of resumable types left 'running' by a stopped worker back in the queue."""
+    if not job_types:
+        return 0
+    placeholders = ", ".join("?" for _ in job_types)
+    with _get_connection(db_path) as conn:
+        cursor = conn.execute(
+            f"UPDATE jobs SET status = 'queued' WHERE status = 'running' AND job_type IN ({placeholders})",
+            job_types,
+        )
+        conn.commit()
+    return cursor.rowcount
+
+
+def count_jobs_by_status(db_path: str) -> dict[str, int]:
+    with _get_connection(db_path) as conn:
+        rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+    return {status: int(count) for status, count in rows}
+
+
 def update_job(
     db_path: str,
     job_id: str,
@@ -149,8 +292,8 @@ def update_job(
         fields.append("status = ?")
         values.append(status)
     if result is not None:
-        fields.append("result = ?")
-        values.append(json.dumps(result))
+        # Written to job_results; clear any copy left in the row by an older version
+        fields.append("result = NULL")
     if error is not None:
         fields.append("error = ?")
         values.append(error)
@@ -166,6 +309,20 @@ def update_job(
 
     values.append(job_id)
     with _get_connection(db_path) as conn:
+        if result is not None:
+            data, size = _encode_result(result)
+            conn.execute(
+                """
+                INSERT INTO job_results (job_id, encoding, data, size, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    encoding = excluded.encoding,
+                    data = excluded.data,
+                    size = excluded.size,
+                    updated_at = excluded.updated_at
+                """,
+                (job_id, RESULT_ENCODING, data, size, _utc_now()),
+            )
         conn.execute(
             f"UPDATE jobs SET {', '.join(fields)} WHERE id = ?",
             tuple(values),
@@ -3,14 +3,32 @@ FK94 Security Platform - Background Job Worker
 """
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
+from typing import Optional
 
+from app.core import metrics
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
-from app.models.schemas import FullAuditRequest, MultiAuditRequest
+from app.models.schemas import (
+    BatchReportRequest, FullAuditRequest, MultiAuditRequest, PhoneBatchRequest, WalletBatchRequest,
+)
 from app.services import job_store
 from app.services.audit_runner import run_full_audit, run_multi_audit
+from app.services.deepseek_service import deepseek_service
+from app.services.batch_reports import run_batch_report
+from app.services.job_callbacks import deliver_callback
+from app.services.job_events import job_event, job_events
+from app.services.phone_batch import run_phone_batch
+from app.services.supabase_admin_service import supabase_admin_service
+from app.services.wallet_batch import run_wallet_batch
+
+# Job types that checkpoint progress in their row and can pick up where they left off
+RESUMABLE_JOB_TYPES = ("phone_batch",)
+# Long-running job types: run as concurrent tasks (up to JOB_BATCH_CONCURRENCY)
+# so an hour-long batch cannot hold up audits, AI analyses and syncs
+BATCH_JOB_TYPES = ("phone_batch", "wallet_batch", "batch_report")
 
 
 class JobWorker:
@@ -18,73 +36,110 @@ class JobWorker:
         self.db_path = db_path
         self.poll_seconds = max(1, poll_seconds)
         self._stop_event = asyncio.Event()
+        self._wake_event = asyncio.Event()
         self._task: asyncio.Task | None = None
+        self._callback_tasks: set[asyncio.Task] = set()
+        self._batch_tasks: dict[str, asyncio.Task] = {}
 
     async def start(self) -> None:
         if self._task and not self._task.done():
             return
+        resumed = job_store.requeue_running_jobs(self.db_path, RESUMABLE_JOB_TYPES)
+        if resumed:
+            logger.info(f"Resuming {resumed} interrupted job(s)")
         self._task = asyncio.create_task(self._run_loop())
 
     async def stop(self) -> None:
         self._stop_event.set()
+        self._wake_event.set()
         if self._task:
             await self._task
+        if self._batch_tasks:
+            # Resumable batches are requeued on the next start; others are marked failed
+            for task in self._batch_tasks.values():
+                task.cancel()
+            await asyncio.gather(*self._batch_tasks.values(), return_exceptions=True)
+        if self._callback_tasks:
+            # Give in-flight callbacks a moment; ones still retrying are abandoned
+            _, pending = await asyncio.wait(self._callback_tasks, timeout=5)
+            for task in pending:
+                task.cancel()
+
+    def wake(self) -> None:
+        """Process due jobs now instead of at the next poll (e.g. right after enqueueing)."""
+        self._wake_event.set()
 
     async def _run_loop(self) -> None:
         while not self._stop_event.is_set():
+            self._wake_event.clear()
             await self._process_due_jobs()
             try:
-                await asyncio.wait_for(self._stop_event.wait(), timeout=self.poll_seconds)
+                await asyncio.wait_for(self._wake_event.wait(), timeout=self.poll_seconds)
             except asyncio.TimeoutError:
                 continue
 
     async def _process_due_jobs(self) -> None:
-        jobs = job_store.fetch_due_jobs(self.db_path, limit=3)
+        self._start_batch_jobs()
+        jobs = job_store.fetch_due_jobs(self.db_path, limit=3, exclude_types=BATCH_JOB_TYPES)
         for job in jobs:
             await self._process_job(job)
 
+    def _start_batch_jobs(self) -> None:
+        free = max(1, settings.JOB_BATCH_CONCURRENCY) - len(self._batch_tasks)
+        if free <= 0:
+            return
+        for job in job_store.fetch_due_jobs(self.db_path, limit=free, job_types=BATCH_JOB_TYPES):
+            if job["id"] in self._batch_tasks:
+                continue
+            task = asyncio.create_task(self._process_job(job))
+            self._batch_tasks[job["id"]] = task
+            task.add_done_callback(lambda _, job_id=job["id"]: self._batch_done(job_id))
+
+    def _batch_done(self, job_id: str) -> None:
+        self._batch_tasks.pop(job_id, None)
+        self._wake_event.set()  # a lane slot is free: pick up the next batch now
+
     async def _process_job(self, job: dict) -> None:
         job_id = job["id"]
         job_type = job["job_type"]
         payload = job["payload"]
 
+        started_at = self._utc_now()
         job_store.update_job(
             self.db_path,
             job_id,
             status="running",
-            started_at=self._utc_now(),
+            started_at=started_at,
         )
+        self._publish(job_id)
+        wait = self._wait_seconds(job, started_at)
+        if wait is not None:
+            metrics.job_wait.labels(job_type).observe(wait)
+        outcome = "completed"
+        start = time.perf_counter()
 
         try:
-            if job_type == "full_audit":
-                request = FullAuditRequest(**payload)
-                result = await run_full_audit(request)
-                job_store.update_job(
-                    self.db_path,
-                    job_id,
-                    status="completed",
-                    result=result.model_dump(),
-                    finished_at=self._utc_now(),
-                )
-            elif job_type == "multi_audit":
-                request = MultiAuditRequest(**payload)
-                result = await run_multi_audit(request)
-                job_store.update_job(
-                    self.db_path,
-                    job_id,
-                    status="completed",
-                    result=result.model_dump(),
-                    finished_at=self._utc_now(),
-                )
-            else:
+            result = await self._run(job_id, job_type, payload)
+            job_store.update_job(
+                self.db_path,
+                job_id,
+                status="completed",
+                result=result,
+                finished_at=self._utc_now(),
+            )
+        except asyncio.CancelledError:
+            outcome = "failed"
+            if job_type not in RESUMABLE_JOB_TYPES:
                 job_store.update_job(
                     self.db_path,
                     job_id,
                     status="failed",
-                    error=f"Unknown job type: {job_type}",
+                    error="Interrupted by worker shutdown",
                     finished_at=self._utc_now(),
                 )
+            raise
         except Exception as exc:
+            outcome = "failed"
             logger.exception(f"Job {job_id} ({job_type}) failed")
             error_msg = str(exc)[:500]
             job_store.update_job(
@@ -94,10 +149,61 @@ class JobWorker:
                 error=error_msg,
                 finished_at=self._utc_now(),
             )
+        finally:
+            metrics.job_run.labels(job_type, outcome).observe(time.perf_counter() - start)
+        event = self._publish(job_id)
+        if event is not None:
+            task = asyncio.create_task(deliver_callback(self.db_path, event))
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._callback_tasks.discard)
+
+    async def _run(self, job_id: str, job_type: str, payload: dict) -> dict:
+        """Run one job and return its JSON result; any exception fails the job."""
+        if job_type == "full_audit":
+            result = await run_full_audit(FullAuditRequest(**payload))
+            return result.model_dump(mode="json")
+        if job_type == "multi_audit":
+            result = await run_multi_audit(MultiAuditRequest(**payload))
+            return result.model_dump(mode="json")
+        if job_type == "ai_analysis":
+            return {"ai_analysis": await deepseek_service.analyze_audit(payload["audit_data"])}
+        if job_type == "wallet_batch":
+            return await run_wallet_batch(WalletBatchRequest(**payload))
+        if job_type == "batch_report":
+            return await run_batch_report(BatchReportRequest(**payload), job_id, self.db_path)
+        if job_type == "phone_batch":
+            return await run_phone_batch(PhoneBatchRequest(**payload), job_id, self.db_path)
+        if job_type == "usage_sync":
+            result = await supabase_admin_service.sync_usage(settings.EVENT_DB_PATH, payload.get("max_batches"))
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            return result
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    def _publish(self, job_id: str) -> Optional[dict]:
+        """Announce the job's current state to in-process subscribers."""
+        job = job_store.get_job(self.db_path, job_id, include_result=False, include_payload=False)
+        if job is None:
+            return None
+        event = job_event(job)
+        job_events.publish(event)
+        return event
 
     @staticmethod
     def _utc_now() -> str:
         return datetime.now(timezone.utc).isoformat()
 
+    @staticmethod
+    def _wait_seconds(job: dict, started_at: str) -> Optional[float]:
+        """Seconds between the job becoming due (created or run_at) and being picked up."""
+        try:
+            due = [datetime.fromisoformat(job["created_at"])]
+            if job.get("run_at"):
+                due.append(datetime.fromisoformat(job["run_at"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+        due = [d if d.tzinfo else d.replace(tzinfo=timezone.utc) for d in due]
+        return max(0.0, (datetime.fromisoformat(started_at) - max(due)).total_seconds())
+
 
 job_worker = JobWorker(settings.JOB_DB_PATH, settings.JOB_WORKER_POLL_SECONDS)
@@ -9,6 +9,7 @@ import ssl
 import re
 from datetime import datetime
 from typing import Optional
+from app.core import tracing
 from app.models.schemas import (
     RiskLevel, UsernameResult, PhoneResult, DomainResult,
     NameResult, IPResult, WalletResult, ExchangeInteraction
@@ -39,6 +40,7 @@ USERNAME_PLATFORMS = [
 ]
 
 
+@tracing.traced("multi.username")
 async def check_username(username: str) -> UsernameResult:
     """Check username across multiple platforms"""
     platforms_found = []
@@ -91,33 +93,29 @@ async def check_platform(client: httpx.AsyncClient, name: str, url: str) -> dict
     return {"found": False, "name": name, "url": url}
 
 
+@tracing.traced("multi.phone")
 async def check_phone(phone: str, country_code: str = "AR") -> PhoneResult:
     """
     Check phone number using Truecaller.
-    Tries Telegram bot first (free), then direct API as fallback.
+    Normalized to E.164, then looked up through phone_intel (cached; Telegram
+    bot first, direct API raced in when the bot is slow or has no answer).
     """
-    from app.core.config import settings
+    from app.services import phone_intel
 
-    # Clean phone number
-    clean_phone = re.sub(r'[^\d+]', '', phone)
-
-    tc_result = None
-
-    # Try Telegram bot first (FREE)
-    if settings.TELEGRAM_API_ID is not None and settings.TELEGRAM_API_HASH and settings.TELEGRAM_SESSION:
-        try:
-            from app.services.telegram_truecaller_service import telegram_truecaller_service
-            tc_result = await telegram_truecaller_service.lookup(clean_phone, country_code)
-        except Exception as e:
-            print(f"Telegram Truecaller error: {e}")
+    clean_phone = phone_intel.normalize_e164(phone, country_code)
+    if clean_phone is None:
+        return PhoneResult(
+            phone=re.sub(r'[^\d+]', '', phone),
+            carrier="Unknown",
+            line_type="Unknown",
+            location=country_code,
+            breaches_found=0,
+            spam_reports=0,
+            risk_level=RiskLevel.LOW,
+            error="Invalid phone number"
+        )
 
-    # Fallback to direct Truecaller API
-    if (tc_result is None or not tc_result.found) and settings.TRUECALLER_TOKEN:
-        try:
-            from app.services.truecaller_service import truecaller_service
-            tc_result = await truecaller_service.lookup(clean_phone, country_code)
-        except Exception as e:
-            print(f"Direct Truecaller error: {e}")
+    tc_result = await phone_intel.lookup_phone(clean_phone, country_code)
 
     # Process result
     if tc_result and tc_result.found:
@@ -160,6 +158,7 @@ async def check_phone(phone: str, country_code: str = "AR") -> PhoneResult:
         )
 
 
+@tracing.traced("multi.domain")
 async def check_domain(domain: str) -> DomainResult:
     """Check domain security configuration"""
     import dns.resolver
@@ -260,6 +259,7 @@ async def check_domain(domain: str) -> DomainResult:
     )
 
 
+@tracing.traced("multi.name")
 async def check_name(full_name: str, location: Optional[str] = None) -> NameResult:
     """Search for public information about a person"""
     # In production, integrate with:
@@ -303,6 +303,7 @@ async def check_name(full_name: str, location: Optional[str] = None) -> NameResu
     )
 
 
+@tracing.traced("multi.ip")
 async def check_ip(ip_address: str) -> IPResult:
     """Check IP address reputation and information"""
     location = None
@@ -368,17 +369,29 @@ async def check_ip(ip_address: str) -> IPResult:
     )
 
 
-async def check_wallet(address: str, chain: str = "ethereum") -> WalletResult:
+@tracing.traced("multi.wallet")
+async def check_wallet(
+    address: str, chain: str = "ethereum", chains: Optional[list[str]] = None
+) -> WalletResult:
     """Check crypto wallet with deep scan: exchange interactions, mixers, OFAC, traceability."""
+    from app.services.chain_adapters import EVM_CHAINS, get_adapter, scan_evm_chains
     from app.services.wallet_deep_scan import (
-        deep_scan_eth, deep_scan_btc, check_ofac_eth,
+        deep_scan_btc, check_ofac_eth,
         calculate_traceability_score, calculate_wallet_risk,
-        KNOWN_EXCHANGE_ADDRESSES_ETH, KNOWN_EXCHANGE_ADDRESSES_BTC,
+        KNOWN_EXCHANGE_ADDRESSES_ETH, KNOWN_EXCHANGE_ADDRESSES_BTC, KNOWN_EXCHANGE_ADDRESSES_SOL,
     )
 
-    # Detect chain from address format
+    # Detect chain from address format. 0x addresses keep the requested EVM
+    # chain; base58 Solana keys can start with 1/3, so an explicit "solana"
+    # wins over the BTC prefix check.
+    if not (address.startswith("0x") and len(address) == 42):
+        chains = None  # only meaningful for EVM addresses
     if address.startswith("0x") and len(address) == 42:
-        chain = "ethereum"
+        if chain not in EVM_CHAINS:
+            chain = "ethereum"
+        chains = [c for c in (chains or [chain]) if c in EVM_CHAINS] or [chain]
+    elif chain == "solana":
+        pass
     elif address.startswith("bc1") or address.startswith("1") or address.startswith("3"):
         chain = "bitcoin"
     elif len(address) >= 32 and len(address) <= 44 and not address.startswith("0x"):
@@ -389,11 +402,20 @@ async def check_wallet(address: str, chain: str = "ethereum") -> WalletResult:
     warnings: list[str] = []
 
     try:
-        if chain == "ethereum":
-            scan_result = await deep_scan_eth(address)
-            ofac_sanctioned = await check_ofac_eth(address)
+        if chain in EVM_CHAINS and not chains:
+            # Still an EVM chain, but the address is not 0x + 40 hex characters
+            warnings.append(f"Invalid {chain} address: expected 0x followed by 40 hex characters")
+        elif chain in EVM_CHAINS:
+            if len(chains) > 1:
+                scan = scan_evm_chains(address, chains)
+            else:
+                scan = get_adapter(chains[0]).scan(address)
+            scan_result, ofac_sanctioned = await asyncio.gather(scan, check_ofac_eth(address))
+            chain = chains[0]
         elif chain == "bitcoin":
             scan_result = await deep_scan_btc(address)
+        elif chain == "solana":
+            scan_result = await get_adapter("solana").scan(address)
         else:
             warnings.append(f"Deep scan not supported for {chain} yet")
     except Exception as e:
@@ -403,12 +425,19 @@ async def check_wallet(address: str, chain: str = "ethereum") -> WalletResult:
     addr_lower = address.lower()
     labeled = False
     label = None
-    if chain == "ethereum" and addr_lower in KNOWN_EXCHANGE_ADDRESSES_ETH:
+    if chain in EVM_CHAINS and addr_lower in KNOWN_EXCHANGE_ADDRESSES_ETH:
         labeled = True
         label = KNOWN_EXCHANGE_ADDRESSES_ETH[addr_lower]
+    elif chain == "solana" and address in KNOWN_EXCHANGE_ADDRESSES_SOL:
+        labeled = True
+        label = KNOWN_EXCHANGE_ADDRESSES_SOL[address]
     elif chain == "bitcoin" and address in KNOWN_EXCHANGE_ADDRESSES_BTC:
         labeled = True
         label = KNOWN_EXCHANGE_ADDRESSES_BTC[address]
+    elif chain == "bitcoin" and scan_result.get("cluster_label"):
+        # Co-spent with a labelled exchange address (common-input-ownership)
+        labeled = True
+        label = f"{scan_result['cluster_label']} (cluster)"
 
     # Calculate traceability
     traceability_score, traceability_details = calculate_traceability_score(
@@ -433,7 +462,7 @@ async def check_wallet(address: str, chain: str = "ethereum") -> WalletResult:
         chain=chain,
         balance=scan_result.get("balance"),
         transaction_count=scan_result.get("tx_count"),
-        linked_addresses=[],
+        linked_addresses=scan_result.get("linked_addresses", []),
         labeled=labeled,
         label=label,
         sanctions_check=ofac_sanctioned,
@@ -442,6 +471,7 @@ async def check_wallet(address: str, chain: str = "ethereum") -> WalletResult:
         deep_scan=True,
         exchange_interactions=scan_result.get("exchange_interactions", []),
         exchanges_detected=exchanges_detected,
+        exchange_volume=scan_result.get("exchange_volume", {}),
         is_traceable=traceability_score >= 30,
         traceability_score=traceability_score,
         traceability_details=traceability_details,
@@ -452,4 +482,6 @@ async def check_wallet(address: str, chain: str = "ethereum") -> WalletResult:
         last_tx_date=scan_result.get("last_tx_date"),
         unique_counterparties=scan_result.get("counterparties", 0),
         scan_warnings=all_warnings,
+        chains_scanned=scan_result.get("chains_scanned") or [c for c in [scan_result.get("chain")] if c],
+        chain_breakdown=scan_result.get("chain_breakdown", {}),
     )
@@ -7,6 +7,7 @@ import hashlib
 import asyncio
 import logging
 from typing import Optional
+from app.core import tracing
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,7 @@ class OSINTService:
 
     # === HAVE I BEEN PWNED ===
 
+    @tracing.traced("osint.hibp")
     async def check_hibp_breaches(self, email: str) -> BreachCheckResult:
         """Check email against Have I Been Pwned database"""
 
@@ -101,6 +103,7 @@ class OSINTService:
             risk_level=RiskLevel.LOW
         )
 
+    @tracing.traced("osint.pwned_passwords")
     async def check_password_pwned(self, password: str) -> PasswordExposure:
         """Check if password has been exposed using k-anonymity"""
 
@@ -135,6 +138,7 @@ class OSINTService:
 
     # === DEHASHED ===
 
+    @tracing.traced("osint.dehashed")
     async def check_dehashed(self, email: str) -> Optional[PasswordExposure]:
         """Check Dehashed for leaked credentials"""
 
@@ -170,6 +174,7 @@ class OSINTService:
 
     # === HUNTER.IO ===
 
+    @tracing.traced("osint.hunter")
     async def check_hunter(self, email: str) -> Optional[dict]:
         """Get email verification and associated data from Hunter.io"""
 
@@ -190,6 +195,7 @@ class OSINTService:
                 logger.warning(f"Hunter.io error: {e}")
                 return None
 
+    @tracing.traced("osint.hunter_domain_search")
     async def domain_search(self, domain: str) -> Optional[list]:
         """Find emails associated with a domain"""
 
@@ -213,6 +219,7 @@ class OSINTService:
 
     # === COMBINED OSINT ===
 
+    @tracing.traced("osint.full")
     async def full_osint_check(self, email: str) -> OSINTResult:
         """Run comprehensive OSINT check on an email"""
 
@@ -321,6 +328,7 @@ class OSINTService:
         else:
             return RiskLevel.LOW
 
+    @tracing.traced("osint.gravatar")
     async def _check_gravatar(self, email: str) -> Optional[str]:
         """Check if email has a public Gravatar profile."""
         if not email:
@@ -349,6 +357,7 @@ class OSINTService:
         except Exception:
             return None
 
+    @tracing.traced("osint.rdap")
     async def _rdap_lookup(self, domain: str) -> Optional[dict]:
         """Fetch RDAP (public WHOIS) data for a domain."""
         if not domain:
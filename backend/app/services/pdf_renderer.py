@@ -0,0 +1,93 @@
+"""
+FK94 Security Platform - PDF Render Pool
+Runs ReportLab in worker processes so rendering never blocks the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+from app.models.schemas import AuditResult
+
+logger = logging.getLogger(__name__)
+
+
+class RenderQueueFull(Exception):
+    """Raised when more renders are pending than PDF_RENDER_MAX_PENDING allows."""
+
+
+def _render_in_worker(audit_json: str, dest_path: Optional[str] = None) -> Optional[bytes]:
+    """
+    Worker-process entry point. Takes JSON (cheap to pickle) and either
+    returns the PDF bytes or writes them to dest_path so they never cross
+    the process boundary.
+    """
+    from app.services.pdf_service import pdf_service
+
+    pdf_bytes = pdf_service.generate_report(AuditResult.model_validate_json(audit_json))
+    if dest_path is None:
+        return pdf_bytes
+    with open(dest_path, "wb") as f:
+        f.write(pdf_bytes)
+    return None
+
+
+class PDFRenderPool:
+    """
+    Bounded async front for PDF rendering. `workers=0` renders in a thread
+    instead of a process pool (tests, single-core deployments).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(self, audit: AuditResult, dest_path: Optional[str]) -> Optional[bytes]:
+        if self._pending >= self.max_pending:
+            raise RenderQueueFull(f"{self._pending} PDF renders already pending")
+        self._pending += 1
+        try:
+            audit_json = audit.model_dump_json()
+            if self.workers == 0:
+                return await asyncio.to_thread(_render_in_worker, audit_json, dest_path)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), _render_in_worker, audit_json, dest_path)
+        finally:
+            self._pending -= 1
+
+    async def render(self, audit: AuditResult) -> bytes:
+        """Render a report and return the PDF bytes."""
+        return await self._submit(audit, None)
+
+    async def render_to_file(self, audit: AuditResult, dest_path: str) -> str:
+        """Render a report straight to dest_path (written by the worker)."""
+        await self._submit(audit, dest_path)
+        return dest_path
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+pdf_render_pool = PDFRenderPool(settings.PDF_RENDER_WORKERS, settings.PDF_RENDER_MAX_PENDING)
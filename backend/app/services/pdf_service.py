@@ -1,6 +1,7 @@
 """
 FK94 Security Platform - PDF Report Generator
 """
+import copy
 import io
 from datetime import datetime
 from reportlab.lib import colors
@@ -16,17 +17,49 @@ from reportlab.platypus import (
 from app.models.schemas import AuditResult, RiskLevel
 
 
+SCORE_COLORS = {
+    RiskLevel.CRITICAL: colors.HexColor("#dc2626"),
+    RiskLevel.HIGH: colors.HexColor("#ea580c"),
+    RiskLevel.MEDIUM: colors.HexColor("#ca8a04"),
+    RiskLevel.LOW: colors.HexColor("#16a34a"),
+    RiskLevel.SAFE: colors.HexColor("#059669"),
+}
+
+BREAKDOWN_COL_WIDTHS = [3 * inch, 1.5 * inch, 1.5 * inch]
+ISSUES_COL_WIDTHS = [4 * inch, 2 * inch]
+
+BREAKDOWN_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1a365d")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#cccccc")),
+    ("FONTSIZE", (0, 0), (-1, -1), 10),
+    ("TOPPADDING", (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+])
+
+ISSUES_TABLE_STYLE = TableStyle([
+    ("ALIGN", (0, 0), (0, -1), "LEFT"),
+    ("ALIGN", (1, 0), (1, -1), "CENTER"),
+    ("FONTSIZE", (0, 0), (-1, -1), 11),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+])
+
+
 class PDFReportService:
     """Generate professional PDF security reports"""
 
     def __init__(self):
         self.styles = self._create_styles()
+        self._static = self._create_static_flowables()
 
     def _create_styles(self):
-        """Create custom styles for the report"""
+        """Create custom styles for the report (once; every render reuses them)"""
         base = getSampleStyleSheet()
 
-        return {
+        styles = {
             "title": ParagraphStyle(
                 "Title",
                 parent=base["Heading1"],
@@ -75,8 +108,52 @@ class PDFReportService:
                 leftIndent=20,
                 spaceAfter=6,
             ),
+            "footer": ParagraphStyle("Footer", alignment=TA_CENTER, fontSize=8, textColor=colors.gray),
+            "footer_id": ParagraphStyle("FooterID", alignment=TA_CENTER, fontSize=8, textColor=colors.gray),
         }
 
+        # Score and risk-level styles only vary by risk color
+        for level in RiskLevel:
+            color = self._get_score_color(level)
+            styles[f"score_display_{level.value}"] = ParagraphStyle(
+                "ScoreDisplay", parent=styles["score_large"], textColor=color
+            )
+            styles[f"risk_{level.value}"] = ParagraphStyle(
+                "Risk", alignment=TA_CENTER, fontSize=14, textColor=color
+            )
+        return styles
+
+    def _create_static_flowables(self) -> dict:
+        """Flowables whose content never changes, parsed once."""
+        section = self.styles["section"]
+        return {
+            "title": Paragraph("🛡️ SECURITY AUDIT REPORT", self.styles["title"]),
+            "header_rule": HRFlowable(width="100%", thickness=2, color=colors.HexColor("#1a365d")),
+            "section_score": Paragraph("SECURITY SCORE", section),
+            "section_issues": Paragraph("ISSUES FOUND", section),
+            "section_breaches": Paragraph("DATA BREACHES", section),
+            "section_recommendations": Paragraph("RECOMMENDATIONS", section),
+            "recommendations_intro": Paragraph(
+                "Based on your audit results, here are prioritized actions to improve your security:",
+                self.styles["body"]
+            ),
+            "section_ai": Paragraph("AI SECURITY ANALYSIS", section),
+            "footer_rule": HRFlowable(width="100%", thickness=1, color=colors.HexColor("#cccccc")),
+            "footer_text": Paragraph(
+                "This report was generated by FK94 Security Platform. "
+                "For more information, visit https://fk94security.com",
+                self.styles["footer"]
+            ),
+        }
+
+    def _flowable(self, name: str):
+        """
+        Per-render copy of a static flowable. Shallow copies keep the parsed
+        text but give each build its own layout state, so renders running in
+        parallel threads never share a wrapped flowable.
+        """
+        return copy.copy(self._static[name])
+
     def generate_report(self, audit: AuditResult) -> bytes:
         """Generate PDF report from audit results"""
 
@@ -88,36 +165,28 @@ class PDFReportService:
             leftMargin=0.75 * inch,
             topMargin=0.75 * inch,
             bottomMargin=0.75 * inch,
+            # No creation date / random document ID: same audit -> same bytes
+            invariant=1,
         )
 
         story = []
 
         # === HEADER ===
-        story.append(Paragraph("🛡️ SECURITY AUDIT REPORT", self.styles["title"]))
+        story.append(self._flowable("title"))
         story.append(Paragraph(
-            f"Generated by FK94 Security | {audit.timestamp.strftime('%Y-%m-%d %H:%M')}",
+            f"Generated by FK94 Security | {audit.timestamp.strftime('%Y-%m-%d')}",
             self.styles["subtitle"]
         ))
-        story.append(HRFlowable(width="100%", thickness=2, color=colors.HexColor("#1a365d")))
+        story.append(self._flowable("header_rule"))
         story.append(Spacer(1, 20))
 
         # === SECURITY SCORE ===
         score = audit.security_score
-        score_color = self._get_score_color(score.risk_level)
-
-        story.append(Paragraph("SECURITY SCORE", self.styles["section"]))
+        level = score.risk_level.value
 
-        # Score display
-        score_style = ParagraphStyle(
-            "ScoreDisplay",
-            parent=self.styles["score_large"],
-            textColor=score_color
-        )
-        story.append(Paragraph(f"{score.score}/100", score_style))
-        story.append(Paragraph(
-            f"Risk Level: {score.risk_level.value.upper()}",
-            ParagraphStyle("Risk", alignment=TA_CENTER, fontSize=14, textColor=score_color)
-        ))
+        story.append(self._flowable("section_score"))
+        story.append(Paragraph(f"{score.score}/100", self.styles[f"score_display_{level}"]))
+        story.append(Paragraph(f"Risk Level: {level.upper()}", self.styles[f"risk_{level}"]))
         story.append(Spacer(1, 10))
 
         # Score breakdown table
@@ -128,22 +197,11 @@ class PDFReportService:
             ["OSINT Exposure", str(score.breakdown.get("osint", 0)), "20"],
             ["Configuration", str(score.breakdown.get("configuration", 0)), "15"],
         ]
-        breakdown_table = Table(breakdown_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
-        breakdown_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1a365d")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#cccccc")),
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("TOPPADDING", (0, 0), (-1, -1), 8),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-        ]))
-        story.append(breakdown_table)
+        story.append(Table(breakdown_data, colWidths=BREAKDOWN_COL_WIDTHS, style=BREAKDOWN_TABLE_STYLE))
         story.append(Spacer(1, 20))
 
         # === ISSUES SUMMARY ===
-        story.append(Paragraph("ISSUES FOUND", self.styles["section"]))
+        story.append(self._flowable("section_issues"))
 
         issues_data = [
             ["🔴 Critical", str(score.issues_critical)],
@@ -151,20 +209,12 @@ class PDFReportService:
             ["🟡 Medium", str(score.issues_medium)],
             ["🟢 Low", str(score.issues_low)],
         ]
-        issues_table = Table(issues_data, colWidths=[4*inch, 2*inch])
-        issues_table.setStyle(TableStyle([
-            ("ALIGN", (0, 0), (0, -1), "LEFT"),
-            ("ALIGN", (1, 0), (1, -1), "CENTER"),
-            ("FONTSIZE", (0, 0), (-1, -1), 11),
-            ("TOPPADDING", (0, 0), (-1, -1), 6),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ]))
-        story.append(issues_table)
+        story.append(Table(issues_data, colWidths=ISSUES_COL_WIDTHS, style=ISSUES_TABLE_STYLE))
         story.append(Spacer(1, 20))
 
         # === BREACH DETAILS ===
         if audit.breach_check and audit.breach_check.breached:
-            story.append(Paragraph("DATA BREACHES", self.styles["section"]))
+            story.append(self._flowable("section_breaches"))
             story.append(Paragraph(
                 f"Your email <b>{audit.email}</b> was found in <b>{audit.breach_check.breach_count}</b> data breaches:",
                 self.styles["body"]
@@ -182,11 +232,8 @@ class PDFReportService:
 
         # === RECOMMENDATIONS ===
         story.append(PageBreak())
-        story.append(Paragraph("RECOMMENDATIONS", self.styles["section"]))
-        story.append(Paragraph(
-            "Based on your audit results, here are prioritized actions to improve your security:",
-            self.styles["body"]
-        ))
+        story.append(self._flowable("section_recommendations"))
+        story.append(self._flowable("recommendations_intro"))
 
         for i, rec in enumerate(audit.recommendations, 1):
             story.append(Paragraph(f"{i}. {rec}", self.styles["recommendation"]))
@@ -195,7 +242,7 @@ class PDFReportService:
 
         # === AI ANALYSIS ===
         if audit.ai_analysis:
-            story.append(Paragraph("AI SECURITY ANALYSIS", self.styles["section"]))
+            story.append(self._flowable("section_ai"))
             # Split AI analysis into paragraphs
             for para in audit.ai_analysis.split("\n\n"):
                 if para.strip():
@@ -203,16 +250,12 @@ class PDFReportService:
 
         # === FOOTER ===
         story.append(Spacer(1, 30))
-        story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#cccccc")))
+        story.append(self._flowable("footer_rule"))
         story.append(Spacer(1, 10))
+        story.append(self._flowable("footer_text"))
         story.append(Paragraph(
-            "This report was generated by FK94 Security Platform. "
-            "For more information, visit https://fk94security.com",
-            ParagraphStyle("Footer", alignment=TA_CENTER, fontSize=8, textColor=colors.gray)
-        ))
-        story.append(Paragraph(
-            f"Report ID: {audit.id} | Generated: {audit.timestamp.isoformat()}",
-            ParagraphStyle("FooterID", alignment=TA_CENTER, fontSize=8, textColor=colors.gray)
+            f"Report ID: {audit.id} | Generated: {audit.timestamp.strftime('%Y-%m-%d')}",
+            self.styles["footer_id"]
         ))
 
         # Build PDF
@@ -222,14 +265,7 @@ class PDFReportService:
 
     def _get_score_color(self, risk_level: RiskLevel) -> colors.Color:
         """Get color based on risk level"""
-        color_map = {
-            RiskLevel.CRITICAL: colors.HexColor("#dc2626"),
-            RiskLevel.HIGH: colors.HexColor("#ea580c"),
-            RiskLevel.MEDIUM: colors.HexColor("#ca8a04"),
-            RiskLevel.LOW: colors.HexColor("#16a34a"),
-            RiskLevel.SAFE: colors.HexColor("#059669"),
-        }
-        return color_map.get(risk_level, colors.black)
+        return SCORE_COLORS.get(risk_level, colors.black)
 
 
 # Singleton
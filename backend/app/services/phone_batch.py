@@ -0,0 +1,143 @@
+"""
+FK94 Security Platform - Batch Phone Screening
+Screens a phone list (JSON or CSV upload) as a background job. Numbers are
+normalized to E.164 and deduplicated first, so "011 5555-1234" and
+"+54 11 5555 1234" cost one lookup. Uncached lookups are paced by a
+process-wide rate limiter to stay under the Telegram bot / Truecaller limits,
+while numbers already in the phone_intel cache are answered straight away.
+
+Progress is checkpointed into the job result every PHONE_BATCH_CHECKPOINT_SECONDS,
+so clients can page partial results and a restarted worker resumes where the
+last checkpoint left off instead of screening the list again.
+"""
+import asyncio
+import csv
+import io
+import logging
+import time
+
+from app.core.config import settings
+from app.models.schemas import PhoneBatchRequest, RiskLevel
+from app.services import job_store, phone_intel
+from app.services.multi_audit_service import check_phone
+from app.services.rate_limiter import AsyncRateLimiter
+
+logger = logging.getLogger(__name__)
+
+PHONE_COLUMNS = ("phone", "phones", "telefono", "teléfono", "number", "mobile", "celular")
+
+# Shared by every batch so concurrent jobs cannot multiply provider load
+_lookup_slots = asyncio.Semaphore(max(1, settings.PHONE_BATCH_CONCURRENCY))
+_lookup_limiter = AsyncRateLimiter(settings.PHONE_BATCH_RATE_PER_SECOND)
+
+
+def parse_csv_numbers(text: str) -> list[str]:
+    """
+    Phone numbers from CSV text: the column whose header is one of
+    PHONE_COLUMNS, or the first column when there is no such header.
+    """
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+
+    column = 0
+    header = [cell.strip().lower() for cell in rows[0]]
+    for name in PHONE_COLUMNS:
+        if name in header:
+            column = header.index(name)
+            rows = rows[1:]
+            break
+
+    return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+
+
+def prepare_numbers(phones: list[str], country_code: str) -> tuple[list[dict], list[dict]]:
+    """
+    Split a raw list into unique E.164 entries ({index, input, phone}, first-seen
+    order) and invalid items. Repeats of a number are dropped.
+    """
+    unique: list[dict] = []
+    invalid: list[dict] = []
+    seen: set[str] = set()
+    for index, raw in enumerate(phones):
+        e164 = phone_intel.normalize_e164(raw, country_code)
+        if e164 is None:
+            invalid.append({"index": index, "input": raw, "phone": None, "result": None, "error": "Invalid phone number"})
+        elif e164 not in seen:
+            seen.add(e164)
+            unique.append({"index": index, "input": raw, "phone": e164})
+    return unique, invalid
+
+
+async def _screen_one(entry: dict, country_code: str) -> dict:
+    async with _lookup_slots:
+        if not phone_intel.is_cached(entry["phone"], country_code):
+            await _lookup_limiter.acquire()
+        try:
+            result = await check_phone(entry["phone"], country_code)
+        except Exception as exc:
+            logger.warning(f"Batch phone screening failed for {entry['phone']}: {exc}")
+            return {**entry, "result": None, "error": str(exc)[:200]}
+    if result.error:
+        # Provider errors are retried when the job resumes; only answers are kept
+        return {**entry, "result": None, "error": result.error}
+    return {**entry, "result": result.model_dump(mode="json"), "error": None}
+
+
+def _summary(requested: int, unique: int, items: list[dict]) -> dict:
+    results = [item["result"] for item in items if item["result"]]
+    high = (RiskLevel.CRITICAL.value, RiskLevel.HIGH.value)
+    invalid = sum(1 for item in items if item["phone"] is None)
+    return {
+        "requested": requested,
+        "unique": unique,
+        "invalid": invalid,
+        "screened": len(results),
+        "failed": len(items) - len(results) - invalid,
+        "spam": sum(1 for r in results if "spam" in r["tags"]),
+        "scam": sum(1 for r in results if "scam" in r["tags"]),
+        "high_risk": sum(1 for r in results if r["risk_level"] in high),
+    }
+
+
+def _load_checkpoint(db_path: str, job_id: str) -> dict[str, dict]:
+    """Screened items saved by an earlier run of this job, keyed by E.164 number."""
+    result = job_store.get_job_result(db_path, job_id, fields=("items",))
+    if not result:
+        return {}
+    return {
+        item["phone"]: item
+        for item in result.get("items", [])
+        if item.get("phone") and item.get("result")
+    }
+
+
+async def run_phone_batch(request: PhoneBatchRequest, job_id: str, db_path: str) -> dict:
+    """Screen a whole list and return items in input order plus a summary."""
+    entries, invalid = prepare_numbers(request.phones, request.country_code)
+    done = await asyncio.to_thread(_load_checkpoint, db_path, job_id)
+    items = invalid + [done[e["phone"]] for e in entries if e["phone"] in done]
+    pending = [e for e in entries if e["phone"] not in done]
+    if done:
+        logger.info(f"Phone batch {job_id} resuming: {len(done)} of {len(entries)} numbers already screened")
+
+    def snapshot() -> dict:
+        return {
+            "summary": _summary(len(request.phones), len(entries), items),
+            "items": sorted(items, key=lambda item: item["index"]),
+        }
+
+    tasks = [asyncio.create_task(_screen_one(entry, request.country_code)) for entry in pending]
+    last_checkpoint = time.monotonic()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            items.append(await next_done)
+            if time.monotonic() - last_checkpoint >= settings.PHONE_BATCH_CHECKPOINT_SECONDS:
+                # The snapshot grows with the job; encode and write it off the loop
+                await asyncio.to_thread(job_store.update_job, db_path, job_id, result=snapshot())
+                last_checkpoint = time.monotonic()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return snapshot()
@@ -0,0 +1,164 @@
+"""
+FK94 Security Platform - Phone Intel
+One entry point for phone owner/spam lookups. Numbers are normalized to E.164
+once, answers are cached per number for PHONE_CACHE_TTL_SECONDS (concurrent
+lookups of the same number share one request), and the configured providers
+are hedged: the Telegram bot (free) goes first, and if it has not answered
+after PHONE_HEDGE_DELAY_SECONDS the direct Truecaller API is raced against it.
+"""
+import asyncio
+import logging
+import re
+import time
+from typing import Awaitable, Callable, Optional
+
+from app.core import metrics, tracing
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COUNTRY_PREFIXES = {
+    "AR": "54", "US": "1", "BR": "55", "MX": "52",
+    "CO": "57", "CL": "56", "PE": "51", "UY": "598",
+    "PY": "595", "EC": "593", "VE": "58", "ES": "34",
+}
+
+# cache key (see _cache_key) -> (expires_at, provider result)
+_phone_cache: dict[str, tuple[float, object]] = {}
+_phone_inflight: dict[str, asyncio.Future] = {}
+
+
+def normalize_e164(phone: str, country_code: str = "AR") -> Optional[str]:
+    """
+    "+54 9 11 5555-1234", "0054...", "011 5555 1234" -> "+54...". Numbers without
+    an international prefix get the country's calling code (dropping a trunk 0).
+    For countries missing from COUNTRY_PREFIXES a local number is returned as
+    its bare digits, for the providers to resolve with the country code.
+    None when the result cannot be a valid number.
+    """
+    raw = phone.strip()
+    digits = re.sub(r"\D", "", raw)
+    if digits.startswith("00") and not raw.startswith("+"):
+        digits = digits[2:]
+    elif not raw.startswith("+"):
+        prefix = COUNTRY_PREFIXES.get(country_code.upper())
+        if prefix is None:
+            return digits if 6 <= len(digits) <= 15 else None
+        digits = prefix + digits.lstrip("0")
+    if not 8 <= len(digits) <= 15 or digits[0] == "0":
+        return None
+    return f"+{digits}"
+
+
+def _providers() -> list[tuple[str, Callable[[str, str], Awaitable]]]:
+    """Configured providers, preferred first."""
+    providers = []
+    if settings.TELEGRAM_API_ID is not None and settings.TELEGRAM_API_HASH and settings.TELEGRAM_SESSION:
+        from app.services.telegram_truecaller_service import telegram_truecaller_service
+        providers.append(("telegram", telegram_truecaller_service.lookup))
+    if settings.TRUECALLER_TOKEN:
+        from app.services.truecaller_service import truecaller_service
+        providers.append(("truecaller", truecaller_service.lookup))
+    return providers
+
+
+async def _call_provider(name: str, lookup, phone: str, country_code: str):
+    with tracing.span("phone.provider", provider=name):
+        try:
+            return await lookup(phone, country_code)
+        except Exception as e:
+            logger.warning(f"{name} phone lookup error: {e}")
+            return None
+
+
+async def _hedged_lookup(phone: str, country_code: str):
+    """
+    Start the preferred provider; start the next one when the previous has
+    failed or is still running after the hedge delay. The first result with
+    found=True wins; otherwise the first clean "not found", else the last error.
+    """
+    providers = _providers()
+    if not providers:
+        return None
+
+    tasks: list[asyncio.Task] = []
+    results = []
+    try:
+        for name, lookup in providers:
+            tasks.append(asyncio.create_task(_call_provider(name, lookup, phone, country_code)))
+            pending = {t for t in tasks if not t.done()}
+            deadline = time.monotonic() + settings.PHONE_HEDGE_DELAY_SECONDS
+            while pending:
+                timeout = deadline - time.monotonic() if len(tasks) < len(providers) else None
+                if timeout is not None and timeout <= 0:
+                    break  # slow: hedge with the next provider
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    result = task.result()
+                    if result is not None and result.found:
+                        return result
+                    results.append(result)
+                if len(tasks) < len(providers) and not pending:
+                    break  # nothing in flight found it: fall back right away
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    answered = [r for r in results if r is not None]
+    clean = [r for r in answered if not r.error]
+    if clean:
+        return clean[0]
+    return answered[-1] if answered else None
+
+
+def _cache_key(phone: str, country_code: str) -> str:
+    """E.164 numbers are global; bare local digits only mean something within their country."""
+    return phone if phone.startswith("+") else f"{country_code.upper()}:{phone}"
+
+
+def is_cached(phone: str, country_code: str = "AR") -> bool:
+    """True when lookup_phone would answer this number from the cache."""
+    cached = _phone_cache.get(_cache_key(phone, country_code))
+    return cached is not None and cached[0] > time.monotonic()
+
+
+async def lookup_phone(phone: str, country_code: str = "AR"):
+    """
+    Provider result (TruecallerResult) for a number from normalize_e164, or
+    None when no provider is configured or all of them failed. Found and
+    clean "not found" answers are cached; errors are not.
+    """
+    key = _cache_key(phone, country_code)
+    cached = _phone_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        metrics.CACHE_HIT["phone"].inc()
+        tracing.annotate("cache", "hit")
+        return cached[1]
+    metrics.CACHE_MISS["phone"].inc()
+    tracing.annotate("cache", "miss")
+
+    future = _phone_inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(_hedged_lookup(phone, country_code))
+        _phone_inflight[key] = future
+        future.add_done_callback(lambda _: _phone_inflight.pop(key, None))
+    result = await asyncio.shield(future)
+
+    if result is not None and not result.error:
+        _phone_cache[key] = (time.monotonic() + settings.PHONE_CACHE_TTL_SECONDS, result)
+        if len(_phone_cache) > settings.PHONE_CACHE_MAX_ENTRIES:
+            _prune_cache()
+    return result
+
+
+def _prune_cache() -> None:
+    """Drop expired entries, then the soonest-expiring ones, down to the limit."""
+    now = time.monotonic()
+    for key in [k for k, (expires, _) in _phone_cache.items() if expires <= now]:
+        del _phone_cache[key]
+    excess = len(_phone_cache) - settings.PHONE_CACHE_MAX_ENTRIES
+    if excess > 0:
+        for key in sorted(_phone_cache, key=lambda k: _phone_cache[k][0])[:excess]:
+            del _phone_cache[key]
@@ -0,0 +1,35 @@
+"""
+FK94 Security Platform - Async Rate Limiter
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket for outbound calls: `rate` acquisitions per second with
+    bursts of up to `burst`.
+
+    Callers that exceed the budget reserve a future slot and sleep until it,
+    so waiters are served in arrival order. The bucket is only touched
+    between awaits, which keeps it safe without an asyncio.Lock (and usable
+    from more than one event loop, e.g. in tests).
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
@@ -0,0 +1,145 @@
+"""
+FK94 Security Platform - Report Artifact Store
+Rendered PDFs on local disk, addressed by the SHA-256 of the AuditResult they
+were rendered from, minus its per-run identity (id, timestamp, timings).
+Identical audits on the same day map to one file; the least recently served
+files are evicted once the store exceeds REPORT_STORE_MAX_BYTES.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from datetime import date, datetime, time, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.models.schemas import AuditResult
+from app.services.pdf_renderer import pdf_render_pool
+
+logger = logging.getLogger(__name__)
+
+# Bump when the report layout changes so old artifacts are not served for new renders
+RENDER_VERSION = "2"
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# New on every run of the same audit, so left out of the digest
+_RUN_FIELDS = {"id", "timestamp", "timings", "ai_job_id"}
+
+
+def _report_date(audit: AuditResult) -> date:
+    ts = audit.timestamp
+    return (ts.astimezone(timezone.utc) if ts.tzinfo else ts).date()
+
+
+def audit_digest(audit: AuditResult) -> str:
+    """Content hash of an audit (canonical JSON, sorted keys) and its report date."""
+    canonical = json.dumps(
+        {
+            "render_version": RENDER_VERSION,
+            "report_date": _report_date(audit).isoformat(),
+            "audit": audit.model_dump(mode="json", exclude=_RUN_FIELDS),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def report_view(audit: AuditResult, digest: str) -> AuditResult:
+    """The audit as rendered: report id and date derived from the digest, not the run."""
+    return audit.model_copy(update={
+        "id": digest[:12],
+        "timestamp": datetime.combine(_report_date(audit), time.min, timezone.utc),
+    })
+
+
+class ReportStore:
+    def __init__(self, root_dir: str, max_bytes: int):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def path_for(self, digest: str) -> str:
+        if not _DIGEST_RE.match(digest):
+            raise ValueError("Invalid report digest")
+        return os.path.join(self.root_dir, digest[:2], f"{digest}.pdf")
+
+    def get(self, digest: str) -> Optional[str]:
+        """Path of a stored report, or None. Marks it as recently used."""
+        path = self.path_for(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    async def get_or_render(self, audit: AuditResult) -> tuple[str, str]:
+        """Return (digest, path), rendering only if no identical report is stored."""
+        digest = audit_digest(audit)
+        path = self.get(digest)
+        if path:
+            return digest, path
+
+        future = self._inflight.get(digest)
+        if future is None:
+            future = asyncio.ensure_future(self._render(audit, digest))
+            self._inflight[digest] = future
+            future.add_done_callback(lambda _: self._inflight.pop(digest, None))
+        return digest, await asyncio.shield(future)
+
+    async def _render(self, audit: AuditResult, digest: str) -> str:
+        path = self.path_for(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Render under a temp name and rename, so readers never see a partial file
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            await pdf_render_pool.render_to_file(report_view(audit, digest), tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        await asyncio.to_thread(self.evict, keep=path)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used reports until under max_bytes. Returns files removed."""
+        files = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root_dir):
+            for name in filenames:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"Report store evicted {removed} files")
+        return removed
+
+
+# Singleton instance
+report_store = ReportStore(settings.REPORT_STORE_DIR, settings.REPORT_STORE_MAX_BYTES)
@@ -3,10 +3,11 @@ FK94 Security Platform - Stripe Payment Service
 """
 import asyncio
 import logging
+import time
 import stripe
-from collections import OrderedDict
 from typing import Optional
 from app.core.config import settings
+from app.services import webhook_store
 from app.services.supabase_admin_service import supabase_admin_service
 
 logger = logging.getLogger(__name__)
@@ -15,41 +16,39 @@ logger = logging.getLogger(__name__)
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
-class _IdempotencyCache:
-    """LRU cache of processed Stripe event IDs to prevent duplicate handling."""
-
-    def __init__(self, maxsize: int = 1000):
-        self._cache: OrderedDict[str, dict] = OrderedDict()
-        self._maxsize = maxsize
-
-    def get(self, event_id: str) -> Optional[dict]:
-        if event_id in self._cache:
-            self._cache.move_to_end(event_id)
-            return self._cache[event_id]
-        return None
-
-    def put(self, event_id: str, result: dict) -> None:
-        self._cache[event_id] = result
-        self._cache.move_to_end(event_id)
-        while len(self._cache) > self._maxsize:
-            self._cache.popitem(last=False)
-
-
 class StripeService:
     def __init__(self):
         self.is_configured = bool(settings.STRIPE_SECRET_KEY)
         self._price_pro_monthly: Optional[str] = None
+        self._product: Optional[dict] = None
+        self._product_expires = 0.0
         self._price_lock = asyncio.Lock()
-        self._webhook_cache = _IdempotencyCache()
+
+    @staticmethod
+    async def _call(fn, *args, **kwargs):
+        """Run a (blocking) stripe SDK call in a worker thread."""
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    def invalidate_product_cache(self) -> None:
+        self._product = None
+        self._price_pro_monthly = None
+        self._product_expires = 0.0
 
     async def get_or_create_product(self) -> dict:
-        """Get or create the FK94 Pro product and price"""
+        """Get or create the FK94 Pro product and price (cached for STRIPE_PRODUCT_CACHE_TTL_SECONDS)"""
         if not self.is_configured:
             return {"error": "Stripe not configured"}
 
+        if self._product and time.monotonic() < self._product_expires:
+            return self._product
+
         async with self._price_lock:
+            # Another request may have resolved it while we waited
+            if self._product and time.monotonic() < self._product_expires:
+                return self._product
+
             # Search for existing product
-            products = stripe.Product.list(limit=10)
+            products = await self._call(stripe.Product.list, limit=10)
             pro_product = None
 
             for product in products.data:
@@ -59,19 +58,21 @@ class StripeService:
 
             # Create product if doesn't exist
             if not pro_product:
-                pro_product = stripe.Product.create(
+                pro_product = await self._call(
+                    stripe.Product.create,
                     name="FK94 Pro",
                     description="Unlimited security scans, dark web monitoring, and priority support",
                     metadata={"plan": "pro"}
                 )
 
             # Get or create price
-            prices = stripe.Price.list(product=pro_product.id, active=True)
+            prices = await self._call(stripe.Price.list, product=pro_product.id, active=True)
 
             if prices.data:
                 price = prices.data[0]
             else:
-                price = stripe.Price.create(
+                price = await self._call(
+                    stripe.Price.create,
                     product=pro_product.id,
                     unit_amount=1000,  # $10.00 in cents
                     currency="usd",
@@ -79,13 +80,15 @@ class StripeService:
                 )
 
             self._price_pro_monthly = price.id
+            self._product = {
+                "product_id": pro_product.id,
+                "price_id": price.id,
+                "amount": price.unit_amount / 100,
+                "currency": price.currency
+            }
+            self._product_expires = time.monotonic() + settings.STRIPE_PRODUCT_CACHE_TTL_SECONDS
 
-        return {
-            "product_id": pro_product.id,
-            "price_id": price.id,
-            "amount": price.unit_amount / 100,
-            "currency": price.currency
-        }
+        return self._product
 
     async def create_checkout_session(
         self,
@@ -98,35 +101,54 @@ class StripeService:
         if not self.is_configured:
             return {"error": "Stripe not configured"}
 
-        # Ensure product exists
-        if not self._price_pro_monthly:
-            await self.get_or_create_product()
-
+        # Resolved once, then served from cache
+        from_cache = self._product is not None and time.monotonic() < self._product_expires
         try:
-            session = stripe.checkout.Session.create(
-                mode="subscription",
-                payment_method_types=["card"],
-                line_items=[{
-                    "price": self._price_pro_monthly,
-                    "quantity": 1
-                }],
-                customer_email=user_email,
-                client_reference_id=user_id,
-                success_url=success_url,
-                cancel_url=cancel_url,
-                metadata={
-                    "user_id": user_id,
-                    "plan": "pro"
-                }
-            )
+            product = await self.get_or_create_product()
+        except stripe.error.StripeError as e:
+            return {"error": str(e)}
 
-            return {
-                "session_id": session.id,
-                "url": session.url
-            }
+        try:
+            session = await self._create_checkout(product["price_id"], user_email, user_id, success_url, cancel_url)
+        except stripe.error.InvalidRequestError as e:
+            if not from_cache:
+                return {"error": str(e)}
+            # Cached price was archived or deleted on Stripe's side: resolve it again once
+            logger.warning(f"Checkout with cached price {product['price_id']} failed ({e}), re-resolving")
+            self.invalidate_product_cache()
+            try:
+                product = await self.get_or_create_product()
+                session = await self._create_checkout(product["price_id"], user_email, user_id, success_url, cancel_url)
+            except stripe.error.StripeError as e:
+                return {"error": str(e)}
         except stripe.error.StripeError as e:
             return {"error": str(e)}
 
+        return {
+            "session_id": session.id,
+            "url": session.url
+        }
+
+    async def _create_checkout(self, price_id: str, user_email: str, user_id: str,
+                               success_url: str, cancel_url: str):
+        return await self._call(
+            stripe.checkout.Session.create,
+            mode="subscription",
+            payment_method_types=["card"],
+            line_items=[{
+                "price": price_id,
+                "quantity": 1
+            }],
+            customer_email=user_email,
+            client_reference_id=user_id,
+            success_url=success_url,
+            cancel_url=cancel_url,
+            metadata={
+                "user_id": user_id,
+                "plan": "pro"
+            }
+        )
+
     async def create_portal_session(
         self,
         customer_id: str,
@@ -137,7 +159,8 @@ class StripeService:
             return {"error": "Stripe not configured"}
 
         try:
-            session = stripe.billing_portal.Session.create(
+            session = await self._call(
+                stripe.billing_portal.Session.create,
                 customer=customer_id,
                 return_url=return_url
             )
@@ -146,7 +169,7 @@ class StripeService:
             return {"error": str(e)}
 
     async def handle_webhook(self, payload: bytes, sig_header: str) -> dict:
-        """Handle Stripe webhook events with idempotency."""
+        """Verify a Stripe webhook and store it in the inbox; the webhook worker processes it."""
         if not settings.STRIPE_WEBHOOK_SECRET:
             return {"error": "Webhook secret not configured"}
 
@@ -159,13 +182,23 @@ class StripeService:
         except stripe.error.SignatureVerificationError:
             return {"error": "Invalid signature"}
 
-        # Idempotency: skip already-processed events
         event_id = event.get("id", "")
-        cached = self._webhook_cache.get(event_id)
-        if cached is not None:
-            logger.info(f"Stripe webhook event {event_id} already processed, returning cached result")
-            return cached
+        if not event_id:
+            return {"error": "Invalid payload"}
+        event_type = event.get("type", "")
+
+        # Idempotency: the inbox is keyed on the event ID
+        recorded = await asyncio.to_thread(
+            webhook_store.record_event,
+            settings.WEBHOOK_DB_PATH, event_id, "stripe", event_type, dict(event),
+        )
+        if not recorded:
+            logger.info(f"Stripe webhook event {event_id} already received, skipping")
 
+        return {"received": True, "event_id": event_id, "event": event_type, "duplicate": not recorded}
+
+    async def process_event(self, event: dict) -> dict:
+        """Apply a stored Stripe event. Raises when a profile update should be retried."""
         event_type = event.get("type", "")
         data = event.get("data", {}).get("object", {})
         metadata = data.get("metadata", {}) or {}
@@ -223,15 +256,20 @@ class StripeService:
                 result["action"] = "payment_failed"
             result["handled"] = True
 
+        elif event_type.startswith(("product.", "price.")):
+            # Catalog changed in the dashboard: drop the cached Pro product/price
+            self.invalidate_product_cache()
+            result["action"] = "product_cache_invalidated"
+            result["handled"] = True
+
         elif event_type == "invoice.payment_failed":
             customer_id = data.get("customer")
             result["customer_id"] = customer_id
             result["action"] = "payment_failed"
             result["handled"] = True
 
-        # Cache the result for idempotency
-        if event_id:
-            self._webhook_cache.put(event_id, result)
+        if result.get("profile_updated") is False and supabase_admin_service.is_configured:
+            raise RuntimeError(f"Supabase profile update failed for {event_type}")
 
         return result
 
@@ -241,7 +279,8 @@ class StripeService:
             return None
 
         try:
-            subscriptions = stripe.Subscription.list(
+            subscriptions = await self._call(
+                stripe.Subscription.list,
                 customer=customer_id,
                 status="active",
                 limit=1
@@ -1,32 +1,89 @@
 """
 FK94 Security Platform - Supabase Admin Service
+PostgREST writes with the service-role key over one pooled client. Bulk
+profile updates are grouped by their (plan, quota) values into
+`id=in.(...)` PATCHes, and usage rows are inserted as JSON arrays, so a
+reconciliation over thousands of profiles is a handful of requests.
+Transient failures (429, 5xx, transport errors) are retried with jittered
+exponential backoff.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+import re
+from collections import defaultdict
 from typing import Optional
 
 import httpx
 
 from app.core.config import settings
+from app.services import event_store
 
 logger = logging.getLogger(__name__)
 
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+USAGE_SYNC_CURSOR = "supabase_api_usage"
+
 
 class SupabaseAdminService:
     def __init__(self) -> None:
         self.base_url = settings.SUPABASE_URL.rstrip("/")
         self.service_key = settings.SUPABASE_SERVICE_ROLE_KEY
         self.is_configured = bool(self.base_url and self.service_key)
+        self._client: Optional[httpx.AsyncClient] = None
 
     def _headers(self) -> dict:
         return {
             "apikey": self.service_key,
             "Authorization": f"Bearer {self.service_key}",
             "Content-Type": "application/json",
-            "Prefer": "return=representation",
+            "Prefer": "return=minimal",
         }
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled client, created on first use and reused across writes."""
+        if self._client is None or self._client.is_closed:
+            max_connections = settings.SUPABASE_MAX_CONNECTIONS
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers(),
+                timeout=15.0,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def _request(self, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """Send with retries on 429/5xx/transport errors. Returns None once retries are exhausted."""
+        attempts = max(1, settings.SUPABASE_MAX_RETRIES + 1)
+        for attempt in range(attempts):
+            try:
+                res = await self.client.request(method, path, **kwargs)
+                if res.status_code not in _RETRY_STATUSES:
+                    return res
+                error = f"HTTP {res.status_code}"
+            except httpx.TransportError as exc:
+                res = None
+                error = f"{type(exc).__name__}: {exc}"
+            if attempt + 1 < attempts:
+                # Full jitter: spread out replicas retrying the same outage
+                delay = random.uniform(0, settings.SUPABASE_RETRY_BASE_SECONDS * 2 ** attempt)
+                logger.warning(f"Supabase {method} {path} failed ({error}), retry {attempt + 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        logger.error(f"Supabase {method} {path} failed after {attempts} attempts ({error})")
+        return res
+
     async def update_profile_plan(
         self,
         *,
@@ -42,17 +99,114 @@ class SupabaseAdminService:
         if audits_remaining is not None:
             payload["audits_remaining"] = audits_remaining
 
-        url = f"{self.base_url}/rest/v1/profiles?id=eq.{user_id}"
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                res = await client.patch(url, headers=self._headers(), json=payload)
-                if res.status_code >= 300:
-                    logger.error(f"Supabase profile update failed [{res.status_code}]: {res.text[:200]}")
-                    return False
-            return True
+            res = await self._request("PATCH", "/rest/v1/profiles", params={"id": f"eq.{user_id}"}, json=payload)
         except Exception as exc:
             logger.error(f"Supabase profile update error: {exc}")
             return False
+        if res is None or res.status_code >= 300:
+            if res is not None:
+                logger.error(f"Supabase profile update failed [{res.status_code}]: {res.text[:200]}")
+            return False
+        return True
+
+    async def bulk_update_profiles(self, updates: list[dict]) -> dict:
+        """
+        Apply many {"user_id", "plan", "audits_remaining"?} updates. Users sharing
+        the same values go out together as PATCH profiles?id=in.(...), in chunks
+        of SUPABASE_BATCH_SIZE IDs.
+        """
+        if not self.is_configured:
+            logger.warning("Supabase admin service not configured; skipping bulk profile update")
+            return {"updated": 0, "failed": len(updates), "requests": 0}
+
+        groups: dict[tuple, list[str]] = defaultdict(list)
+        for update in updates:
+            key = (update["plan"], update.get("audits_remaining"))
+            if update["user_id"] not in groups[key]:
+                groups[key].append(update["user_id"])
+
+        batch_size = max(1, settings.SUPABASE_BATCH_SIZE)
+        summary = {"updated": 0, "failed": 0, "requests": 0}
+        for (plan, audits_remaining), user_ids in groups.items():
+            payload: dict = {"plan": plan}
+            if audits_remaining is not None:
+                payload["audits_remaining"] = audits_remaining
+            for i in range(0, len(user_ids), batch_size):
+                chunk = user_ids[i:i + batch_size]
+                summary["requests"] += 1
+                res = await self._request(
+                    "PATCH", "/rest/v1/profiles",
+                    params={"id": f"in.({','.join(chunk)})"}, json=payload,
+                )
+                if res is not None and res.status_code < 300:
+                    summary["updated"] += len(chunk)
+                else:
+                    if res is not None:
+                        logger.error(f"Supabase bulk profile update failed [{res.status_code}]: {res.text[:200]}")
+                    summary["failed"] += len(chunk)
+        return summary
+
+    async def insert_api_usage(self, rows: list[dict]) -> bool:
+        """
+        Insert api_usage rows as one JSON-array POST. Rows carry their own `id`
+        and existing ids are ignored, so a retried or replayed batch (e.g. after
+        a timeout once Postgres had committed) cannot insert duplicates.
+        """
+        if not rows:
+            return True
+        res = await self._request(
+            "POST",
+            "/rest/v1/api_usage",
+            params={"on_conflict": "id"},
+            headers={"Prefer": "resolution=ignore-duplicates,return=minimal"},
+            json=rows,
+        )
+        if res is None or res.status_code >= 300:
+            if res is not None:
+                logger.error(f"Supabase api_usage insert failed [{res.status_code}]: {res.text[:200]}")
+            return False
+        return True
+
+    async def sync_usage(self, db_path: str, max_batches: Optional[int] = None) -> dict:
+        """
+        Push user-attributed events from the local event store into api_usage,
+        SUPABASE_BATCH_SIZE rows per request. A cursor in the event store marks
+        the last event pushed, so reruns resume where the previous one stopped.
+        """
+        if not self.is_configured:
+            return {"error": "Supabase admin service not configured"}
+
+        batch_size = max(1, settings.SUPABASE_BATCH_SIZE)
+        summary = {"synced": 0, "skipped": 0, "requests": 0, "complete": False}
+        cursor = await asyncio.to_thread(event_store.get_sync_cursor, db_path, USAGE_SYNC_CURSOR)
+        while max_batches is None or summary["requests"] < max_batches:
+            events = await asyncio.to_thread(event_store.fetch_user_events_after, db_path, cursor, batch_size)
+            if not events:
+                summary["complete"] = True
+                break
+            rows = []
+            for event in events:
+                # api_usage.user_id references profiles(id); anything else would fail the whole batch
+                if not _UUID_RE.match(event["user_id"]):
+                    summary["skipped"] += 1
+                    continue
+                rows.append({
+                    "id": event["id"],  # local event uuid: makes the insert idempotent
+                    "user_id": event["user_id"],
+                    "endpoint": event["payload"].get("endpoint") or event["event_type"],
+                    "ip_address": event["payload"].get("ip"),
+                    "created_at": event["created_at"],
+                })
+            if rows:
+                summary["requests"] += 1
+                if not await self.insert_api_usage(rows):
+                    summary["error"] = "api_usage insert failed; cursor kept for the next run"
+                    break
+            summary["synced"] += len(rows)
+            cursor = (events[-1]["created_at"], events[-1]["id"])
+            await asyncio.to_thread(event_store.set_sync_cursor, db_path, USAGE_SYNC_CURSOR, *cursor)
+        return summary
 
 
 supabase_admin_service = SupabaseAdminService()
@@ -1,14 +1,30 @@
 """
 FK94 Security Platform - Truecaller via Telegram Bot
 Free phone lookup using @Truecaller_bot on Telegram
+
+Lookups are event-driven: a NewMessage handler on the bot chat resolves the
+waiting lookup as soon as the bot answers (or it times out). The bot gives
+no request ID, so sends are serialized: one number is outstanding at a
+time, and a reply is matched to it by reply_to when the bot quotes the
+message, otherwise by arriving after it.
+
+The client is connected at startup and kept warm by a supervisor task that
+health-checks it every TELEGRAM_HEALTH_INTERVAL_SECONDS and reconnects with
+backoff, so lookups do not pay the MTProto connect.
 """
 import asyncio
-import re
+import logging
+import time
+from dataclasses import dataclass
 from typing import Optional
 from pydantic import BaseModel
-from telethon import TelegramClient
+from telethon import TelegramClient, events
 from telethon.sessions import StringSession
 from app.core.config import settings
+from app.services.truecaller_parser import parse_bot_text
+from app.services.phone_intel import normalize_e164
+
+logger = logging.getLogger(__name__)
 
 
 class TruecallerResult(BaseModel):
@@ -24,6 +40,12 @@ class TruecallerResult(BaseModel):
     error: Optional[str] = None
 
 
+@dataclass
+class _PendingLookup:
+    future: asyncio.Future
+    message_id: Optional[int] = None  # set once send_message returns
+
+
 class TelegramTruecallerService:
     """
     Uses Telegram bot @Truecaller_bot to lookup phone numbers for free.
@@ -42,22 +64,93 @@ class TelegramTruecallerService:
         self.session = settings.TELEGRAM_SESSION
         self.is_configured = bool(self.api_id and self.api_hash)
         self._client: Optional[TelegramClient] = None
+        self._bot = None
+        self._connect_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+        self._pending: Optional[_PendingLookup] = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._supervisor: Optional[asyncio.Task] = None
+        self._health = {"connected": False, "last_ok": None, "failures": 0, "last_error": None}
+
+    async def start(self) -> None:
+        """Connect in the background and keep the client healthy until close()."""
+        if not self.is_configured or not self.session:
+            return
+        if self._supervisor and not self._supervisor.done():
+            return
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def _supervise(self) -> None:
+        min_backoff = min(1.0, settings.TELEGRAM_HEALTH_INTERVAL_SECONDS)
+        backoff = min_backoff
+        while True:
+            try:
+                client = await self._get_client()
+                await asyncio.wait_for(client.get_me(), timeout=settings.TELEGRAM_HEALTH_TIMEOUT_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._health.update(connected=False, last_error=str(e)[:200])
+                self._health["failures"] += 1
+                logger.warning(f"Telegram health check failed ({e}), reconnecting in {backoff:.0f}s")
+                await self._drop_client()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, settings.TELEGRAM_HEALTH_INTERVAL_SECONDS)
+                continue
+            if not self._health["connected"]:
+                logger.info("Telegram client connected")
+            self._health.update(connected=True, last_ok=time.time(), last_error=None)
+            backoff = min_backoff
+            await asyncio.sleep(settings.TELEGRAM_HEALTH_INTERVAL_SECONDS)
+
+    def health(self) -> dict:
+        return {**self._health, "supervised": bool(self._supervisor and not self._supervisor.done())}
+
+    async def _drop_client(self) -> None:
+        async with self._connect_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.remove_event_handler(self._on_bot_message)
+            try:
+                await client.disconnect()
+            except Exception as e:
+                logger.debug(f"Telegram disconnect error: {e}")
 
     async def _get_client(self) -> TelegramClient:
-        """Get or create Telegram client"""
-        if self._client is None or not self._client.is_connected():
-            self._client = TelegramClient(
-                StringSession(self.session),
-                self.api_id,
-                self.api_hash
-            )
-            await self._client.connect()
-
-            if not await self._client.is_user_authorized():
-                raise Exception("Telegram session not authorized. Run setup first.")
+        """Get or create Telegram client, subscribed to the bot's messages"""
+        async with self._connect_lock:
+            if self._client is None or not self._client.is_connected():
+                client = TelegramClient(
+                    StringSession(self.session),
+                    self.api_id,
+                    self.api_hash
+                )
+                await client.connect()
+
+                if not await client.is_user_authorized():
+                    await client.disconnect()
+                    raise Exception("Telegram session not authorized. Run setup first.")
+
+                self._bot = await client.get_input_entity(self.BOT_USERNAME)
+                client.add_event_handler(self._on_bot_message, events.NewMessage(chats=[self._bot], incoming=True))
+                self._client = client
 
         return self._client
 
+    async def _on_bot_message(self, event) -> None:
+        """Resolve the outstanding lookup with the bot's reply."""
+        pending = self._pending
+        message = event.message
+        if pending is None or pending.future.done():
+            logger.debug(f"Unsolicited Truecaller bot message {message.id}")
+            return
+        if pending.message_id is not None:
+            if message.reply_to_msg_id is not None and message.reply_to_msg_id != pending.message_id:
+                return  # late answer to an earlier (timed-out) lookup
+            if message.id <= pending.message_id:
+                return
+        pending.future.set_result(message.text or "")
+
     async def lookup(self, phone: str, country_code: str = "AR") -> TruecallerResult:
         """
         Lookup phone number using Truecaller Telegram bot.
@@ -75,97 +168,56 @@ class TelegramTruecallerService:
                 error="Telegram API not configured. Add TELEGRAM_API_ID and TELEGRAM_API_HASH to .env"
             )
 
-        # Clean and format phone number
-        clean_phone = "".join(c for c in phone if c.isdigit() or c == "+")
+        # Numbers from phone_intel are already normalized; this covers direct callers
+        clean_phone = normalize_e164(phone, country_code) or "".join(c for c in phone if c.isdigit() or c == "+")
 
-        if not clean_phone.startswith("+"):
-            country_prefixes = {
-                "AR": "54", "US": "1", "BR": "55", "MX": "52",
-                "CO": "57", "CL": "56", "PE": "51", "UY": "598",
-                "PY": "595", "EC": "593", "VE": "58", "ES": "34",
-            }
-            prefix = country_prefixes.get(country_code.upper(), "")
-            if prefix:
-                clean_phone = f"+{prefix}{clean_phone}"
+        # Concurrent checks of the same number share one bot round-trip
+        task = self._inflight.get(clean_phone)
+        if task is None:
+            task = asyncio.create_task(self._lookup(clean_phone))
+            self._inflight[clean_phone] = task
+            task.add_done_callback(lambda _: self._inflight.pop(clean_phone, None))
+        return await asyncio.shield(task)
 
+    async def _lookup(self, clean_phone: str) -> TruecallerResult:
         try:
             client = await self._get_client()
 
-            # Send phone number to bot
-            await client.send_message(self.BOT_USERNAME, clean_phone)
-
-            # Wait for response (bot usually responds in 1-3 seconds)
-            await asyncio.sleep(2)
-
-            # Get last message from bot
-            messages = await client.get_messages(self.BOT_USERNAME, limit=1)
-
-            if not messages:
-                return TruecallerResult(found=False, error="No response from bot")
+            async with self._send_lock:
+                pending = _PendingLookup(asyncio.get_running_loop().create_future())
+                # Registered before sending: the reply can arrive before send_message returns
+                self._pending = pending
+                try:
+                    sent = await client.send_message(self._bot, clean_phone)
+                    pending.message_id = sent.id
+                    response_text = await asyncio.wait_for(
+                        pending.future, timeout=settings.TELEGRAM_LOOKUP_TIMEOUT_SECONDS
+                    )
+                finally:
+                    self._pending = None
 
-            response_text = messages[0].text
             return self._parse_bot_response(response_text, clean_phone)
 
+        except asyncio.TimeoutError:
+            return TruecallerResult(found=False, error="No response from bot")
         except Exception as e:
             return TruecallerResult(found=False, error=str(e))
 
     def _parse_bot_response(self, text: str, phone: str) -> TruecallerResult:
         """Parse the Truecaller bot response"""
-
-        if not text:
-            return TruecallerResult(found=False)
-
-        # Check if not found
-        if "not found" in text.lower() or "no results" in text.lower():
-            return TruecallerResult(found=False)
-
-        result = TruecallerResult(found=True)
-
-        # Parse name (usually first line or after "Name:")
-        name_match = re.search(r"(?:Name|Nombre)[:\s]*(.+?)(?:\n|$)", text, re.IGNORECASE)
-        if name_match:
-            result.name = name_match.group(1).strip()
-        else:
-            # Try first line if it looks like a name
-            lines = text.strip().split("\n")
-            if lines and not any(x in lines[0].lower() for x in ["spam", "carrier", "location", "phone"]):
-                result.name = lines[0].strip()
-
-        # Parse carrier
-        carrier_match = re.search(r"(?:Carrier|Operador|Provider)[:\s]*(.+?)(?:\n|$)", text, re.IGNORECASE)
-        if carrier_match:
-            result.carrier = carrier_match.group(1).strip()
-
-        # Parse location
-        location_match = re.search(r"(?:Location|Ubicación|Country|City)[:\s]*(.+?)(?:\n|$)", text, re.IGNORECASE)
-        if location_match:
-            result.location = location_match.group(1).strip()
-
-        # Parse spam info
-        if "spam" in text.lower():
-            result.tags.append("spam")
-            spam_match = re.search(r"spam[:\s]*(\d+)", text, re.IGNORECASE)
-            if spam_match:
-                result.spam_score = int(spam_match.group(1))
-            else:
-                result.spam_score = 5  # Default if spam mentioned but no score
-
-        if "scam" in text.lower():
-            result.tags.append("scam")
-            result.spam_score = max(result.spam_score, 8)
-
-        if "telemarketer" in text.lower() or "marketing" in text.lower():
-            result.tags.append("telemarketer")
-
-        if "business" in text.lower() or "empresa" in text.lower():
-            result.tags.append("business")
-
-        return result
+        return TruecallerResult(**parse_bot_text(text))
 
     async def close(self):
-        """Close Telegram client"""
-        if self._client and self._client.is_connected():
-            await self._client.disconnect()
+        """Stop the supervisor and close the Telegram client"""
+        if self._supervisor:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except asyncio.CancelledError:
+                pass
+            self._supervisor = None
+        await self._drop_client()
+        self._health["connected"] = False
 
 
 # Singleton
@@ -0,0 +1,138 @@
+"""
+FK94 Security Platform - Truecaller Response Parser
+Parsers shared by the Telegram bot and direct API lookups. Bot replies are
+read with one precompiled, case-insensitive token pattern in a single
+finditer pass (labelled fields, spam score, tag keywords, "not found"
+markers), instead of one re.search and one text.lower() per field.
+
+Both parsers return TruecallerResult field dicts; each service wraps them in
+its own result model.
+"""
+import re
+from typing import Optional
+
+# Field labels capture their value through a lookahead, so the scan carries on
+# inside the value (e.g. "Name: Spam Likely" still tags spam). The leading
+# first-letter class lets the scan skip most positions without trying every
+# alternative.
+_BOT_TOKEN_RE = re.compile(
+    r"""
+    (?=[bcelmnopstu])
+    (?:
+    (?P<label>name|nombre|carrier|operador|provider|location|ubicación|country|city)
+        [:\s]*(?=(?P<value>[^\n]+))
+    | spam[:\s]*(?P<spam_score>\d+)
+    | (?P<keyword>spam|scam|telemarketer|marketing|business|empresa|not\ found|no\ results)
+    )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_LABEL_FIELDS = {
+    "name": "name", "nombre": "name",
+    "carrier": "carrier", "operador": "carrier", "provider": "carrier",
+    "location": "location", "ubicación": "location", "country": "location", "city": "location",
+}
+_KEYWORD_TAGS = {
+    "spam": "spam", "scam": "scam",
+    "telemarketer": "telemarketer", "marketing": "telemarketer",
+    "business": "business", "empresa": "business",
+}
+_TAG_ORDER = ("spam", "scam", "telemarketer", "business")
+# A first line containing any of these is a field line, not a bare name
+_FIRST_LINE_FIELDS = ("spam", "carrier", "location", "phone")
+
+_NOT_FOUND = {"found": False}
+
+
+def parse_bot_text(text: Optional[str]) -> dict:
+    """Fields from a @Truecaller_bot reply ({"found": False} when it has no match)."""
+    if not text:
+        return dict(_NOT_FOUND)
+
+    fields: dict = {}
+    tags: set[str] = set()
+    spam_score: Optional[int] = None
+
+    for match in _BOT_TOKEN_RE.finditer(text):
+        label = match.group("label")
+        if label is not None:
+            field = _LABEL_FIELDS[label.lower()]
+            if field not in fields:
+                fields[field] = match.group("value").strip()
+            continue
+        score = match.group("spam_score")
+        if score is not None:
+            tags.add("spam")
+            if spam_score is None:
+                spam_score = int(score)
+            continue
+        keyword = match.group("keyword").lower()
+        if keyword in ("not found", "no results"):
+            return dict(_NOT_FOUND)
+        tags.add(_KEYWORD_TAGS[keyword])
+
+    if "name" not in fields:
+        first_line = text.strip().partition("\n")[0]
+        lowered = first_line.lower()
+        if not any(word in lowered for word in _FIRST_LINE_FIELDS):
+            fields["name"] = first_line.strip()
+
+    if "spam" in tags:
+        score = spam_score if spam_score is not None else 5  # spam mentioned but no score
+    else:
+        score = 0
+    if "scam" in tags:
+        score = max(score, 8)
+
+    return {
+        "found": True,
+        "name": fields.get("name"),
+        "carrier": fields.get("carrier"),
+        "location": fields.get("location"),
+        "spam_score": score,
+        "tags": [tag for tag in _TAG_ORDER if tag in tags],
+    }
+
+
+def parse_api_response(data: dict) -> dict:
+    """Fields from the first (best) match of a Truecaller search API response."""
+    results = data.get("data")
+    if not results:
+        return dict(_NOT_FOUND)
+    result = results[0]
+
+    phones = result.get("phones") or []
+    phone_info = phones[0] if phones else {}
+
+    location = None
+    addresses = result.get("addresses") or []
+    if addresses:
+        addr = addresses[0]
+        parts = [addr[key] for key in ("city", "state", "countryCode") if addr.get(key)]
+        location = ", ".join(parts) or None
+
+    spam_info = result.get("spamInfo") or {}
+    tags = list(result.get("badges", []))
+    if result.get("isSpam"):
+        tags.append("spam")
+    if result.get("isBusiness"):
+        tags.append("business")
+
+    email = next(
+        (ia.get("id") for ia in result.get("internetAddresses", []) if ia.get("type") == "email"),
+        None,
+    )
+
+    return {
+        "found": True,
+        "name": result.get("name") or result.get("altName") or None,
+        "carrier": phone_info.get("carrier"),
+        "phone_type": phone_info.get("type", "").lower() if phones else None,
+        "location": location,
+        "spam_score": spam_info.get("spamScore", 0),
+        "spam_type": spam_info.get("spamType"),
+        "tags": tags,
+        "image_url": result.get("image"),
+        "email": email,
+    }
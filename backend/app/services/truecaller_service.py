@@ -6,6 +6,8 @@ import httpx
 from typing import Optional
 from pydantic import BaseModel
 from app.core.config import settings
+from app.services.truecaller_parser import parse_api_response
+from app.services.phone_intel import normalize_e164
 
 
 class TruecallerResult(BaseModel):
@@ -58,28 +60,8 @@ class TruecallerService:
                 error="Truecaller not configured. Add TRUECALLER_TOKEN to .env"
             )
 
-        # Clean phone number
-        clean_phone = "".join(c for c in phone if c.isdigit() or c == "+")
-
-        # Add country code if not present
-        if not clean_phone.startswith("+"):
-            country_prefixes = {
-                "AR": "54",
-                "US": "1",
-                "BR": "55",
-                "MX": "52",
-                "CO": "57",
-                "CL": "56",
-                "PE": "51",
-                "UY": "598",
-                "PY": "595",
-                "EC": "593",
-                "VE": "58",
-                "ES": "34",
-            }
-            prefix = country_prefixes.get(country_code.upper(), "")
-            if prefix:
-                clean_phone = f"+{prefix}{clean_phone}"
+        # Numbers from phone_intel are already normalized; this covers direct callers
+        clean_phone = normalize_e164(phone, country_code) or "".join(c for c in phone if c.isdigit() or c == "+")
 
         headers = {
             "Authorization": f"Bearer {self.token}",
@@ -124,92 +106,7 @@ class TruecallerService:
 
     def _parse_response(self, data: dict, phone: str) -> TruecallerResult:
         """Parse Truecaller API response"""
-
-        # Check if we got results
-        if not data.get("data"):
-            return TruecallerResult(found=False)
-
-        results = data["data"]
-        if not results:
-            return TruecallerResult(found=False)
-
-        # Get first result (best match)
-        result = results[0]
-
-        # Extract name
-        name = None
-        if result.get("name"):
-            name = result["name"]
-        elif result.get("altName"):
-            name = result["altName"]
-
-        # Extract carrier/provider
-        carrier = None
-        phones = result.get("phones", [])
-        if phones:
-            phone_info = phones[0]
-            carrier = phone_info.get("carrier")
-            phone_type = phone_info.get("type", "").lower()
-        else:
-            phone_type = None
-
-        # Extract location
-        location = None
-        addresses = result.get("addresses", [])
-        if addresses:
-            addr = addresses[0]
-            parts = []
-            if addr.get("city"):
-                parts.append(addr["city"])
-            if addr.get("state"):
-                parts.append(addr["state"])
-            if addr.get("countryCode"):
-                parts.append(addr["countryCode"])
-            location = ", ".join(parts) if parts else None
-
-        # Extract spam info
-        spam_score = 0
-        spam_type = None
-        tags = []
-
-        spam_info = result.get("spamInfo", {})
-        if spam_info:
-            spam_score = spam_info.get("spamScore", 0)
-            spam_type = spam_info.get("spamType")
-
-        # Check badges/tags
-        badges = result.get("badges", [])
-        for badge in badges:
-            tags.append(badge)
-
-        if result.get("isSpam"):
-            tags.append("spam")
-        if result.get("isBusiness"):
-            tags.append("business")
-
-        # Image
-        image_url = result.get("image")
-
-        # Email (sometimes available)
-        email = None
-        internet_addresses = result.get("internetAddresses", [])
-        for ia in internet_addresses:
-            if ia.get("type") == "email":
-                email = ia.get("id")
-                break
-
-        return TruecallerResult(
-            found=True,
-            name=name,
-            carrier=carrier,
-            phone_type=phone_type,
-            location=location,
-            spam_score=spam_score,
-            spam_type=spam_type,
-            tags=tags,
-            image_url=image_url,
-            email=email
-        )
+        return TruecallerResult(**parse_api_response(data))
 
 
 # Singleton instance
@@ -0,0 +1,78 @@
+"""
+FK94 Security Platform - Batch Wallet Screening
+Screens a list of addresses under one process-wide concurrency budget.
+Label lookups are static tables and OFAC answers are cached in
+check_ofac_eth, so repeated counterparties across a batch cost one request.
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.models.schemas import RiskLevel, WalletBatchItem, WalletBatchRequest
+from app.services.multi_audit_service import check_wallet
+
+logger = logging.getLogger(__name__)
+
+# Shared by every batch (streamed requests and jobs) so concurrent batches
+# cannot multiply upstream load.
+_scan_slots = asyncio.Semaphore(max(1, settings.WALLET_BATCH_CONCURRENCY))
+
+
+def dedupe_addresses(addresses: list[str]) -> list[str]:
+    """Drop repeats, keeping first-seen order. EVM addresses compare case-insensitively."""
+    seen: set[str] = set()
+    unique: list[str] = []
+    for address in addresses:
+        key = address.lower() if address.startswith("0x") else address
+        if key not in seen:
+            seen.add(key)
+            unique.append(address)
+    return unique
+
+
+async def _screen_one(address: str, chain: str, chains: Optional[list[str]]) -> WalletBatchItem:
+    async with _scan_slots:
+        try:
+            result = await check_wallet(address, chain, chains)
+            return WalletBatchItem(address=address, result=result)
+        except Exception as exc:
+            logger.warning(f"Batch screening failed for {address}: {exc}")
+            return WalletBatchItem(address=address, error=str(exc)[:200])
+
+
+async def screen_wallets(
+    addresses: list[str], chain: str = "ethereum", chains: Optional[list[str]] = None
+) -> AsyncIterator[WalletBatchItem]:
+    """Yield one item per unique address, in completion order."""
+    tasks = [
+        asyncio.create_task(_screen_one(address, chain, chains))
+        for address in dedupe_addresses(addresses)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Consumer went away (e.g. client disconnected mid-stream)
+        for task in tasks:
+            task.cancel()
+
+
+async def run_wallet_batch(request: WalletBatchRequest) -> dict:
+    """Screen a whole batch and return items in input order plus a summary."""
+    items = [item async for item in screen_wallets(request.addresses, request.chain, request.chains)]
+    order = {address: i for i, address in enumerate(dedupe_addresses(request.addresses))}
+    items.sort(key=lambda item: order[item.address])
+
+    screened = [item.result for item in items if item.result]
+    return {
+        "summary": {
+            "requested": len(request.addresses),
+            "unique": len(items),
+            "screened": len(screened),
+            "failed": len(items) - len(screened),
+            "sanctioned": sum(1 for r in screened if r.ofac_sanctioned),
+            "high_risk": sum(1 for r in screened if r.risk_level in (RiskLevel.CRITICAL, RiskLevel.HIGH)),
+        },
+        "items": [item.model_dump() for item in items],
+    }
@@ -2,9 +2,13 @@
 FK94 Security Platform - Wallet Deep Scan Service
 Detects exchange interactions, mixer usage, OFAC sanctions, and calculates traceability score.
 """
+import asyncio
+import time
 import httpx
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from itertools import chain
+from typing import NamedTuple, Optional
+from app.core import metrics, tracing
 from app.core.config import settings
 from app.models.schemas import ExchangeInteraction, RiskLevel
 
@@ -110,343 +114,636 @@ TORNADO_CASH_ADDRESSES: dict[str, str] = {
     "0xbb93e510bbcd0b7beb5a853875f9ec60275cf498": "Tornado Cash Relayer 3",
 }
 
+# === Known Exchange Addresses (Solana) ===
+# Sources: Solscan labels
+KNOWN_EXCHANGE_ADDRESSES_SOL: dict[str, str] = {
+    "9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM": "Binance",
+    "5tzFkiKscXHK5ZXCGbXZxdw7gTjjD1mBwuoFbhUvuAi9": "Binance",
+    "H8sMJSCQxfKiFTCfDR3DUMLPwcRbM61LGFJ8N4dK3WjS": "Coinbase",
+    "2AQdpHJ2JpcEgPiATUXjQxA8QmafFegfQwSLWSprPicm": "Coinbase",
+    "FWznbcNXWQuHTawe9RxvQ2LdCENssh12dsznf4RiouN5": "Kraken",
+    "5VCwKtCXgCJ6kit5FybXjvriW3xELsFDhYrPSqtJNmcD": "OKX",
+    "AC5RDfQFmDS1deWZos921JfqscXdByf8BKHs5ACWjtW2": "Bybit",
+}
+
+# SPL mints shown by symbol; anything else is reported as "SPL"
+SOLANA_TOKEN_SYMBOLS: dict[str, str] = {
+    "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v": "USDC",
+    "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB": "USDT",
+}
+
 # Chainalysis Sanctions Oracle contract on Ethereum mainnet
 CHAINALYSIS_SANCTIONS_ORACLE = "0x40C57923924B5c5c5455c48D93317139ADDaC8fb"
 
 
-async def _fetch_eth_txs_blockscout(client: httpx.AsyncClient, address: str) -> list[dict]:
-    """Fetch transactions from Blockscout (free, no API key required)."""
-    all_txs: list[dict] = []
-    url = f"https://eth.blockscout.com/api/v2/addresses/{address}/transactions"
-    next_page_params = None
-
-    # Paginate up to 10 pages (50 txs per page = 500 max)
-    for _ in range(10):
-        params = dict(next_page_params) if next_page_params else {}
-        resp = await client.get(url, params=params)
-        if resp.status_code != 200:
-            break
-        data = resp.json()
-        items = data.get("items", [])
-        if not items:
-            break
-        all_txs.extend(items)
-        next_page_params = data.get("next_page_params")
-        if not next_page_params:
-            break
-
-    return all_txs
-
-
-async def _fetch_eth_txs_etherscan(client: httpx.AsyncClient, address: str, api_key: str) -> list[dict]:
-    """Fetch transactions from Etherscan V2 API (requires API key)."""
-    resp = await client.get("https://api.etherscan.io/v2/api", params={
-        "chainid": 1,
-        "module": "account",
-        "action": "txlist",
-        "address": address,
-        "startblock": 0,
-        "endblock": 99999999,
-        "page": 1,
-        "offset": 10000,
-        "sort": "asc",
-        "apikey": api_key,
-    })
-    if resp.status_code == 200:
-        data = resp.json()
-        result = data.get("result", [])
-        if isinstance(result, list):
-            return result
-    return []
-
-
-def _parse_blockscout_tx(tx: dict, address: str) -> dict:
-    """Normalize a Blockscout transaction to a common format."""
-    from_addr = (tx.get("from", {}) or {}).get("hash", "").lower()
-    to_addr = (tx.get("to", {}) or {}).get("hash", "").lower()
-    tx_hash = tx.get("hash", "")
-    value_str = tx.get("value", "0")
+class TxColumns(NamedTuple):
+    """
+    Transfer history decoded into parallel columns (one entry per transfer).
+
+    A row is a native transfer, an ERC-20 transfer or an internal call;
+    (hash, log_index) identifies it across overlapping listings. Timestamps
+    stay in the source's own sortable form (unix seconds for Etherscan,
+    ISO-8601 strings for Blockscout) and are only formatted for the rows
+    that end up in the result. A history always comes from a single source,
+    so min/max over the column is well defined.
+    """
+    hashes: list[str]
+    log_indexes: list[str]  # "" for the tx itself, "log:N" / "trace:N" otherwise
+    senders: list[str]
+    recipients: list[str]
+    values: list[int]  # base units
+    assets: list[str]
+    decimals: list[Optional[int]]  # None when the source did not report them
+    timestamps: list  # int | str, falsy when unknown
+
+
+def _to_int(value) -> int:
     try:
-        value_wei = int(value_str)
+        return int(value)
     except (ValueError, TypeError):
-        value_wei = 0
-    value_eth = f"{value_wei / 1e18:.6f} ETH"
-
-    ts_raw = tx.get("timestamp", "")
-    dt_str = None
-    if ts_raw:
-        try:
-            dt = datetime.fromisoformat(ts_raw.replace("Z", "+00:00"))
-            dt_str = dt.strftime("%Y-%m-%d %H:%M")
-        except (ValueError, TypeError):
-            pass
-
-    return {
-        "from": from_addr, "to": to_addr, "hash": tx_hash,
-        "value_eth": value_eth, "dt_str": dt_str,
-    }
+        return 0
 
 
-def _parse_etherscan_tx(tx: dict, address: str) -> dict:
-    """Normalize an Etherscan transaction to a common format."""
-    from_addr = tx.get("from", "").lower()
-    to_addr = tx.get("to", "").lower()
-    tx_hash = tx.get("hash", "")
+def _to_decimals(value) -> Optional[int]:
+    """Token decimals, or None when missing or garbled (the amount is then unknown)."""
     try:
-        value_wei = int(tx.get("value", "0"))
+        decimals = int(value)
     except (ValueError, TypeError):
-        value_wei = 0
-    value_eth = f"{value_wei / 1e18:.6f} ETH"
-
-    ts = tx.get("timeStamp", "")
-    dt_str = None
-    if ts:
-        try:
-            dt = datetime.utcfromtimestamp(int(ts))
-            dt_str = dt.strftime("%Y-%m-%d %H:%M")
-        except (ValueError, OSError):
-            pass
+        return None
+    return decimals if 0 <= decimals <= 77 else None
 
-    return {
-        "from": from_addr, "to": to_addr, "hash": tx_hash,
-        "value_eth": value_eth, "dt_str": dt_str,
-    }
+
+def _format_ts(value) -> Optional[str]:
+    """Format a unix timestamp or ISO-8601 string as 'YYYY-MM-DD HH:MM' (UTC)."""
+    if not value:
+        return None
+    try:
+        if isinstance(value, str):
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        else:
+            dt = datetime.fromtimestamp(int(value), timezone.utc)
+        return dt.strftime("%Y-%m-%d %H:%M")
+    except (ValueError, TypeError, OSError, OverflowError):
+        return None
+
+
+def _blockscout_addr(field) -> str:
+    return ((field or {}).get("hash") or "").lower()
+
+
+def _decode_blockscout_txs(raw_txs: list[dict], native: str = "ETH") -> TxColumns:
+    """Decode Blockscout v2 transactions into columns."""
+    n = len(raw_txs)
+    return TxColumns(
+        hashes=[tx.get("hash") or "" for tx in raw_txs],
+        log_indexes=[""] * n,
+        senders=[_blockscout_addr(tx.get("from")) for tx in raw_txs],
+        recipients=[_blockscout_addr(tx.get("to")) for tx in raw_txs],
+        values=[_to_int(tx.get("value")) for tx in raw_txs],
+        assets=[native] * n,
+        decimals=[18] * n,
+        timestamps=[tx.get("timestamp") or "" for tx in raw_txs],
+    )
+
+
+def _decode_blockscout_token_transfers(raw: list[dict], native: str = "ETH") -> TxColumns:
+    """Decode Blockscout v2 token transfers into columns."""
+    return TxColumns(
+        hashes=[t.get("transaction_hash") or t.get("tx_hash") or "" for t in raw],
+        log_indexes=[f"log:{t.get('log_index', '')}" for t in raw],
+        senders=[_blockscout_addr(t.get("from")) for t in raw],
+        recipients=[_blockscout_addr(t.get("to")) for t in raw],
+        values=[_to_int((t.get("total") or {}).get("value")) for t in raw],
+        assets=[(t.get("token") or {}).get("symbol") or "TOKEN" for t in raw],
+        decimals=[_to_decimals((t.get("total") or {}).get("decimals")) for t in raw],
+        timestamps=[t.get("timestamp") or "" for t in raw],
+    )
+
+
+def _decode_blockscout_internal(raw: list[dict], native: str = "ETH") -> TxColumns:
+    """Decode Blockscout v2 internal transactions into columns."""
+    n = len(raw)
+    return TxColumns(
+        hashes=[t.get("transaction_hash") or t.get("tx_hash") or "" for t in raw],
+        log_indexes=[f"trace:{t.get('index', '')}" for t in raw],
+        senders=[_blockscout_addr(t.get("from")) for t in raw],
+        recipients=[_blockscout_addr(t.get("to")) for t in raw],
+        values=[_to_int(t.get("value")) for t in raw],
+        assets=[native] * n,
+        decimals=[18] * n,
+        timestamps=[t.get("timestamp") or "" for t in raw],
+    )
+
+
+def _decode_etherscan_txs(raw_txs: list[dict], native: str = "ETH") -> TxColumns:
+    """Decode Etherscan `txlist` rows into columns."""
+    n = len(raw_txs)
+    return TxColumns(
+        hashes=[tx.get("hash") or "" for tx in raw_txs],
+        log_indexes=[""] * n,
+        senders=[(tx.get("from") or "").lower() for tx in raw_txs],
+        recipients=[(tx.get("to") or "").lower() for tx in raw_txs],
+        values=[_to_int(tx.get("value")) for tx in raw_txs],
+        assets=[native] * n,
+        decimals=[18] * n,
+        timestamps=[_to_int(tx.get("timeStamp")) for tx in raw_txs],
+    )
+
+
+def _decode_etherscan_token_transfers(raw: list[dict], native: str = "ETH") -> TxColumns:
+    """Decode Etherscan `tokentx` rows into columns."""
+    return TxColumns(
+        hashes=[t.get("hash") or "" for t in raw],
+        log_indexes=[f"log:{t.get('logIndex', '')}" for t in raw],
+        senders=[(t.get("from") or "").lower() for t in raw],
+        recipients=[(t.get("to") or "").lower() for t in raw],
+        values=[_to_int(t.get("value")) for t in raw],
+        assets=[t.get("tokenSymbol") or "TOKEN" for t in raw],
+        decimals=[_to_decimals(t.get("tokenDecimal")) for t in raw],
+        timestamps=[_to_int(t.get("timeStamp")) for t in raw],
+    )
+
+
+def _decode_etherscan_internal(raw: list[dict], native: str = "ETH") -> TxColumns:
+    """Decode Etherscan `txlistinternal` rows into columns."""
+    n = len(raw)
+    return TxColumns(
+        hashes=[t.get("hash") or "" for t in raw],
+        log_indexes=[f"trace:{t.get('traceId', '')}" for t in raw],
+        senders=[(t.get("from") or "").lower() for t in raw],
+        recipients=[(t.get("to") or "").lower() for t in raw],
+        values=[_to_int(t.get("value")) for t in raw],
+        assets=[native] * n,
+        decimals=[18] * n,
+        timestamps=[_to_int(t.get("timeStamp")) for t in raw],
+    )
+
+
+BLOCKSCOUT_DECODERS = {
+    "transactions": _decode_blockscout_txs,
+    "token_transfers": _decode_blockscout_token_transfers,
+    "internal": _decode_blockscout_internal,
+}
+ETHERSCAN_DECODERS = {
+    "transactions": _decode_etherscan_txs,
+    "token_transfers": _decode_etherscan_token_transfers,
+    "internal": _decode_etherscan_internal,
+}
 
 
-async def deep_scan_eth(address: str) -> dict:
+def _solana_token_deltas(meta: dict) -> dict[tuple[str, str], tuple[int, Optional[int]]]:
+    """Net SPL balance change per (owner, mint) -> (delta, decimals or None)."""
+    totals: dict[tuple[str, str], list] = {}
+    for sign, key in ((-1, "preTokenBalances"), (1, "postTokenBalances")):
+        for bal in meta.get(key) or []:
+            owner, mint = bal.get("owner"), bal.get("mint")
+            if not owner or not mint:
+                continue
+            amount = bal.get("uiTokenAmount") or {}
+            entry = totals.setdefault((owner, mint), [0, _to_decimals(amount.get("decimals"))])
+            entry[0] += sign * _to_int(amount.get("amount"))
+    return {key: (delta, decimals) for key, (delta, decimals) in totals.items() if delta}
+
+
+def decode_solana_txs(raw_txs: list[dict], address: str) -> TxColumns:
     """
-    Deep scan an Ethereum address: fetch transactions and cross-reference
-    with known exchange addresses and mixers.
-    Uses Blockscout (free) as primary source, Etherscan V2 as fallback with API key.
+    Decode `getTransaction` (jsonParsed) results into columns: one row per
+    system-program SOL transfer and one per SPL counterparty whose balance
+    moved opposite to the scanned address's in the same mint.
     """
-    address = address.lower()
-    api_key = settings.ETHERSCAN_API_KEY
+    rows: list[tuple] = []
+    for tx in raw_txs:
+        if not tx:
+            continue
+        meta = tx.get("meta") or {}
+        if meta.get("err"):
+            continue
+        message = (tx.get("transaction") or {}).get("message") or {}
+        signature = ((tx.get("transaction") or {}).get("signatures") or [""])[0]
+        block_time = tx.get("blockTime") or 0
+
+        instructions = list(message.get("instructions") or [])
+        for inner in meta.get("innerInstructions") or []:
+            instructions.extend(inner.get("instructions") or [])
+        for n, ix in enumerate(instructions):
+            parsed = ix.get("parsed")
+            if ix.get("program") != "system" or not isinstance(parsed, dict):
+                continue
+            if parsed.get("type") not in ("transfer", "transferWithSeed"):
+                continue
+            info = parsed.get("info") or {}
+            rows.append((
+                signature, f"ix:{n}", info.get("source") or "", info.get("destination") or "",
+                _to_int(info.get("lamports")), "SOL", 9, block_time,
+            ))
+
+        deltas = _solana_token_deltas(meta)
+        for (owner, mint), (own_delta, decimals) in deltas.items():
+            if owner != address:
+                continue
+            symbol = SOLANA_TOKEN_SYMBOLS.get(mint, "SPL")
+            for (other, other_mint), (delta, _) in deltas.items():
+                if other_mint != mint or other == address or (delta > 0) == (own_delta > 0):
+                    continue
+                sender, recipient = (other, address) if own_delta > 0 else (address, other)
+                rows.append((
+                    signature, f"tok:{mint}:{other}", sender, recipient,
+                    abs(delta), symbol, decimals, block_time,
+                ))
+
+    if not rows:
+        return TxColumns([], [], [], [], [], [], [], [])
+    return TxColumns(*(list(column) for column in zip(*rows)))
+
+
+def merge_columns(parts: list[TxColumns], address: str) -> TxColumns:
+    """
+    Concatenate decoded streams into one, dropping rows that repeat a
+    (hash, log_index) pair or that do not involve the scanned address
+    (e.g. contract-to-contract internal calls inside the address's txs).
+    `address` must already be in the chain's canonical form.
+    """
+    merged = TxColumns(*(
+        list(chain.from_iterable(getattr(part, field) for part in parts))
+        for field in TxColumns._fields
+    ))
+
+    seen: set[tuple[str, str]] = set()
+    keep: list[int] = []
+    for i, key in enumerate(zip(merged.hashes, merged.log_indexes)):
+        if key in seen:
+            continue
+        if merged.senders[i] != address and merged.recipients[i] != address:
+            continue
+        seen.add(key)
+        keep.append(i)
+
+    if len(keep) == len(merged.hashes):
+        return merged
+    return TxColumns(*([column[i] for i in keep] for column in merged))
+
+
+def classify_columns(
+    cols: TxColumns,
+    address: str,
+    exchange_labels: dict[str, str],
+    mixer_labels: Optional[dict[str, str]] = None,
+    chain: Optional[str] = None,
+) -> dict:
+    """
+    Classify a decoded history against exchange and mixer labels.
+
+    Label matching is done on the set of unique counterparties, so only the
+    rows that actually hit a label are visited again to build the
+    interactions returned to the caller. `address` must already be in the
+    chain's canonical form (lowercase for EVM, as-is for Solana).
+    """
+    mixer_labels = mixer_labels or {}
+    sent = [sender == address for sender in cols.senders]
+    counterparty_col = [
+        recipient if is_sent else sender
+        for sender, recipient, is_sent in zip(cols.senders, cols.recipients, sent)
+    ]
+
+    unique_counterparties = set(counterparty_col)
+    unique_counterparties.discard("")
+
+    exchange_hits = unique_counterparties & exchange_labels.keys()
+    mixer_hits = unique_counterparties & mixer_labels.keys()
+    labeled = exchange_hits | mixer_hits
+    matched_rows = (
+        [i for i, cp in enumerate(counterparty_col) if cp in labeled] if labeled else []
+    )
 
     exchange_interactions: list[ExchangeInteraction] = []
     mixer_interactions: list[str] = []
-    exchanges_detected: set[str] = set()
-    counterparties: set[str] = set()
-    first_tx_date: Optional[str] = None
-    last_tx_date: Optional[str] = None
-    warnings: list[str] = []
-    balance: Optional[str] = None
-    tx_count = 0
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        # 1. Get balance from Blockscout
-        try:
-            resp = await client.get(
-                f"https://eth.blockscout.com/api/v2/addresses/{address}"
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                coin_bal = data.get("coin_balance")
-                if coin_bal:
-                    try:
-                        balance = f"{int(coin_bal) / 1e18:.6f} ETH"
-                    except (ValueError, TypeError):
-                        pass
-        except Exception:
-            pass
-
-        # If no balance from Blockscout and we have Etherscan key, try that
-        if balance is None and api_key:
-            try:
-                resp = await client.get("https://api.etherscan.io/v2/api", params={
-                    "chainid": 1, "module": "account", "action": "balance",
-                    "address": address, "tag": "latest", "apikey": api_key,
-                })
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if data.get("status") == "1":
-                        wei = int(data.get("result", 0))
-                        balance = f"{wei / 1e18:.6f} ETH"
-            except Exception:
-                pass
-
-        # 2. Fetch transactions - try Blockscout first, then Etherscan
-        raw_txs: list[dict] = []
-        source = "blockscout"
-        try:
-            raw_txs = await _fetch_eth_txs_blockscout(client, address)
-        except Exception as e:
-            warnings.append(f"Blockscout error: {str(e)[:60]}")
-
-        if not raw_txs and api_key:
-            try:
-                raw_txs = await _fetch_eth_txs_etherscan(client, address, api_key)
-                source = "etherscan"
-            except Exception as e:
-                warnings.append(f"Etherscan error: {str(e)[:60]}")
-
-        # 3. Process transactions
-        tx_count = len(raw_txs)
-        for raw_tx in raw_txs:
-            if source == "blockscout":
-                tx = _parse_blockscout_tx(raw_tx, address)
-            else:
-                tx = _parse_etherscan_tx(raw_tx, address)
-
-            from_addr = tx["from"]
-            to_addr = tx["to"]
-            tx_hash = tx["hash"]
-            value_eth = tx["value_eth"]
-            dt_str = tx["dt_str"]
-
-            # Track timestamps
-            if dt_str:
-                if first_tx_date is None or dt_str < first_tx_date:
-                    first_tx_date = dt_str
-                if last_tx_date is None or dt_str > last_tx_date:
-                    last_tx_date = dt_str
-
-            # Determine counterparty
-            if from_addr == address:
-                counterparty = to_addr
-                direction = "sent"
+    volume: dict[str, dict[str, float]] = {}
+    for i in matched_rows:
+        counterparty = counterparty_col[i]
+        direction = "sent" if sent[i] else "received"
+        decimals = cols.decimals[i]
+        exchange_name = exchange_labels.get(counterparty)
+        if exchange_name:
+            per_asset = volume.setdefault(exchange_name, {})
+            if decimals is None:
+                # Unscaled base units would inflate the volume by orders of magnitude
+                value = None
             else:
-                counterparty = from_addr
-                direction = "received"
-
-            if counterparty:
-                counterparties.add(counterparty)
-
-            # Check exchange match
-            exchange_name = KNOWN_EXCHANGE_ADDRESSES_ETH.get(counterparty)
-            if exchange_name:
-                exchanges_detected.add(exchange_name)
-                exchange_interactions.append(ExchangeInteraction(
-                    exchange=exchange_name,
-                    address=counterparty,
-                    direction=direction,
-                    tx_hash=tx_hash,
-                    value=value_eth,
-                    timestamp=dt_str,
-                ))
+                amount = cols.values[i] / 10 ** decimals
+                per_asset[cols.assets[i]] = per_asset.get(cols.assets[i], 0.0) + amount
+                value = f"{amount:.6f} {cols.assets[i]}"
+            exchange_interactions.append(ExchangeInteraction(
+                exchange=exchange_name,
+                address=counterparty,
+                direction=direction,
+                tx_hash=cols.hashes[i],
+                value=value,
+                timestamp=_format_ts(cols.timestamps[i]),
+                chain=chain,
+            ))
+        mixer_name = mixer_labels.get(counterparty)
+        if mixer_name:
+            mixer_interactions.append(
+                f"{direction} via {mixer_name} (tx: {cols.hashes[i][:16]}...)"
+            )
 
-            # Check mixer match
-            mixer_name = TORNADO_CASH_ADDRESSES.get(counterparty)
-            if mixer_name:
-                mixer_interactions.append(
-                    f"{direction} via {mixer_name} (tx: {tx_hash[:16]}...)"
-                )
+    known_timestamps = [ts for ts in cols.timestamps if ts]
 
     return {
-        "balance": balance,
-        "tx_count": tx_count,
+        "tx_count": len(set(cols.hashes)),
         "exchange_interactions": exchange_interactions,
-        "exchanges_detected": sorted(exchanges_detected),
+        "exchanges_detected": sorted(volume),
+        "exchange_volume": {
+            name: {asset: round(total, 6) for asset, total in sorted(per_asset.items())}
+            for name, per_asset in sorted(volume.items())
+        },
         "mixer_interactions": mixer_interactions,
         "used_mixer": len(mixer_interactions) > 0,
-        "counterparties": len(counterparties),
-        "first_tx_date": first_tx_date,
-        "last_tx_date": last_tx_date,
-        "warnings": warnings,
+        "counterparties": len(unique_counterparties),
+        "first_tx_date": _format_ts(min(known_timestamps)) if known_timestamps else None,
+        "last_tx_date": _format_ts(max(known_timestamps)) if known_timestamps else None,
     }
 
 
+def merge_eth_columns(parts: list[TxColumns], address: str) -> TxColumns:
+    return merge_columns(parts, address.lower())
+
+
+def classify_eth_columns(cols: TxColumns, address: str) -> dict:
+    """Classify an Ethereum mainnet history (exchanges + Tornado Cash)."""
+    return classify_columns(
+        cols, address.lower(), KNOWN_EXCHANGE_ADDRESSES_ETH, TORNADO_CASH_ADDRESSES, "ethereum"
+    )
+
+
+@tracing.traced("wallet.deep_scan_eth")
+async def deep_scan_eth(address: str) -> dict:
+    """
+    Deep scan an Ethereum address: normal transactions, ERC-20 transfers and
+    internal transactions, merged and cross-referenced with known exchange
+    addresses and mixers. See EVMAdapter for sources and fallbacks.
+    """
+    from app.services.chain_adapters import get_adapter
+
+    return await get_adapter("ethereum").scan(address)
+
+
+# blockchain.info serves at most 50 txs per `rawaddr` page
+BTC_PAGE_SIZE = 50
+BTC_MAX_PAGES = 40
+BTC_FETCH_CONCURRENCY = 4
+BTC_MAX_LINKED_ADDRESSES = 50
+
+
+class _UnionFind:
+    """Disjoint-set forest over addresses (path halving + union by size)."""
+
+    def __init__(self) -> None:
+        self._parent: dict[str, str] = {}
+        self._size: dict[str, int] = {}
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._parent
+
+    def add(self, item: str) -> None:
+        if item not in self._parent:
+            self._parent[item] = item
+            self._size[item] = 1
+
+    def find(self, item: str) -> str:
+        parent = self._parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: str, b: str) -> str:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+        return root_a
+
+    def members(self, item: str) -> list[str]:
+        root = self.find(item)
+        return [x for x in self._parent if self.find(x) == root]
+
+
+def _looks_like_coinjoin(input_addrs: list[str], output_values: list[int]) -> bool:
+    """CoinJoins break common-input-ownership: many inputs, several equal outputs."""
+    if len(input_addrs) < 5:
+        return False
+    counts: dict[int, int] = {}
+    for value in output_values:
+        counts[value] = counts.get(value, 0) + 1
+    return max(counts.values(), default=0) >= 3
+
+
+def cluster_btc_inputs(txs: list[dict]) -> _UnionFind:
+    """
+    Apply the common-input-ownership heuristic: every address spending in
+    the same transaction is assumed to belong to the same entity.
+    """
+    clusters = _UnionFind()
+    for tx in txs:
+        input_addrs = [
+            (inp.get("prev_out") or {}).get("addr")
+            for inp in tx.get("inputs", [])
+        ]
+        input_addrs = [addr for addr in input_addrs if addr]
+        if not input_addrs:
+            continue
+        output_values = [out.get("value", 0) for out in tx.get("out", [])]
+        if _looks_like_coinjoin(input_addrs, output_values):
+            continue
+        first = input_addrs[0]
+        clusters.add(first)
+        for addr in input_addrs[1:]:
+            clusters.add(addr)
+            clusters.union(first, addr)
+    return clusters
+
+
+def _label_btc_clusters(clusters: _UnionFind) -> dict[str, str]:
+    """Map cluster roots to the exchange label of any labelled member."""
+    labels: dict[str, str] = {}
+    for addr, name in KNOWN_EXCHANGE_ADDRESSES_BTC.items():
+        if addr in clusters:
+            labels.setdefault(clusters.find(addr), name)
+    return labels
+
+
+async def _fetch_btc_page(client: httpx.AsyncClient, address: str, offset: int) -> Optional[dict]:
+    resp = await client.get(
+        f"https://blockchain.info/rawaddr/{address}",
+        params={"limit": BTC_PAGE_SIZE, "offset": offset},
+    )
+    if resp.status_code != 200:
+        return None
+    return resp.json()
+
+
+async def _fetch_btc_history(
+    client: httpx.AsyncClient, address: str, warnings: list[str]
+) -> tuple[Optional[dict], list[dict]]:
+    """
+    Fetch the first `rawaddr` page, then the remaining pages concurrently.
+    Returns (first_page, deduplicated_txs).
+    """
+    first_page = await _fetch_btc_page(client, address, 0)
+    if first_page is None:
+        warnings.append("Could not fetch BTC transactions")
+        return None, []
+
+    n_tx = first_page.get("n_tx", 0)
+    total = min(n_tx, BTC_PAGE_SIZE * BTC_MAX_PAGES)
+    semaphore = asyncio.Semaphore(BTC_FETCH_CONCURRENCY)
+
+    async def fetch(offset: int) -> Optional[dict]:
+        async with semaphore:
+            return await _fetch_btc_page(client, address, offset)
+
+    pages = await asyncio.gather(
+        *(fetch(offset) for offset in range(BTC_PAGE_SIZE, total, BTC_PAGE_SIZE)),
+        return_exceptions=True,
+    )
+
+    txs_by_hash: dict[str, dict] = {}
+    failed_pages = 0
+    for page in [first_page, *pages]:
+        if not isinstance(page, dict):
+            failed_pages += 1
+            continue
+        for tx in page.get("txs", []):
+            txs_by_hash.setdefault(tx.get("hash", ""), tx)
+
+    if failed_pages:
+        warnings.append(f"{failed_pages} BTC history page(s) could not be fetched")
+    if n_tx > total:
+        warnings.append(f"BTC history truncated to the latest {total} of {n_tx} transactions")
+
+    return first_page, list(txs_by_hash.values())
+
+
+@tracing.traced("wallet.deep_scan_btc")
 async def deep_scan_btc(address: str) -> dict:
     """
-    Deep scan a Bitcoin address: fetch transactions from blockchain.info
-    and cross-reference with known exchange addresses.
+    Deep scan a Bitcoin address: fetch its full (paginated) history from
+    blockchain.info, cluster input addresses by common ownership and
+    cross-reference counterparties and their clusters with exchange labels.
     """
     exchange_interactions: list[ExchangeInteraction] = []
-    exchanges_detected: set[str] = set()
+    volume_sat: dict[str, int] = {}
     counterparties: set[str] = set()
-    first_tx_date: Optional[str] = None
-    last_tx_date: Optional[str] = None
+    timestamps: list[int] = []
     warnings: list[str] = []
     balance: Optional[str] = None
     tx_count = 0
+    linked_addresses: list[str] = []
+    cluster_label: Optional[str] = None
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            resp = await client.get(
-                f"https://blockchain.info/rawaddr/{address}",
-                params={"limit": 100},
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                sat_balance = data.get("final_balance", 0)
-                balance = f"{sat_balance / 1e8:.8f} BTC"
-                tx_count = data.get("n_tx", 0)
-
-                for tx in data.get("txs", []):
-                    tx_hash = tx.get("hash", "")
-                    ts = tx.get("time", 0)
-                    dt_str = None
-                    if ts:
-                        try:
-                            dt = datetime.utcfromtimestamp(ts)
-                            dt_str = dt.strftime("%Y-%m-%d %H:%M")
-                            if first_tx_date is None:
-                                first_tx_date = dt_str
-                            last_tx_date = dt_str
-                        except (ValueError, OSError):
-                            pass
-
-                    # Collect all output addresses
-                    input_addrs = set()
-                    for inp in tx.get("inputs", []):
-                        prev = inp.get("prev_out", {})
-                        addr = prev.get("addr", "")
-                        if addr:
-                            input_addrs.add(addr)
-
-                    output_addrs = set()
-                    for out in tx.get("out", []):
-                        addr = out.get("addr", "")
-                        if addr:
-                            output_addrs.add(addr)
-
-                    # Determine direction
-                    if address in input_addrs:
-                        direction = "sent"
-                        related = output_addrs - {address}
-                    else:
-                        direction = "received"
-                        related = input_addrs - {address}
-
-                    for cp in related:
-                        counterparties.add(cp)
-                        exchange_name = KNOWN_EXCHANGE_ADDRESSES_BTC.get(cp)
-                        if exchange_name:
-                            exchanges_detected.add(exchange_name)
-                            exchange_interactions.append(ExchangeInteraction(
-                                exchange=exchange_name,
-                                address=cp,
-                                direction=direction,
-                                tx_hash=tx_hash,
-                                timestamp=dt_str,
-                            ))
-        except Exception as e:
-            warnings.append(f"Error fetching BTC transactions: {str(e)[:80]}")
-
-    # Sort timestamps for BTC (txs come newest first)
-    if first_tx_date and last_tx_date and first_tx_date > last_tx_date:
-        first_tx_date, last_tx_date = last_tx_date, first_tx_date
+    try:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            first_page, txs = await _fetch_btc_history(client, address, warnings)
+    except Exception as e:
+        warnings.append(f"Error fetching BTC transactions: {str(e)[:80]}")
+        first_page, txs = None, []
+
+    if first_page is not None:
+        balance = f"{first_page.get('final_balance', 0) / 1e8:.8f} BTC"
+        tx_count = first_page.get("n_tx", 0)
+
+    clusters = cluster_btc_inputs(txs)
+    cluster_labels = _label_btc_clusters(clusters)
+
+    def exchange_for(addr: str) -> Optional[str]:
+        name = KNOWN_EXCHANGE_ADDRESSES_BTC.get(addr)
+        if name is None and addr in clusters:
+            name = cluster_labels.get(clusters.find(addr))
+        return name
+
+    for tx in txs:
+        tx_hash = tx.get("hash", "")
+        ts = tx.get("time", 0)
+        if ts:
+            timestamps.append(ts)
+
+        input_addrs = {
+            (inp.get("prev_out") or {}).get("addr")
+            for inp in tx.get("inputs", [])
+        }
+        input_addrs.discard(None)
+        input_addrs.discard("")
+        output_values: dict[str, int] = {}
+        for out in tx.get("out", []):
+            addr = out.get("addr")
+            if addr:
+                output_values[addr] = output_values.get(addr, 0) + out.get("value", 0)
+
+        if address in input_addrs:
+            direction = "sent"
+            related = set(output_values) - {address}
+        else:
+            direction = "received"
+            related = input_addrs - {address}
+
+        # A received amount is counted once per exchange, however many of
+        # that exchange's (clustered) inputs funded the tx
+        counted: set[str] = set()
+        for cp in sorted(related):
+            counterparties.add(cp)
+            exchange_name = exchange_for(cp)
+            if not exchange_name:
+                continue
+            value_sat = output_values.get(cp if direction == "sent" else address, 0)
+            if direction == "sent" or exchange_name not in counted:
+                counted.add(exchange_name)
+                volume_sat[exchange_name] = volume_sat.get(exchange_name, 0) + value_sat
+            exchange_interactions.append(ExchangeInteraction(
+                exchange=exchange_name,
+                address=cp,
+                direction=direction,
+                tx_hash=tx_hash,
+                value=f"{value_sat / 1e8:.8f} BTC",
+                timestamp=_format_ts(ts),
+            ))
+
+    if address in clusters:
+        linked_addresses = sorted(a for a in clusters.members(address) if a != address)
+        linked_addresses = linked_addresses[:BTC_MAX_LINKED_ADDRESSES]
+        cluster_label = cluster_labels.get(clusters.find(address))
 
     return {
         "balance": balance,
         "tx_count": tx_count,
         "exchange_interactions": exchange_interactions,
-        "exchanges_detected": sorted(exchanges_detected),
+        "exchanges_detected": sorted(volume_sat),
+        "exchange_volume": {
+            name: {"BTC": round(sat / 1e8, 8)} for name, sat in sorted(volume_sat.items())
+        },
         "mixer_interactions": [],
         "used_mixer": False,
         "counterparties": len(counterparties),
-        "first_tx_date": first_tx_date,
-        "last_tx_date": last_tx_date,
+        "linked_addresses": linked_addresses,
+        "cluster_label": cluster_label,
+        "first_tx_date": _format_ts(min(timestamps)) if timestamps else None,
+        "last_tx_date": _format_ts(max(timestamps)) if timestamps else None,
         "warnings": warnings,
     }
 
 
-async def check_ofac_eth(address: str) -> bool:
-    """
-    Query the Chainalysis Sanctions Oracle (on-chain, free) to check
-    if an Ethereum address is sanctioned by OFAC.
-    Uses eth_call to the oracle contract's isSanctioned(address) function.
-    """
-    address = address.lower()
+# Sanctions answers are shared across concurrent scans (batch screening hits
+# the same counterparties repeatedly): address -> (expires_at, sanctioned)
+_ofac_cache: dict[str, tuple[float, bool]] = {}
+_ofac_inflight: dict[str, asyncio.Future] = {}
+
+
+@tracing.traced("wallet.ofac_oracle")
+async def _query_sanctions_oracle(address: str) -> Optional[bool]:
+    """Single oracle eth_call; None when the answer could not be obtained."""
     # isSanctioned(address) selector = 0xdfb80831
     # ABI-encode the address parameter (32 bytes, zero-padded)
     addr_padded = address.replace("0x", "").zfill(64)
@@ -477,7 +774,39 @@ async def check_ofac_eth(address: str) -> bool:
                     return result[-1] == "1"
     except Exception:
         pass
-    return False
+    return None
+
+
+@tracing.traced("wallet.ofac")
+async def check_ofac_eth(address: str) -> bool:
+    """
+    Query the Chainalysis Sanctions Oracle (on-chain, free) to check
+    if an Ethereum address is sanctioned by OFAC.
+    Uses eth_call to the oracle contract's isSanctioned(address) function.
+    Answers are cached for OFAC_CACHE_TTL_SECONDS and concurrent lookups of
+    the same address share one request; failed lookups are not cached.
+    """
+    address = address.lower()
+    cached = _ofac_cache.get(address)
+    if cached and cached[0] > time.monotonic():
+        metrics.CACHE_HIT["ofac"].inc()
+        tracing.annotate("cache", "hit")
+        return cached[1]
+    metrics.CACHE_MISS["ofac"].inc()
+    tracing.annotate("cache", "miss")
+
+    future = _ofac_inflight.get(address)
+    if future is None:
+        future = asyncio.ensure_future(_query_sanctions_oracle(address))
+        _ofac_inflight[address] = future
+        future.add_done_callback(lambda _: _ofac_inflight.pop(address, None))
+
+    # Shield: one cancelled caller must not cancel the lookup for the others
+    sanctioned = await asyncio.shield(future)
+    if sanctioned is None:
+        return False
+    _ofac_cache[address] = (time.monotonic() + settings.OFAC_CACHE_TTL_SECONDS, sanctioned)
+    return sanctioned
 
 
 def calculate_traceability_score(scan_result: dict, ofac_sanctioned: bool) -> tuple[int, list[str]]:
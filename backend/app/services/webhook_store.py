@@ -0,0 +1,166 @@
+"""
+FK94 Security Platform - Webhook Inbox (SQLite)
+Verified webhook events are stored here before they are acknowledged. The
+provider's event ID is the primary key, so redeliveries are deduplicated by
+the table itself (across restarts, and across replicas sharing the file).
+The webhook worker drains pending rows with retry and backoff.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _get_connection(db_path: str) -> sqlite3.Connection:
+    return sqlite3.connect(db_path, check_same_thread=False)
+
+
+def init_db(db_path: str) -> None:
+    with _get_connection(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS webhook_events (
+                id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                event_type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                received_at TEXT NOT NULL,
+                processed_at TEXT
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_webhook_events_due ON webhook_events(status, next_attempt_at)"
+        )
+        conn.commit()
+
+
+def record_event(db_path: str, event_id: str, source: str, event_type: str, payload: dict) -> bool:
+    """Insert a received event. Returns False if this event ID was already recorded."""
+    now = _utc_now()
+    with _get_connection(db_path) as conn:
+        cursor = conn.execute(
+            """
+            INSERT OR IGNORE INTO webhook_events (
+                id, source, event_type, payload, status, attempts,
+                next_attempt_at, received_at
+            ) VALUES (?, ?, ?, ?, 'pending', 0, ?, ?)
+            """,
+            (event_id, source, event_type, json.dumps(payload), now, now),
+        )
+        conn.commit()
+    return cursor.rowcount == 1
+
+
+def _row_to_event(row) -> dict:
+    return {
+        "id": row[0],
+        "source": row[1],
+        "event_type": row[2],
+        "payload": json.loads(row[3]),
+        "status": row[4],
+        "attempts": row[5],
+        "next_attempt_at": row[6],
+        "result": json.loads(row[7]) if row[7] else None,
+        "error": row[8],
+        "received_at": row[9],
+        "processed_at": row[10],
+    }
+
+
+_COLUMNS = (
+    "id, source, event_type, payload, status, attempts, next_attempt_at, "
+    "result, error, received_at, processed_at"
+)
+
+
+def get_event(db_path: str, event_id: str) -> Optional[dict]:
+    with _get_connection(db_path) as conn:
+        row = conn.execute(
+            f"SELECT {_COLUMNS} FROM webhook_events WHERE id = ?",
+            (event_id,),
+        ).fetchone()
+    return _row_to_event(row) if row else None
+
+
+def claim_due_events(db_path: str, limit: int = 10) -> list[dict]:
+    """Move due pending events to 'processing' and return them (oldest first)."""
+    now = _utc_now()
+    claimed = []
+    with _get_connection(db_path) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {_COLUMNS} FROM webhook_events
+            WHERE status = 'pending' AND next_attempt_at <= ?
+            ORDER BY received_at ASC
+            LIMIT ?
+            """,
+            (now, limit),
+        ).fetchall()
+        for row in rows:
+            # Another consumer may have claimed it between the SELECT and here
+            cursor = conn.execute(
+                "UPDATE webhook_events SET status = 'processing', attempts = attempts + 1 "
+                "WHERE id = ? AND status = 'pending'",
+                (row[0],),
+            )
+            if cursor.rowcount == 1:
+                event = _row_to_event(row)
+                event["status"] = "processing"
+                event["attempts"] += 1
+                claimed.append(event)
+        conn.commit()
+    return claimed
+
+
+def mark_processed(db_path: str, event_id: str, result: dict) -> None:
+    with _get_connection(db_path) as conn:
+        conn.execute(
+            "UPDATE webhook_events SET status = 'processed', result = ?, error = NULL, processed_at = ? WHERE id = ?",
+            (json.dumps(result), _utc_now(), event_id),
+        )
+        conn.commit()
+
+
+def mark_failed(db_path: str, event_id: str, error: str, retry_at: Optional[datetime] = None) -> None:
+    """Schedule another attempt at retry_at, or park the event as 'dead' when None."""
+    with _get_connection(db_path) as conn:
+        if retry_at is not None:
+            conn.execute(
+                "UPDATE webhook_events SET status = 'pending', error = ?, next_attempt_at = ? WHERE id = ?",
+                (error, retry_at.isoformat(), event_id),
+            )
+        else:
+            conn.execute(
+                "UPDATE webhook_events SET status = 'dead', error = ?, processed_at = ? WHERE id = ?",
+                (error, _utc_now(), event_id),
+            )
+        conn.commit()
+
+
+def requeue_in_flight(db_path: str) -> int:
+    """Return events left in 'processing' by a crashed consumer to the queue."""
+    with _get_connection(db_path) as conn:
+        cursor = conn.execute(
+            "UPDATE webhook_events SET status = 'pending', next_attempt_at = ? WHERE status = 'processing'",
+            (_utc_now(),),
+        )
+        conn.commit()
+    return cursor.rowcount
+
+
+def count_events_by_status(db_path: str) -> dict[str, int]:
+    with _get_connection(db_path) as conn:
+        rows = conn.execute("SELECT status, COUNT(*) FROM webhook_events GROUP BY status").fetchall()
+    return {status: int(count) for status, count in rows}
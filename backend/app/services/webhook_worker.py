@@ -0,0 +1,115 @@
+"""
+FK94 Security Platform - Webhook Worker
+Drains the webhook inbox: applies each stored event, mirrors billing
+lifecycle events into the event store, and retries failures with
+exponential backoff until WEBHOOK_MAX_ATTEMPTS, after which the event is
+parked as 'dead' for inspection.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.services import event_store, webhook_store
+from app.services.stripe_service import stripe_service
+
+logger = logging.getLogger(__name__)
+
+# stripe_service action -> event_store event type
+_BILLING_EVENTS = {
+    "upgrade_to_pro": "checkout_success",
+    "payment_failed": "payment_failed",
+    "downgrade_to_free": "subscription_canceled",
+}
+
+
+class WebhookWorker:
+    def __init__(self, db_path: str, poll_seconds: float = 2):
+        self.db_path = db_path
+        self.poll_seconds = max(0.1, poll_seconds)
+        self._stop_event = asyncio.Event()
+        self._wake_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        requeued = webhook_store.requeue_in_flight(self.db_path)
+        if requeued:
+            logger.info(f"Requeued {requeued} webhook events left in flight")
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    def wake(self) -> None:
+        """Process the inbox now instead of at the next poll (e.g. right after a delivery)."""
+        self._wake_event.set()
+
+    async def _run_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self._wake_event.clear()
+            try:
+                await self._process_due_events()
+            except Exception:
+                logger.exception("Webhook inbox poll failed")
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                continue
+
+    async def _process_due_events(self) -> None:
+        events = await asyncio.to_thread(webhook_store.claim_due_events, self.db_path, 10)
+        for event in events:
+            await self._process_event(event)
+
+    async def _process_event(self, event: dict) -> None:
+        event_id = event["id"]
+        try:
+            if event["source"] != "stripe":
+                raise ValueError(f"Unknown webhook source: {event['source']}")
+            result = await stripe_service.process_event(event["payload"])
+        except Exception as exc:
+            retry_at = self._retry_at(event["attempts"])
+            error_msg = str(exc)[:500]
+            if retry_at is None:
+                logger.error(f"Webhook {event_id} ({event['event_type']}) failed permanently: {error_msg}")
+            else:
+                logger.warning(f"Webhook {event_id} ({event['event_type']}) failed, retrying at {retry_at.isoformat()}: {error_msg}")
+            await asyncio.to_thread(webhook_store.mark_failed, self.db_path, event_id, error_msg, retry_at)
+            return
+
+        await asyncio.to_thread(webhook_store.mark_processed, self.db_path, event_id, result)
+        self._track_billing_event(result)
+
+    @staticmethod
+    def _retry_at(attempts: int) -> Optional[datetime]:
+        if attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            return None
+        delay = min(
+            settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+            settings.WEBHOOK_RETRY_MAX_SECONDS,
+        )
+        return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+    @staticmethod
+    def _track_billing_event(result: dict) -> None:
+        """Mirror key billing lifecycle events into the event store for automation."""
+        mapped_event = _BILLING_EVENTS.get(result.get("action", ""))
+        if mapped_event:
+            event_store.track_event(
+                db_path=settings.EVENT_DB_PATH,
+                event_type=mapped_event,
+                user_id=result.get("user_id"),
+                source="stripe_webhook",
+                payload=result,
+            )
+
+
+webhook_worker = WebhookWorker(settings.WEBHOOK_DB_PATH, settings.WEBHOOK_POLL_SECONDS)
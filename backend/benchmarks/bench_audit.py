@@ -0,0 +1,49 @@
+"""
+FK94 Security Platform - pytest-benchmark Suite
+CPU cost of each scenario with zero-latency stub upstreams, so results are
+stable enough to compare between commits. Latency percentiles under load
+come from benchmarks.run.
+
+Usage (from backend/, needs requirements-bench.txt):
+    python -m pytest benchmarks/bench_audit.py --benchmark-autosave
+    python -m pytest benchmarks/bench_audit.py --benchmark-compare --benchmark-compare-fail=median:20%
+
+pytest-benchmark keeps its saved runs under .benchmarks/ in the working directory.
+"""
+import asyncio
+import itertools
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.scenarios import SCENARIOS, bench_environment  # noqa: E402
+from benchmarks.upstreams import install, parse_profiles  # noqa: E402
+
+ZERO_LATENCY = parse_profiles(["all=0"])
+
+
+@pytest.fixture(scope="module")
+def bench_env():
+    with bench_environment():
+        yield
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_scenario(benchmark, bench_env, name):
+    scenario = SCENARIOS[name]
+    counter = itertools.count()
+    benchmark.group = name.split("_", 1)[0]
+
+    with install(scenario.stub(ZERO_LATENCY)):
+        if scenario.is_async:
+            loop = asyncio.new_event_loop()
+            try:
+                benchmark.pedantic(
+                    lambda: loop.run_until_complete(scenario.run(next(counter))),
+                    rounds=10, warmup_rounds=2,
+                )
+            finally:
+                loop.close()
+        else:
+            benchmark(lambda: scenario.run(next(counter)))
@@ -0,0 +1,105 @@
+"""
+FK94 Security Platform - PDF Render Benchmark
+Per-report render time, peak traced memory and style objects built per
+render for PDFReportService.generate_report.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_render --reports 50
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import TableStyle
+
+from app.models.schemas import (
+    AuditResult, BreachCheckResult, BreachInfo, RiskLevel, SecurityScore,
+)
+from app.services.pdf_service import PDFReportService
+
+
+def sample_audit(i: int = 0) -> AuditResult:
+    """Representative email audit: 8 breaches, 8 recommendations, AI analysis."""
+    breaches = [
+        BreachInfo(
+            name=f"Service{n}", date="2023-01-01",
+            data_types=["Emails", "Passwords", "Names"], description="Breach",
+        )
+        for n in range(8)
+    ]
+    return AuditResult(
+        id=f"bench{i:04d}",
+        query_value=f"user{i}@example.com",
+        email=f"user{i}@example.com",
+        timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        security_score=SecurityScore(
+            score=35, risk_level=RiskLevel.HIGH,
+            breakdown={"breaches": 25, "passwords": 20, "osint": 10, "configuration": 5},
+            issues_critical=1, issues_high=3, issues_medium=2, issues_low=1,
+        ),
+        breach_check=BreachCheckResult(
+            email=f"user{i}@example.com", breached=True, breach_count=len(breaches),
+            breaches=breaches, risk_level=RiskLevel.HIGH,
+        ),
+        recommendations=[f"Recomendación número {n}: activá 2FA y cambiá contraseñas" for n in range(8)],
+        ai_analysis="**Estado:** 🔴 Riesgo Alto\n\n**Problemas:**\n• Filtraciones\n\n**Qué hacer:**\n1. Cambiar contraseñas",
+    )
+
+
+def _count_constructions(cls):
+    """Wrap cls.__init__ to count instances built while patched."""
+    counter = {"n": 0}
+    original = cls.__init__
+
+    def counting_init(self, *args, **kwargs):
+        counter["n"] += 1
+        original(self, *args, **kwargs)
+
+    return counter, patch.object(cls, "__init__", counting_init)
+
+
+def run(reports: int) -> dict:
+    service = PDFReportService()
+    service.generate_report(sample_audit())  # warm-up (font metrics, imports)
+
+    timings = []
+    for i in range(reports):
+        audit = sample_audit(i)
+        start = time.perf_counter()
+        service.generate_report(audit)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    paragraph_styles, p_patch = _count_constructions(ParagraphStyle)
+    table_styles, t_patch = _count_constructions(TableStyle)
+    tracemalloc.start()
+    with p_patch, t_patch:
+        service.generate_report(sample_audit())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "reports": reports,
+        "mean_ms": round(statistics.mean(timings), 2),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "peak_kib": round(peak / 1024, 1),
+        "paragraph_styles_per_render": paragraph_styles["n"],
+        "table_styles_per_render": table_styles["n"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=50)
+    args = parser.parse_args()
+    for key, value in run(args.reports).items():
+        print(f"{key:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
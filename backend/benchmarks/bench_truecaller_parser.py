@@ -0,0 +1,47 @@
+"""
+FK94 Security Platform - Truecaller Parser Benchmark
+Parse time per Truecaller bot reply and API response over the test fixtures,
+the per-number cost a phone batch pays on top of the lookup itself.
+
+Usage (from backend/):
+    python -m benchmarks.bench_truecaller_parser --rounds 20000
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from app.services.truecaller_parser import parse_api_response, parse_bot_text
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "truecaller_responses.json"
+
+
+def _time_per_call(fn, inputs: list, rounds: int) -> float:
+    """Mean microseconds per call, cycling through inputs."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for value in inputs:
+            fn(value)
+    return (time.perf_counter() - start) / (rounds * len(inputs)) * 1e6
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20000, help="passes over the fixtures")
+    args = parser.parse_args(argv)
+
+    fixtures = json.loads(FIXTURES.read_text())
+    texts = [case["text"] for case in fixtures["bot"]]
+    responses = [case["data"] for case in fixtures["api"]]
+
+    print(f"{'parser':<20} {'inputs':>6} {'us/call':>9} {'calls/s':>10}")
+    for name, fn, inputs in (
+        ("parse_bot_text", parse_bot_text, texts),
+        ("parse_api_response", parse_api_response, responses),
+    ):
+        per_call = _time_per_call(fn, inputs, args.rounds)
+        print(f"{name:<20} {len(inputs):>6} {per_call:>9.2f} {1e6 / per_call:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
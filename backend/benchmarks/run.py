@@ -0,0 +1,199 @@
+"""
+FK94 Security Platform - Benchmark Runner
+Load-tests the audit hot paths against the stub upstreams and reports
+p50/p95/p99 latency and throughput per scenario. Every run is saved as JSON
+so a later version can be compared against it.
+
+Usage (from backend/):
+    python -m benchmarks.run                                  # all scenarios
+    python -m benchmarks.run -s full_audit -n 200 -c 20
+    python -m benchmarks.run --latency ai=800 --latency hibp=150:0.05
+    python -m benchmarks.run --latency all=0                  # CPU cost only
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+
+Upstream overrides are `name=latency_ms[:error_rate[:jitter]]`; see
+benchmarks.upstreams for the names. With --compare the exit status is 1 when
+a scenario's p95 rose or its throughput fell by more than --threshold.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from benchmarks.scenarios import SCENARIOS, Scenario, bench_environment
+from benchmarks.upstreams import install, parse_profiles
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[min(len(sorted_values), int(rank)) - 1]
+
+
+def summarize(latencies_ms: list[float], wall_seconds: float, errors: int) -> dict:
+    ordered = sorted(latencies_ms)
+    return {
+        "iterations": len(ordered),
+        "errors": errors,
+        "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p95_ms": round(percentile(ordered, 95), 2),
+        "p99_ms": round(percentile(ordered, 99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        "throughput_per_s": round(len(ordered) / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+async def _run_async(scenario: Scenario, iterations: int, concurrency: int) -> tuple[list[float], float, int]:
+    latencies: list[float] = []
+    errors = 0
+    indexes = iter(range(iterations))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in indexes:
+            start = time.perf_counter()
+            try:
+                await scenario.run(i)
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return latencies, time.perf_counter() - start, errors
+
+
+def _run_sync(scenario: Scenario, iterations: int) -> tuple[list[float], float, int]:
+    latencies: list[float] = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        try:
+            scenario.run(i)
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies, time.perf_counter() - start, errors
+
+
+def run_scenario(scenario: Scenario, profiles: dict, iterations: int, concurrency: int, warmup: int = 2) -> dict:
+    """
+    Run one scenario against a fresh stub. Synchronous scenarios (PDF render,
+    SQLite stores) run back to back; concurrency only applies to async ones.
+    """
+    stub = scenario.stub(profiles)
+    with install(stub):
+        if scenario.is_async:
+            async def go():
+                await _run_async(scenario, warmup, 1)
+                return await _run_async(scenario, iterations, concurrency)
+
+            latencies, wall, errors = asyncio.run(go())
+        else:
+            _run_sync(scenario, warmup)
+            latencies, wall, errors = _run_sync(scenario, iterations)
+
+    result = summarize(latencies, wall, errors)
+    result["concurrency"] = concurrency if scenario.is_async else 1
+    result["upstream_calls"] = dict(stub.calls)
+    return result
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Scenarios whose p95 rose or throughput fell by more than `threshold` (0.2 = 20%)."""
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {now['p95_ms']} ms")
+        if before["throughput_per_s"] and now["throughput_per_s"] < before["throughput_per_s"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {before['throughput_per_s']} -> {now['throughput_per_s']}/s"
+            )
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_table(results: dict) -> None:
+    header = f"{'scenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:<22}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}"
+            f"{r['throughput_per_s']:>10}{r['errors']:>8}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=50)
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    parser.add_argument("--latency", action="append", default=[], metavar="NAME=MS[:ERR[:JITTER]]")
+    parser.add_argument("--output", help=f"result file (default: {RESULTS_DIR}/<timestamp>.json)")
+    parser.add_argument("--compare", metavar="RESULT_JSON", help="fail on regressions against this run")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    profiles = parse_profiles(args.latency)
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    with bench_environment():
+        for name in names:
+            results[name] = run_scenario(SCENARIOS[name], profiles, args.iterations, args.concurrency)
+
+    now = datetime.now(timezone.utc)
+    report = {
+        "created_at": now.isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "profiles": {name: asdict(p) for name, p in profiles.items()},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{now.strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    _print_table(results)
+    print(f"\nSaved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+FK94 Security Platform - Benchmark Scenarios
+The audit hot paths, each callable with an iteration index so concurrent runs
+use distinct inputs (and miss the per-address caches like production would).
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+from unittest.mock import patch
+
+# Set benchmark environment variables BEFORE importing app modules
+os.environ.setdefault("HIBP_API_KEY", "bench-hibp-key")
+os.environ.setdefault("DEHASHED_API_KEY", "bench-dehashed-key")
+os.environ.setdefault("DEHASHED_EMAIL", "bench@example.com")
+os.environ.setdefault("HUNTER_API_KEY", "bench-hunter-key")
+os.environ.setdefault("AI_API_KEY", "bench-ai-key")
+os.environ.setdefault("ETHERSCAN_API_KEY", "bench-etherscan-key")
+os.environ.setdefault("ENABLE_JOB_WORKER", "false")
+# Measure the AI round trip, not cache hits on identical stub audits
+os.environ.setdefault("AI_CACHE_ENABLED", "false")
+# The chain limiter models the provider's quota, not our cost; export the
+# production value to measure queueing behind it instead
+os.environ.setdefault("EVM_RATE_LIMIT_PER_SECOND", "1000")
+
+from app.core.config import settings  # noqa: E402
+from app.models.schemas import AuditType, FullAuditRequest, MultiAuditRequest  # noqa: E402
+from app.services import event_store, job_store  # noqa: E402
+from app.services.audit_runner import run_full_audit, run_multi_audit  # noqa: E402
+from app.services.pdf_service import pdf_service  # noqa: E402
+from app.services.wallet_deep_scan import deep_scan_eth  # noqa: E402
+from benchmarks.bench_pdf_render import sample_audit  # noqa: E402
+from benchmarks.upstreams import StubUpstreams, UpstreamProfile  # noqa: E402
+
+DEEP_SCAN_ADDRESS = "0x" + "ab" * 20
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    run: Callable  # run(i) -> awaitable, or a plain call when is_async is False
+    is_async: bool = True
+    history_size: int = 500  # transaction rows per stream served by the stub
+    overrides: dict = field(default_factory=dict)  # upstream -> UpstreamProfile
+
+    def stub(self, profiles: dict) -> StubUpstreams:
+        return StubUpstreams({**profiles, **self.overrides}, history_size=self.history_size)
+
+
+def _multi(audit_type: AuditType, value: Callable[[int], str], **extra) -> Callable:
+    return lambda i: run_multi_audit(
+        MultiAuditRequest(audit_type=audit_type, value=value(i), extra_data=extra or None)
+    )
+
+
+def _job_roundtrip(i: int) -> None:
+    job = job_store.create_job(settings.JOB_DB_PATH, "full_audit", {"email": f"user{i}@example.com"})
+    job_store.update_job(settings.JOB_DB_PATH, job["id"], status="completed", result={"score": i})
+    job_store.get_job(settings.JOB_DB_PATH, job["id"])
+
+
+_report = sample_audit()
+
+# check_domain (raw DNS/TLS) is not listed: it cannot be served by the stubs
+SCENARIOS: dict[str, Scenario] = {
+    s.name: s for s in [
+        Scenario("full_audit", lambda i: run_full_audit(
+            FullAuditRequest(email=f"user{i}@example.com", password="correct horse")
+        )),
+        Scenario("multi_audit_username", _multi(AuditType.USERNAME, lambda i: f"user{i}")),
+        Scenario("multi_audit_ip", _multi(AuditType.IP, lambda i: f"203.0.113.{i % 250 + 1}")),
+        Scenario("multi_audit_name", _multi(AuditType.NAME, lambda i: f"Ana Perez {i}", location="Buenos Aires")),
+        Scenario("multi_audit_phone", _multi(AuditType.PHONE, lambda i: f"+54911{i:08d}")),
+        Scenario("multi_audit_wallet", _multi(AuditType.WALLET, lambda i: f"0x{i + 1:040x}")),
+        Scenario("deep_scan_eth", lambda i: deep_scan_eth(DEEP_SCAN_ADDRESS)),
+        # Blockscout down -> Etherscan fallback serving 10k rows per stream
+        Scenario(
+            "deep_scan_eth_large",
+            lambda i: deep_scan_eth(DEEP_SCAN_ADDRESS),
+            history_size=10_000,
+            overrides={"blockscout": UpstreamProfile(error_rate=1.0)},
+        ),
+        Scenario("generate_report", lambda i: pdf_service.generate_report(_report), is_async=False),
+        Scenario("event_store", lambda i: event_store.track_event(
+            settings.EVENT_DB_PATH, "audit_completed", {"score": i, "audit_type": "email"}, source="bench"
+        ), is_async=False),
+        Scenario("job_store", _job_roundtrip, is_async=False),
+    ]
+}
+
+
+@contextmanager
+def bench_environment():
+    """Fresh job and event databases in a temporary directory."""
+    with tempfile.TemporaryDirectory(prefix="fk94-bench-") as workdir:
+        job_db = os.path.join(workdir, "jobs.sqlite3")
+        event_db = os.path.join(workdir, "events.sqlite3")
+        job_store.init_db(job_db)
+        event_store.init_db(event_db)
+        with patch.object(settings, "JOB_DB_PATH", job_db), patch.object(settings, "EVENT_DB_PATH", event_db):
+            yield workdir
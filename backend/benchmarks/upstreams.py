@@ -0,0 +1,314 @@
+"""
+FK94 Security Platform - Stub Upstreams
+In-process stand-ins for the third-party APIs the audits call (HIBP, Dehashed,
+Hunter, Gravatar, RDAP, ip-api, Blockscout, Etherscan, the AI providers and
+the username platforms), served through an httpx transport so every
+`httpx.AsyncClient` in the app talks to them without code changes.
+
+Each upstream has a latency distribution (log-normal around a median) and an
+error rate, so benchmarks can model slow or flaky providers. check_domain
+uses raw DNS/TLS sockets and the phone lookups go through Telegram, so those
+paths cannot be stubbed here.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Optional
+from unittest.mock import patch
+
+import httpx
+
+
+@dataclass(frozen=True)
+class UpstreamProfile:
+    latency_ms: float = 0.0  # median response time
+    jitter: float = 0.0  # log-normal sigma; 0.5 puts p95 at ~2.3x the median
+    error_rate: float = 0.0  # share of requests answered with error_status
+    error_status: int = 503
+
+
+# Medians roughly match what the real providers answer from a nearby region
+DEFAULT_PROFILES: dict[str, UpstreamProfile] = {
+    "hibp": UpstreamProfile(latency_ms=150, jitter=0.4),
+    "dehashed": UpstreamProfile(latency_ms=400, jitter=0.5),
+    "hunter": UpstreamProfile(latency_ms=250, jitter=0.4),
+    "gravatar": UpstreamProfile(latency_ms=60, jitter=0.3),
+    "rdap": UpstreamProfile(latency_ms=300, jitter=0.6),
+    "ipapi": UpstreamProfile(latency_ms=80, jitter=0.3),
+    "blockscout": UpstreamProfile(latency_ms=200, jitter=0.5),
+    "etherscan": UpstreamProfile(latency_ms=150, jitter=0.4),
+    "ai": UpstreamProfile(latency_ms=2500, jitter=0.3),
+    "platforms": UpstreamProfile(latency_ms=200, jitter=0.6),
+}
+
+UPSTREAMS = tuple(DEFAULT_PROFILES)
+
+_HOSTS = {
+    "haveibeenpwned.com": "hibp",
+    "api.pwnedpasswords.com": "hibp",
+    "api.dehashed.com": "dehashed",
+    "api.hunter.io": "hunter",
+    "www.gravatar.com": "gravatar",
+    "gravatar.com": "gravatar",
+    "rdap.org": "rdap",
+    "ip-api.com": "ipapi",
+    "api.etherscan.io": "etherscan",
+    "api.moonshot.ai": "ai",
+    "api.deepseek.com": "ai",
+}
+
+BLOCKSCOUT_PAGE_SIZE = 50
+
+_AI_ANSWER = (
+    "**Estado:** 🟠 Riesgo Medio\n\n"
+    "**Problemas:**\n• Tu email aparece en filtraciones con contraseñas\n\n"
+    "**Qué hacer:**\n1. Cambiá las contraseñas reutilizadas\n2. Activá 2FA"
+)
+
+
+def parse_profiles(specs: list[str], base: Optional[dict] = None) -> dict[str, UpstreamProfile]:
+    """
+    Apply `name=latency_ms[:error_rate[:jitter]]` overrides, e.g. `ai=800`
+    or `hibp=150:0.05`. The name `all` applies to every upstream.
+    """
+    profiles = dict(base or DEFAULT_PROFILES)
+    for spec in specs:
+        name, _, value = spec.partition("=")
+        names = UPSTREAMS if name == "all" else (name,)
+        if not value or any(n not in profiles for n in names):
+            raise ValueError(f"Invalid upstream profile: {spec!r} (known: {', '.join(UPSTREAMS)})")
+        parts = value.split(":")
+        for n in names:
+            changes = {"latency_ms": float(parts[0])}
+            if len(parts) > 1:
+                changes["error_rate"] = float(parts[1])
+            if len(parts) > 2:
+                changes["jitter"] = float(parts[2])
+            profiles[n] = replace(profiles[n], **changes)
+    return profiles
+
+
+class StubUpstreams(httpx.AsyncBaseTransport):
+    """
+    httpx transport answering every request from canned, deterministic data.
+    `history_size` is the number of rows per transaction stream returned for
+    a wallet (Blockscout stops paginating at 10 pages of 50, Etherscan returns
+    everything in one response).
+    """
+
+    def __init__(
+        self,
+        profiles: Optional[dict[str, UpstreamProfile]] = None,
+        history_size: int = 500,
+        seed: int = 94,
+    ) -> None:
+        self.profiles = dict(DEFAULT_PROFILES if profiles is None else profiles)
+        self.history_size = history_size
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._bodies: dict[tuple, bytes] = {}
+        self._histories: dict[tuple, list[dict]] = {}
+
+    @staticmethod
+    def upstream_for(host: str) -> str:
+        if host.endswith(".blockscout.com"):
+            return "blockscout"
+        return _HOSTS.get(host, "platforms")
+
+    def _delay(self, profile: UpstreamProfile) -> float:
+        if profile.latency_ms <= 0:
+            return 0.0
+        return profile.latency_ms * math.exp(self._rng.gauss(0.0, profile.jitter)) / 1000
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = self.upstream_for(request.url.host)
+        profile = self.profiles.get(upstream, UpstreamProfile())
+        self.calls[upstream] += 1
+
+        delay = self._delay(profile)
+        failed = profile.error_rate > 0 and self._rng.random() < profile.error_rate
+        if delay:
+            await asyncio.sleep(delay)
+        if failed:
+            self.errors[upstream] += 1
+            return httpx.Response(profile.error_status, json={"error": "stub upstream error"})
+        return getattr(self, f"_{upstream}")(request)
+
+    # === CANNED RESPONSES ===
+
+    def _cached_json(self, key: tuple, build) -> bytes:
+        # Large histories are encoded once so the stub's own cost stays out of the numbers
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._bodies[key] = json.dumps(build()).encode()
+        return body
+
+    def _json(self, status: int, key: tuple, build) -> httpx.Response:
+        return httpx.Response(
+            status,
+            content=self._cached_json(key, build),
+            headers={"Content-Type": "application/json"},
+        )
+
+    def _hibp(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "api.pwnedpasswords.com":
+            lines = [f"{i:035X}:{i * 7}" for i in range(800)]
+            return httpx.Response(200, text="\r\n".join(lines))
+        return self._json(200, ("hibp",), lambda: [
+            {
+                "Name": f"Breach{n}",
+                "BreachDate": f"20{10 + n}-03-01",
+                "DataClasses": ["Email addresses", "Passwords", "Names"][: 1 + n % 3],
+                "Description": "Stub breach description. " * 8,
+            }
+            for n in range(6)
+        ])
+
+    def _dehashed(self, request: httpx.Request) -> httpx.Response:
+        return self._json(200, ("dehashed",), lambda: {
+            "entries": [{"database_name": f"Leak{n % 4}"} for n in range(12)],
+        })
+
+    def _hunter(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/domain-search"):
+            return self._json(200, ("hunter", "domain"), lambda: {"data": {"emails": [
+                {"value": f"user{n}@example.com", "sources": [{"domain": "spokeo.com"}]}
+                for n in range(5)
+            ]}})
+        return self._json(200, ("hunter", "email"), lambda: {"data": {
+            "organization": "Example Corp",
+            "position": "Engineer",
+            "sources": [{"domain": f"site{n}.com", "uri": f"https://site{n}.com/team"} for n in range(4)],
+        }})
+
+    def _gravatar(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404)
+
+    def _rdap(self, request: httpx.Request) -> httpx.Response:
+        return self._json(200, ("rdap",), lambda: {
+            "registrar": {"name": "Stub Registrar"},
+            "events": [
+                {"eventAction": "registration", "eventDate": "2015-01-01T00:00:00Z"},
+                {"eventAction": "expiration", "eventDate": "2030-01-01T00:00:00Z"},
+            ],
+            "status": ["active"],
+        })
+
+    def _ipapi(self, request: httpx.Request) -> httpx.Response:
+        return self._json(200, ("ipapi",), lambda: {
+            "status": "success", "city": "Buenos Aires", "country": "Argentina",
+            "isp": "Stub ISP", "org": "Stub Cloud Hosting",
+        })
+
+    def _ai(self, request: httpx.Request) -> httpx.Response:
+        return self._json(200, ("ai",), lambda: {
+            "choices": [{"message": {"role": "assistant", "content": _AI_ANSWER}}],
+        })
+
+    def _platforms(self, request: httpx.Request) -> httpx.Response:
+        # Username probes: most platforms have no such profile
+        found = int(hashlib.md5(str(request.url).encode()).hexdigest(), 16) % 5 == 0
+        return httpx.Response(200 if found else 404, text="")
+
+    # === CHAIN DATA ===
+
+    def _counterparties(self) -> list[str]:
+        from app.services.wallet_deep_scan import KNOWN_EXCHANGE_ADDRESSES_ETH
+
+        return list(KNOWN_EXCHANGE_ADDRESSES_ETH)[:8] + [f"0x{n:040x}" for n in range(1, 57)]
+
+    def _rows(self, address: str, stream: str, blockscout: bool) -> list[dict]:
+        key = (address, stream)
+        if key not in self._histories:
+            self._histories[key] = self._build_rows(address, stream, blockscout)
+        return self._histories[key]
+
+    def _build_rows(self, address: str, stream: str, blockscout: bool) -> list[dict]:
+        peers = self._counterparties()
+        rows = []
+        for n in range(self.history_size):
+            peer = peers[n % len(peers)]
+            sender, recipient = (address, peer) if n % 2 else (peer, address)
+            ts = 1_600_000_000 + n * 3600
+            tx_hash = f"0x{hashlib.sha256(f'{address}{stream}{n}'.encode()).hexdigest()}"
+            if blockscout:
+                row = {
+                    "hash": tx_hash, "transaction_hash": tx_hash,
+                    "from": {"hash": sender}, "to": {"hash": recipient},
+                    "value": str(10**16 * (n % 50 + 1)), "index": n, "log_index": n,
+                    "timestamp": f"2021-01-01T00:00:{n % 60:02d}Z",
+                }
+                if stream == "token-transfers":
+                    row["token"] = {"symbol": "USDT"}
+                    row["total"] = {"value": str(10**6 * (n % 90 + 1)), "decimals": "6"}
+            else:
+                row = {
+                    "hash": tx_hash, "from": sender, "to": recipient,
+                    "value": str(10**16 * (n % 50 + 1)), "timeStamp": str(ts), "logIndex": str(n),
+                }
+                if stream == "tokentx":
+                    row.update(tokenSymbol="USDT", tokenDecimal="6")
+            rows.append(row)
+        return rows
+
+    def _blockscout(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/api"):  # v1 proxy, used for the sanctions oracle eth_call
+            return self._json(200, ("oracle",), lambda: {"result": "0x" + "0" * 64})
+
+        parts = path.rstrip("/").split("/")
+        if parts[-2] == "addresses":
+            return self._json(200, ("balance",), lambda: {"coin_balance": str(3 * 10**18)})
+
+        address, stream = parts[-2].lower(), parts[-1]
+        start = int(request.url.params.get("offset", 0))
+        end = min(start + BLOCKSCOUT_PAGE_SIZE, self.history_size)
+
+        def page() -> dict:
+            rows = self._rows(address, stream, blockscout=True)[start:end]
+            return {"items": rows, "next_page_params": {"offset": end} if end < self.history_size else None}
+
+        return self._json(200, ("blockscout", address, stream, start), page)
+
+    def _etherscan(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        action = params.get("action")
+        if action == "eth_call":
+            return self._json(200, ("oracle",), lambda: {"result": "0x" + "0" * 64})
+        if action == "balance":
+            return self._json(200, ("etherscan", "balance"), lambda: {"status": "1", "result": str(3 * 10**18)})
+        address = (params.get("address") or "").lower()
+        return self._json(200, ("etherscan", address, action), lambda: {
+            "status": "1", "result": self._rows(address, action, blockscout=False),
+        })
+
+
+@contextmanager
+def install(stub: StubUpstreams):
+    """
+    Route every httpx.AsyncClient created inside the block through `stub`.
+    Pooled chain-adapter clients are dropped on entry and exit so they are
+    rebuilt against the right transport.
+    """
+    from app.services import chain_adapters, wallet_deep_scan
+
+    original_init = httpx.AsyncClient.__init__
+
+    def init_with_stub(self, *args, **kwargs):
+        kwargs["transport"] = stub
+        original_init(self, *args, **kwargs)
+
+    chain_adapters._adapters.clear()
+    wallet_deep_scan._ofac_cache.clear()
+    try:
+        with patch.object(httpx.AsyncClient, "__init__", init_with_stub):
+            yield stub
+    finally:
+        chain_adapters._adapters.clear()
+        wallet_deep_scan._ofac_cache.clear()
@@ -14,6 +14,7 @@ os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test_fake123")
 os.environ.setdefault("STRIPE_WEBHOOK_SECRET", "whsec_test123")
 os.environ.setdefault("AI_API_KEY", "test-ai-key")
 os.environ.setdefault("ENABLE_JOB_WORKER", "false")
+os.environ.setdefault("ENABLE_WEBHOOK_WORKER", "false")
 
 from fastapi.testclient import TestClient
 from app.main import app
@@ -0,0 +1,161 @@
+"""
+FK94 Security Platform - AI Cache Tests
+"""
+import asyncio
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.services import deepseek_service as deepseek_module
+from app.services.ai_cache import AICache
+from app.services.deepseek_service import DeepSeekService, _count_bucket
+
+
+def _email_audit(email, score=42, breach_count=5):
+    return {
+        "email": email,
+        "security_score": {"score": score, "risk_level": "medium"},
+        "breach_check": {
+            "breach_count": breach_count,
+            "breaches": [{"name": "LinkedIn"}, {"name": "Adobe"}],
+        },
+    }
+
+
+def test_count_bucket():
+    assert [_count_bucket(n) for n in (0, 1, 2, 3, 4, 7, 8, 100)] == [
+        "0", "1", "2-3", "2-3", "4-7", "4-7", "8-15", "64-127",
+    ]
+
+
+def test_semantic_context_buckets_and_drops_identifiers():
+    service = DeepSeekService()
+    a = service._semantic_context(_email_audit("ana@example.com", score=42, breach_count=5))
+    b = service._semantic_context(_email_audit("bob@example.com", score=47, breach_count=6))
+    c = service._semantic_context(_email_audit("bob@example.com", score=47, breach_count=9))
+    assert a == b
+    assert a != c
+    assert "ana@example.com" not in str(a)
+
+
+def test_cache_lru_and_ttl(tmp_path):
+    cache = AICache(str(tmp_path / "ai.sqlite3"), max_entries=2, ttl_seconds=60)
+    cache.init_db()
+    cache.put("k1", "Moonshot", "one")
+    cache.put("k2", "Moonshot", "two")
+    assert cache.get("k1") == ("Moonshot", "one")
+    cache.put("k3", "DeepSeek", "three")  # evicts k2 (least recently used)
+
+    assert cache.get("k2") is None
+    assert cache.get("k3") == ("DeepSeek", "three")
+    stats = cache.stats()
+    assert stats["providers"] == {"Moonshot": {"hits": 1, "stores": 2}, "DeepSeek": {"hits": 1, "stores": 1}}
+    assert stats["misses"] == 1
+
+    with patch("app.services.ai_cache.time.time", return_value=10**12):
+        assert cache.get("k1") is None
+
+
+def test_cache_persists_across_restarts(tmp_path):
+    db_path = str(tmp_path / "ai.sqlite3")
+    first = AICache(db_path, max_entries=10, ttl_seconds=60)
+    first.init_db()
+    first.put("k1", "Moonshot", "persisted")
+
+    second = AICache(db_path, max_entries=10, ttl_seconds=60)
+    second.init_db()
+    assert second.get("k1") == ("Moonshot", "persisted")
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_batch_last_used_writes(tmp_path):
+    db_path = str(tmp_path / "ai.sqlite3")
+    cache = AICache(db_path, max_entries=10, ttl_seconds=60)
+    cache.init_db()
+    cache.put("k1", "Moonshot", "one")
+    cache.put("k2", "Moonshot", "two")
+
+    with patch("app.services.ai_cache._get_connection", side_effect=AssertionError("disk write on hit")):
+        for _ in range(20):
+            assert cache.get("k1") == ("Moonshot", "one")
+
+    cache.flush()
+    with sqlite3.connect(db_path) as conn:
+        order = [row[0] for row in conn.execute("SELECT key FROM ai_cache ORDER BY last_used DESC")]
+    assert order == ["k1", "k2"]
+
+    with patch("app.services.ai_cache.LAST_USED_FLUSH_SECONDS", 0), \
+            patch.object(cache, "_write_last_used") as write:
+        cache.get("k2")
+        await asyncio.sleep(0.05)  # written from the writer thread
+    write.assert_called_once()
+    assert list(write.call_args.args[0]) == ["k2"]
+
+
+@pytest.mark.asyncio
+async def test_cache_stores_and_expiries_are_written_off_the_event_loop(tmp_path):
+    from app.services import ai_cache as ai_cache_module
+
+    db_path = str(tmp_path / "ai.sqlite3")
+    cache = AICache(db_path, max_entries=1, ttl_seconds=60)
+    cache.init_db()
+    writer_threads = []
+    real_connect = ai_cache_module._get_connection
+
+    def connect(path):
+        writer_threads.append(threading.current_thread())
+        return real_connect(path)
+
+    with patch.object(ai_cache_module, "_get_connection", side_effect=connect):
+        cache.put("k1", "Moonshot", "one")
+        cache.put("k2", "Moonshot", "two")  # evicts k1
+        with patch("app.services.ai_cache.time.time", return_value=10**12):
+            assert cache.get("k2") is None
+        cache.flush()
+
+    assert len(writer_threads) == 3  # two stores and one expiry
+    assert threading.main_thread() not in writer_threads
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0] == 0
+
+
+@pytest.mark.asyncio
+async def test_analyze_audit_reuses_cached_answer_without_leaking_identifiers():
+    cache = AICache(None, max_entries=10, ttl_seconds=60)
+    service = DeepSeekService()
+    calls = []
+
+    async def fake_complete(prompt, context=None):
+        calls.append(context["email"])
+        await asyncio.sleep(0.01)
+        return f"**Estado:** 🟡 {context['email']} tiene filtraciones", "Moonshot"
+
+    with patch.object(deepseek_module, "ai_cache", cache), \
+            patch.object(service, "_complete", side_effect=fake_complete):
+        first = await asyncio.gather(
+            service.analyze_audit(_email_audit("ana@example.com")),
+            service.analyze_audit(_email_audit("carla@example.com")),
+        )
+        later = await service.analyze_audit(_email_audit("bob@example.com", score=47, breach_count=6))
+
+    assert calls == ["ana@example.com"]
+    assert first[1] == "**Estado:** 🟡 carla@example.com tiene filtraciones"
+    assert later == "**Estado:** 🟡 bob@example.com tiene filtraciones"
+    assert cache.stats()["providers"]["Moonshot"] == {"hits": 1, "stores": 1}
+
+
+@pytest.mark.asyncio
+async def test_analyze_audit_does_not_cache_static_fallback():
+    cache = AICache(None, max_entries=10, ttl_seconds=60)
+    service = DeepSeekService()
+
+    async def failing_complete(prompt, context=None):
+        return service._static_fallback(context), None
+
+    with patch.object(deepseek_module, "ai_cache", cache), \
+            patch.object(service, "_complete", side_effect=failing_complete):
+        await service.analyze_audit(_email_audit("ana@example.com"))
+
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,129 @@
+"""
+FK94 Security Platform - Batch Report Tests
+"""
+import asyncio
+import io
+import json
+import zipfile
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.models.schemas import AuditResult, BatchReportRequest, RiskLevel, SecurityScore
+from app.services import batch_reports, job_store
+from app.services import report_store as report_store_module
+from app.services.batch_reports import run_batch_report
+from app.services.job_events import job_events
+from app.services.pdf_renderer import PDFRenderPool
+from app.services.report_store import ReportStore
+
+
+def _audit(email):
+    return AuditResult(
+        id=email.split("@")[0],
+        query_value=email,
+        email=email,
+        timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        security_score=SecurityScore(
+            score=80, risk_level=RiskLevel.LOW, breakdown={},
+            issues_critical=0, issues_high=0, issues_medium=0, issues_low=1,
+        ),
+    )
+
+
+@pytest.fixture
+def batch_env(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    job_store.init_db(db_path)
+    store = ReportStore(str(tmp_path / "store"), max_bytes=10**9)
+    with patch.object(settings, "JOB_DB_PATH", db_path), \
+            patch.object(settings, "BATCH_REPORT_DIR", str(tmp_path / "batches")), \
+            patch.object(settings, "BATCH_REPORT_CONCURRENCY", 2), \
+            patch.object(batch_reports, "report_store", store), \
+            patch.object(report_store_module, "pdf_render_pool", PDFRenderPool(workers=0, max_pending=8)):
+        yield db_path
+
+
+@pytest.mark.asyncio
+async def test_batch_report_builds_zip_with_bounded_concurrency(batch_env):
+    in_flight = 0
+    peak = 0
+
+    async def fake_full_audit(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _audit(request.email)
+
+    previous = job_store.create_job(batch_env, "full_audit", {"email": "old@example.com"})
+    job_store.update_job(batch_env, previous["id"], status="completed",
+                         result=_audit("old@example.com").model_dump(mode="json"))
+    batch = job_store.create_job(batch_env, "batch_report", {})
+    request = BatchReportRequest(
+        emails=["a@example.com", "b@example.com", "A@example.com", "c@example.com"],
+        job_ids=[previous["id"], "missing-job"],
+    )
+
+    with patch.object(batch_reports, "run_full_audit", new=fake_full_audit):
+        result = await run_batch_report(request, batch["id"], batch_env)
+
+    assert peak == 2
+    assert (result["total"], result["done"], result["failed"]) == (5, 5, 1)
+    assert job_store.get_job(batch_env, batch["id"])["result"]["done"] == 5
+
+    with zipfile.ZipFile(batch_reports.archive_path(batch["id"])) as archive:
+        names = archive.namelist()
+        manifest = json.loads(archive.read("manifest.json"))
+        assert archive.read("001_a_example.com.pdf").startswith(b"%PDF")
+    assert sorted(names) == [
+        "001_a_example.com.pdf", "002_b_example.com.pdf", "003_c_example.com.pdf",
+        "004_old_example.com.pdf", "manifest.json",
+    ]
+    assert [item["index"] for item in manifest] == [1, 2, 3, 4, 5]
+    assert manifest[4]["error"] == "Audit job not found"
+
+
+@pytest.mark.asyncio
+async def test_archive_endpoint(batch_env):
+    queued = job_store.create_job(batch_env, "batch_report", {})
+    done = job_store.create_job(batch_env, "batch_report", {})
+    with patch.object(batch_reports, "run_full_audit", new=lambda request: asyncio.sleep(0, _audit(request.email))):
+        await run_batch_report(BatchReportRequest(emails=["a@example.com"]), done["id"], batch_env)
+    job_store.update_job(batch_env, done["id"], status="completed")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        not_ready = await client.get(f"/api/v1/automation/jobs/{queued['id']}/archive")
+        archive = await client.get(f"/api/v1/automation/jobs/{done['id']}/archive")
+
+    assert not_ready.status_code == 409
+    assert archive.status_code == 200
+    assert "001_a_example.com.pdf" in zipfile.ZipFile(io.BytesIO(archive.content)).namelist()
+
+
+@pytest.mark.asyncio
+async def test_batch_report_publishes_progress_events(batch_env):
+    async def fake_full_audit(request):
+        return _audit(request.email)
+
+    batch = job_store.create_job(batch_env, "batch_report", {})
+    request = BatchReportRequest(emails=["a@example.com", "b@example.com", "c@example.com"])
+
+    with job_events.subscribe(batch["id"]) as queue, \
+            patch.object(batch_reports, "run_full_audit", new=fake_full_audit):
+        await run_batch_report(request, batch["id"], batch_env)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert [e["progress"]["done"] for e in events] == [1, 2, 3]
+    assert all(e["status"] == "running" and e["progress"]["total"] == 3 for e in events)
+
+
+def test_batch_report_request_requires_items():
+    with pytest.raises(ValueError):
+        BatchReportRequest()
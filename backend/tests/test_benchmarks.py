@@ -0,0 +1,55 @@
+"""
+FK94 Security Platform - Benchmark Harness Tests
+"""
+import httpx
+import pytest
+
+from app.services.osint_service import osint_service
+from app.services.wallet_deep_scan import deep_scan_eth
+from benchmarks.run import compare, percentile
+from benchmarks.upstreams import StubUpstreams, UpstreamProfile, install, parse_profiles
+
+ZERO = parse_profiles(["all=0"])
+
+
+def test_parse_profiles_overrides():
+    profiles = parse_profiles(["ai=800", "hibp=150:0.05:0.2"])
+    assert profiles["ai"].latency_ms == 800
+    assert (profiles["hibp"].latency_ms, profiles["hibp"].error_rate, profiles["hibp"].jitter) == (150, 0.05, 0.2)
+    with pytest.raises(ValueError):
+        parse_profiles(["nope=1"])
+
+
+@pytest.mark.asyncio
+async def test_stub_serves_audit_upstreams_and_errors():
+    stub = StubUpstreams({**ZERO, "hunter": UpstreamProfile(error_rate=1.0, error_status=429)})
+    with install(stub):
+        breaches = await osint_service.check_hibp_breaches("ana@example.com")
+        async with httpx.AsyncClient() as client:
+            hunter = await client.get("https://api.hunter.io/v2/email-verifier")
+
+    assert breaches.breach_count == 6
+    assert hunter.status_code == 429
+    assert stub.calls["hibp"] == 1 and stub.errors["hunter"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stub_paginates_wallet_history():
+    stub = StubUpstreams(ZERO, history_size=120)
+    with install(stub):
+        result = await deep_scan_eth("0x" + "ab" * 20)
+
+    assert result["tx_count"] == 120 * 3
+    assert result["exchanges_detected"]
+    assert stub.calls["blockscout"] == 1 + 3 * 3  # balance + 3 pages per stream
+
+
+def test_percentile_and_compare():
+    values = sorted(float(v) for v in range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+
+    baseline = {"results": {"a": {"p95_ms": 100, "throughput_per_s": 10}}}
+    slower = {"results": {"a": {"p95_ms": 130, "throughput_per_s": 7}}}
+    same = {"results": {"a": {"p95_ms": 110, "throughput_per_s": 9}}}
+    assert len(compare(slower, baseline, 0.2)) == 2
+    assert compare(same, baseline, 0.2) == []
@@ -0,0 +1,153 @@
+"""
+FK94 Security Platform - Chain Adapter Tests
+Tests Solana decoding, multi-chain EVM scans and the outbound rate limiter.
+"""
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.chain_adapters import ChainAdapter, get_adapter, scan_evm_chains
+from app.services.rate_limiter import AsyncRateLimiter
+from app.services.wallet_deep_scan import decode_solana_txs
+
+SOL_WALLET = "7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU"
+SOL_BINANCE = "9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM"
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+EVM_WALLET = "0x1111111111111111111111111111111111111111"
+BINANCE = "0x28c6c06298d514db089934071355e5743bf21d60"
+
+
+def _sol_tx(signature, instructions, pre=(), post=(), err=None, block_time=1700000000):
+    return {
+        "blockTime": block_time,
+        "transaction": {"signatures": [signature], "message": {"instructions": instructions}},
+        "meta": {"err": err, "preTokenBalances": list(pre), "postTokenBalances": list(post)},
+    }
+
+
+def _sol_transfer(source, destination, lamports):
+    return {
+        "program": "system",
+        "parsed": {"type": "transfer", "info": {
+            "source": source, "destination": destination, "lamports": lamports,
+        }},
+    }
+
+
+def _token_balance(owner, mint, amount):
+    return {"owner": owner, "mint": mint, "uiTokenAmount": {"amount": str(amount), "decimals": 6}}
+
+
+# === Solana ===
+
+def test_decode_solana_system_and_spl_transfers():
+    cols = decode_solana_txs([
+        _sol_tx("sig1", [_sol_transfer(SOL_WALLET, SOL_BINANCE, 2 * 10**9)]),
+        _sol_tx(
+            "sig2", [],
+            pre=[_token_balance(SOL_WALLET, USDC_MINT, 0), _token_balance(SOL_BINANCE, USDC_MINT, 500_000_000)],
+            post=[_token_balance(SOL_WALLET, USDC_MINT, 100_000_000), _token_balance(SOL_BINANCE, USDC_MINT, 400_000_000)],
+        ),
+        _sol_tx("failed", [_sol_transfer(SOL_WALLET, SOL_BINANCE, 1)], err={"InstructionError": []}),
+    ], SOL_WALLET)
+
+    assert cols.hashes == ["sig1", "sig2"]
+    assert cols.assets == ["SOL", "USDC"]
+    assert cols.senders == [SOL_WALLET, SOL_BINANCE]
+    assert cols.recipients == [SOL_BINANCE, SOL_WALLET]
+    assert cols.values == [2 * 10**9, 100_000_000]
+
+
+@pytest.mark.asyncio
+async def test_solana_adapter_scan():
+    async def fake_post(url, json=None, **kwargs):
+        response = MagicMock()
+        response.status_code = 200
+        response.raise_for_status = MagicMock()
+        if isinstance(json, list):
+            response.json.return_value = [
+                {"id": 0, "result": _sol_tx("sig1", [_sol_transfer(SOL_BINANCE, SOL_WALLET, 5 * 10**8)])},
+            ]
+        elif json["method"] == "getBalance":
+            response.json.return_value = {"result": {"value": 3 * 10**9}}
+        else:
+            response.json.return_value = {"result": [{"signature": "sig1", "err": None}]}
+        return response
+
+    with patch("httpx.AsyncClient.post", new=AsyncMock(side_effect=fake_post)):
+        result = await get_adapter("solana").scan(SOL_WALLET)
+
+    assert result["chain"] == "solana"
+    assert result["balance"] == "3.000000 SOL"
+    assert result["exchanges_detected"] == ["Binance"]
+    assert result["exchange_interactions"][0].chain == "solana"
+    assert result["exchange_volume"] == {"Binance": {"SOL": 0.5}}
+    assert result["warnings"] == []
+
+
+# === EVM ===
+
+def test_adapter_missing_an_override_fails_at_construction():
+    class NoHistory(ChainAdapter):
+        async def fetch_balance(self, address):
+            return None
+
+        def normalize_tx(self, address, stream, raw):
+            return decode_solana_txs([], address)
+
+    with pytest.raises(TypeError, match="fetch_history"):
+        NoHistory(exchange_labels={})
+
+
+@pytest.mark.asyncio
+async def test_scan_evm_chains_merges_per_chain_results():
+    async def fake_get(url, params=None, **kwargs):
+        response = MagicMock()
+        response.status_code = 200
+        if url.endswith("/transactions") and "base." in url:
+            response.json.return_value = {"items": [{
+                "hash": "0xb1", "from": {"hash": EVM_WALLET}, "to": {"hash": BINANCE},
+                "value": str(10**18), "timestamp": "2024-05-01T00:00:00Z",
+            }], "next_page_params": None}
+        elif url.endswith(("/transactions", "/token-transfers", "/internal-transactions")):
+            response.json.return_value = {"items": [], "next_page_params": None}
+        else:
+            response.json.return_value = {"coin_balance": str(10**17)}
+        return response
+
+    with patch("httpx.AsyncClient.get", new=AsyncMock(side_effect=fake_get)):
+        result = await scan_evm_chains(EVM_WALLET, ["ethereum", "base"])
+
+    assert result["chains_scanned"] == ["ethereum", "base"]
+    assert result["chain_breakdown"]["base"]["tx_count"] == 1
+    assert result["chain_breakdown"]["ethereum"]["tx_count"] == 0
+    assert result["exchanges_detected"] == ["Binance"]
+    assert result["exchange_interactions"][0].chain == "base"
+    assert result["exchange_volume"] == {"Binance": {"ETH": 1.0}}
+
+
+# === Rate limiter ===
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls_after_burst():
+    limiter = AsyncRateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(4):
+        await limiter.acquire()
+    elapsed = time.monotonic() - start
+    # Two calls ride the burst, the next two wait ~20ms each
+    assert 0.03 <= elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_check_wallet_reports_invalid_evm_address():
+    from app.services.multi_audit_service import check_wallet
+
+    with patch("app.services.chain_adapters.scan_evm_chains") as scan:
+        result = await check_wallet("not-an-address", "polygon", ["polygon", "base"])
+
+    scan.assert_not_called()
+    assert any("Invalid polygon address" in w for w in result.scan_warnings)
+    assert not any("Deep scan error" in w for w in result.scan_warnings)
@@ -0,0 +1,77 @@
+"""
+FK94 Security Platform - Deferred AI Analysis Tests
+"""
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.models.schemas import FullAuditRequest
+from app.services import job_store
+from app.services.audit_runner import run_full_audit
+from app.services.job_worker import JobWorker
+
+
+@pytest.fixture
+def job_db(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    job_store.init_db(db_path)
+    with patch.object(settings, "JOB_DB_PATH", db_path), \
+            patch.object(settings, "ENABLE_JOB_WORKER", True):
+        yield db_path
+
+
+@pytest.mark.asyncio
+async def test_deferred_audit_returns_pending_and_job_completes(job_db):
+    request = FullAuditRequest(email="ana@example.com", check_breaches=False, check_osint=False, defer_ai=True)
+    analyze = AsyncMock(return_value="**Estado:** 🟢 Seguro")
+
+    with patch("app.services.deepseek_service.deepseek_service.analyze_audit", new=analyze):
+        result = await run_full_audit(request)
+        assert result.ai_analysis is None
+        assert result.ai_analysis_status == "pending"
+        analyze.assert_not_awaited()
+
+        worker = JobWorker(job_db)
+        job = job_store.fetch_due_jobs(job_db)[0]
+        assert job["id"] == result.ai_job_id
+        await worker._process_job(job)
+
+    stored = job_store.get_job(job_db, result.ai_job_id)
+    assert stored["status"] == "completed"
+    assert stored["result"] == {"ai_analysis": "**Estado:** 🟢 Seguro"}
+    assert stored["payload"]["audit_data"]["email"] == "ana@example.com"
+
+
+@pytest.mark.asyncio
+async def test_inline_audit_reports_completed_status(job_db):
+    request = FullAuditRequest(email="ana@example.com", check_breaches=False, check_osint=False)
+    with patch("app.services.deepseek_service.deepseek_service.analyze_audit",
+               new=AsyncMock(return_value="ok")):
+        result = await run_full_audit(request)
+    assert result.ai_analysis == "ok"
+    assert result.ai_analysis_status == "completed"
+    assert result.ai_job_id is None
+
+
+@pytest.mark.asyncio
+async def test_ai_analysis_endpoints(job_db):
+    job = job_store.create_job(job_db, "ai_analysis", {"audit_data": {}})
+    other = job_store.create_job(job_db, "full_audit", {"email": "ana@example.com"})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        pending = await client.get(f"/api/v1/audit/ai/{job['id']}")
+        missing = await client.get(f"/api/v1/audit/ai/{other['id']}")
+
+        job_store.update_job(job_db, job["id"], status="completed", result={"ai_analysis": "listo"})
+        stream = await client.get(f"/api/v1/audit/ai/{job['id']}/stream")
+
+    assert pending.json()["status"] == "queued"
+    assert missing.status_code == 404
+    assert stream.headers["content-type"].startswith("text/event-stream")
+    events = [line for line in stream.text.splitlines() if line.startswith("data: ")]
+    assert len(events) == 1
+    assert json.loads(events[0][len("data: "):])["ai_analysis"] == "listo"
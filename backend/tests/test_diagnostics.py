@@ -0,0 +1,56 @@
+"""
+FK94 Security Platform - Event-Loop Diagnostics Tests
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.diagnostics import LoopWatchdog
+from app.main import app
+
+
+def _blocking_lookup():
+    time.sleep(0.25)
+
+
+@pytest.mark.asyncio
+async def test_watchdog_attributes_stall_to_blocking_function():
+    watchdog = LoopWatchdog(threshold_ms=50, sample_interval_ms=5)
+    watchdog.start()
+    await asyncio.sleep(0.05)
+    _blocking_lookup()
+    await asyncio.sleep(0.05)
+    await watchdog.stop()
+
+    report = watchdog.report()
+    assert report["stalls"] == 1
+    assert report["max_stall_ms"] >= 150
+    top = report["offenders"][0]
+    assert top["count"] == 1
+    assert any("_blocking_lookup" in frame for frame in top["stack"])
+
+    watchdog.reset()
+    assert watchdog.report()["offenders"] == []
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_endpoint_requires_admin_key():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        disabled = await client.get("/api/v1/admin/diagnostics/loop")
+        with patch.object(settings, "ADMIN_API_KEY", "s3cret"):
+            missing = await client.get("/api/v1/admin/diagnostics/loop")
+            wrong = await client.get("/api/v1/admin/diagnostics/loop", headers={"X-Admin-Key": "nope"})
+            ok = await client.get("/api/v1/admin/diagnostics/loop?limit=5", headers={"X-Admin-Key": "s3cret"})
+            reset = await client.delete("/api/v1/admin/diagnostics/loop", headers={"X-Admin-Key": "s3cret"})
+
+    assert disabled.status_code == 404
+    assert missing.status_code == 401
+    assert wrong.status_code == 401
+    assert ok.status_code == 200
+    assert set(ok.json()) >= {"enabled", "threshold_ms", "stalls", "offenders"}
+    assert reset.json() == {"status": "reset"}
@@ -0,0 +1,146 @@
+"""
+FK94 Security Platform - Job Notification Tests
+Long-poll, SSE and completion callbacks, woken by JobWorker events.
+"""
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.services import job_callbacks, job_store
+from app.services.job_events import job_events
+from app.services.job_worker import JobWorker
+
+
+@pytest.fixture
+def job_db(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    job_store.init_db(db_path)
+    with patch.object(settings, "JOB_DB_PATH", db_path):
+        yield db_path
+
+
+def _client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def _run_when_subscribed(worker: JobWorker, job_id: str) -> None:
+    """Process the job once a request is waiting on it."""
+    for _ in range(200):
+        if job_events.subscriber_count(job_id):
+            break
+        await asyncio.sleep(0.005)
+    with patch("app.services.deepseek_service.deepseek_service.analyze_audit",
+               new=AsyncMock(return_value="listo")):
+        await worker._process_job(job_store.fetch_due_jobs(worker.db_path)[0])
+
+
+@pytest.mark.asyncio
+async def test_long_poll_returns_as_soon_as_the_job_finishes(job_db):
+    job = job_store.create_job(job_db, "ai_analysis", {"audit_data": {}})
+
+    async with _client() as client:
+        start = time.perf_counter()
+        resp, _ = await asyncio.gather(
+            client.get(f"/api/v1/automation/jobs/{job['id']}?wait=10"),
+            _run_when_subscribed(JobWorker(job_db), job["id"]),
+        )
+        elapsed = time.perf_counter() - start
+
+        expired = job_store.create_job(job_db, "ai_analysis", {"audit_data": {}})
+        timed_out = await client.get(f"/api/v1/automation/jobs/{expired['id']}?wait=0.05&view=status")
+        missing = await client.get("/api/v1/automation/jobs/missing?wait=1")
+
+    assert resp.json()["status"] == "completed"
+    assert resp.json()["result"] == {"ai_analysis": "listo"}
+    assert elapsed < 2
+    assert timed_out.json()["status"] == "queued"
+    assert missing.status_code == 404
+    assert job_events.subscriber_count(job["id"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_reports_each_transition(job_db):
+    job = job_store.create_job(job_db, "ai_analysis", {"audit_data": {}})
+
+    async with _client() as client:
+        stream, _ = await asyncio.gather(
+            client.get(f"/api/v1/automation/jobs/{job['id']}/events"),
+            _run_when_subscribed(JobWorker(job_db), job["id"]),
+        )
+
+    assert stream.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[len("data: "):]) for line in stream.text.splitlines() if line.startswith("data: ")]
+    assert [e["status"] for e in events] == ["queued", "running", "completed"]
+    assert "result" not in events[-1]
+
+
+@pytest.mark.asyncio
+async def test_callback_url_is_validated_at_enqueue(job_db):
+    async with _client() as client:
+        private = await client.post(
+            "/api/v1/automation/usage/sync", json={"callback_url": "http://169.254.169.254/latest"}
+        )
+        ok = await client.post(
+            "/api/v1/automation/usage/sync", json={"callback_url": "https://hooks.example.com/fk94"}
+        )
+
+    assert private.status_code == 422
+    job_id = ok.json()["job_id"]
+    assert job_store.get_callback(job_db, job_id)["url"] == "https://hooks.example.com/fk94"
+    assert "callback_url" not in job_store.get_job(job_db, job_id)["payload"]
+
+
+@pytest.mark.asyncio
+async def test_callback_is_signed_and_retried_until_delivered(job_db):
+    job = job_store.create_job(job_db, "ai_analysis", {}, callback_url="https://hooks.example.com/fk94")
+    job_store.update_job(job_db, job["id"], status="completed", finished_at="2026-01-01T00:00:00+00:00")
+    event = {"job_id": job["id"], "job_type": "ai_analysis", "status": "completed", "error": None}
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(503 if len(received) == 1 else 204)
+
+    real_client = httpx.AsyncClient
+    with patch.object(job_callbacks.httpx, "AsyncClient",
+                      lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)), \
+            patch.object(job_callbacks, "_resolve_host", new=AsyncMock(return_value=["93.184.216.34"])), \
+            patch.object(settings, "JOB_CALLBACK_SECRET", "s3cret"), \
+            patch.object(settings, "JOB_CALLBACK_RETRY_BASE_SECONDS", 0.01):
+        delivered = await job_callbacks.deliver_callback(job_db, event)
+        again = await job_callbacks.deliver_callback(job_db, event)
+
+    assert delivered is True and again is False
+    assert len(received) == 2
+    assert received[-1].url.host == "93.184.216.34"  # connected to the checked address
+    assert received[-1].headers["host"] == "hooks.example.com"
+    assert received[-1].extensions["sni_hostname"] == "hooks.example.com"
+    body = received[-1].content
+    assert json.loads(body)["status"] == "completed"
+    assert received[-1].headers[job_callbacks.SIGNATURE_HEADER] == job_callbacks.sign(body, "s3cret")
+    callback = job_store.get_callback(job_db, job["id"])
+    assert callback["attempts"] == 2 and callback["delivered_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_callback_to_host_resolving_to_private_address_is_refused(job_db):
+    job = job_store.create_job(job_db, "ai_analysis", {}, callback_url="https://rebind.example.com/hook")
+    event = {"job_id": job["id"], "job_type": "ai_analysis", "status": "completed", "error": None}
+    received = []
+
+    real_client = httpx.AsyncClient
+    with patch.object(job_callbacks.httpx, "AsyncClient",
+                      lambda **kwargs: real_client(transport=httpx.MockTransport(received.append), **kwargs)), \
+            patch.object(job_callbacks, "_resolve_host", new=AsyncMock(return_value=["93.184.216.34", "169.254.169.254"])):
+        delivered = await job_callbacks.deliver_callback(job_db, event)
+
+    assert delivered is False
+    assert received == []
+    callback = job_store.get_callback(job_db, job["id"])
+    assert callback["attempts"] == 1 and "non-public" in callback["last_error"]
@@ -0,0 +1,85 @@
+"""
+FK94 Security Platform - Job Store Tests
+"""
+import json
+import sqlite3
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.services import job_store
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    job_store.init_db(path)
+    return path
+
+
+def _big_result():
+    return {
+        "summary": {"screened": 500},
+        "items": [{"address": f"0x{i:040x}", "interactions": ["transfer"] * 20} for i in range(500)],
+    }
+
+
+def test_result_is_stored_compressed_outside_the_jobs_row(db_path):
+    job = job_store.create_job(db_path, "wallet_batch", {})
+    job_store.update_job(db_path, job["id"], status="completed", result=_big_result())
+
+    with sqlite3.connect(db_path) as conn:
+        row_result = conn.execute("SELECT result FROM jobs WHERE id = ?", (job["id"],)).fetchone()[0]
+        stored = conn.execute("SELECT length(data), size FROM job_results WHERE job_id = ?", (job["id"],)).fetchone()
+
+    assert row_result is None
+    assert stored[0] < stored[1] / 10
+    assert job_store.get_job(db_path, job["id"], include_result_size=True)["result_size"] == stored[1]
+    assert job_store.get_job(db_path, job["id"])["result"] == _big_result()
+
+
+def test_status_only_and_field_views(db_path):
+    job = job_store.create_job(db_path, "wallet_batch", {})
+    job_store.update_job(db_path, job["id"], status="completed", result=_big_result())
+
+    with patch.object(job_store, "_read_result", side_effect=AssertionError("result read")), \
+            patch.object(job_store.json, "loads", side_effect=AssertionError("payload decoded")):
+        status = job_store.get_job(db_path, job["id"], include_result=False, include_payload=False)
+    assert status["status"] == "completed" and status["result"] is None and status["payload"] is None
+
+    summary = job_store.get_job(db_path, job["id"], fields=["summary", "missing"])["result"]
+    assert summary == {"summary": {"screened": 500}}
+
+
+def test_legacy_rows_are_read_from_the_jobs_table(db_path):
+    job = job_store.create_job(db_path, "ai_analysis", {})
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE jobs SET result = ? WHERE id = ?", (json.dumps({"ai_analysis": "old"}), job["id"]))
+
+    assert job_store.get_job_result(db_path, job["id"]) == {"ai_analysis": "old"}
+    assert job_store.get_job(db_path, job["id"], include_result_size=True)["result_size"] is None
+
+    # Rewriting the result moves it to job_results
+    job_store.update_job(db_path, job["id"], result={"ai_analysis": "new"})
+    assert job_store.get_job(db_path, job["id"])["result"] == {"ai_analysis": "new"}
+
+
+@pytest.mark.asyncio
+async def test_job_status_endpoint_views(db_path):
+    job = job_store.create_job(db_path, "wallet_batch", {})
+    job_store.update_job(db_path, job["id"], status="completed", result=_big_result())
+
+    transport = httpx.ASGITransport(app=app)
+    with patch.object(settings, "JOB_DB_PATH", db_path):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            status = await client.get(f"/api/v1/automation/jobs/{job['id']}?view=status")
+            fields = await client.get(f"/api/v1/automation/jobs/{job['id']}?fields=summary")
+            invalid = await client.get(f"/api/v1/automation/jobs/{job['id']}?view=everything")
+
+    assert status.json()["result"] is None
+    assert status.json()["result_size"] > 0
+    assert fields.json()["result"] == {"summary": {"screened": 500}}
+    assert invalid.status_code == 422
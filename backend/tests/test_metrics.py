@@ -0,0 +1,120 @@
+"""
+FK94 Security Platform - Metrics Tests
+"""
+import threading
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+from app.main import app
+from app.services import job_store
+from app.services.job_worker import JobWorker
+
+
+def _sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not exposed")
+
+
+def test_histogram_exposition_is_cumulative():
+    hist = metrics.Histogram("test_latency_seconds", "Test.", ("upstream",), buckets=(0.1, 1.0))
+    metrics.registry.remove(hist)
+    child = hist.labels("hibp")
+    for value in (0.05, 0.5, 0.5, 5.0):
+        child.observe(value)
+
+    lines = hist.render()
+    assert 'test_latency_seconds_bucket{upstream="hibp",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{upstream="hibp",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{upstream="hibp",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{upstream="hibp"} 4' in lines
+
+
+def test_metric_type_without_child_factory_cannot_be_created():
+    class Summary(metrics._Metric):
+        kind = "summary"
+
+    with pytest.raises(TypeError, match="_new_child"):
+        Summary("test_summary", "Test.")
+
+
+@pytest.mark.asyncio
+async def test_upstream_calls_are_labelled_by_host():
+    before = metrics.upstream_requests.labels("hunter", "throttled").value
+    timeouts = metrics.upstream_requests.labels("moonshot", "timeout").value
+    request = httpx.Request("GET", "https://api.hunter.io/v2/email-verifier")
+
+    with patch.object(metrics, "_original_handle_async_request", new=AsyncMock(return_value=httpx.Response(429))):
+        response = await metrics._timed_handle_async_request(None, request)
+    with patch.object(metrics, "_original_handle_async_request",
+                      new=AsyncMock(side_effect=httpx.ReadTimeout("slow"))):
+        with pytest.raises(httpx.ReadTimeout):
+            await metrics._timed_handle_async_request(None, httpx.Request("POST", f"{settings.AI_BASE_URL}/v1/chat/completions"))
+
+    assert response.status_code == 429
+    assert metrics.upstream_requests.labels("hunter", "throttled").value == before + 1
+    assert metrics.upstream_requests.labels("moonshot", "timeout").value == timeouts + 1
+    assert metrics.upstream_for_host("eth.blockscout.com") == "blockscout"
+    assert metrics.upstream_for_host("github.com") == "other"
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_templates(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    job_store.init_db(db_path)
+    job_store.create_job(db_path, "full_audit", {"email": "a@example.com"})
+
+    transport = httpx.ASGITransport(app=app)
+    with patch.object(settings, "JOB_DB_PATH", db_path), patch.object(settings, "ADMIN_API_KEY", "s3cret"):
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            await client.get("/api/v1/automation/jobs/does-not-exist")
+            await client.get("/no/such/path")
+            anonymous = await client.get("/metrics")
+            response = await client.get("/metrics", headers={"X-Admin-Key": "s3cret"})
+            with patch.object(settings, "METRICS_ALLOWED_IPS", ["127.0.0.1"]):
+                allowed = await client.get("/metrics")
+
+    assert anonymous.status_code == 401
+    assert allowed.status_code == 200
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    route = 'method="GET",route="/api/v1/automation/jobs/{job_id}"'
+    assert _sample(text, f"fk94_http_request_duration_seconds_count{{{route}}}") >= 1
+    assert _sample(text, f'fk94_http_requests_total{{{route},status="4xx"}}') >= 1
+    assert _sample(text, 'fk94_http_requests_total{method="GET",route="unmatched",status="4xx"}') >= 1
+    assert _sample(text, 'fk94_job_queue_depth{status="queued"}') == 1
+    assert 'fk94_cache_hit_ratio{cache="ai"}' in text
+
+
+@pytest.mark.asyncio
+async def test_job_worker_records_wait_and_run_time(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    job_store.init_db(db_path)
+    job_store.create_job(db_path, "unknown_type", {})
+    runs = metrics.job_run.labels("unknown_type", "failed")
+
+    await JobWorker(db_path)._process_due_jobs()
+
+    assert runs.count == 1
+    assert metrics.job_wait.labels("unknown_type").count == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_collected_off_the_event_loop():
+    threads = []
+
+    def count(db_path):
+        threads.append(threading.current_thread())
+        return {"queued": 3}
+
+    with patch.object(job_store, "count_jobs_by_status", side_effect=count):
+        await metrics.collect_gauges()
+
+    assert threads and threading.main_thread() not in threads
+    assert 'fk94_job_queue_depth{status="queued"} 3' in metrics.render()
@@ -0,0 +1,54 @@
+"""
+FK94 Security Platform - PDF Render Pool Tests
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.schemas import AuditResult, RiskLevel, SecurityScore
+from app.services.pdf_renderer import PDFRenderPool, RenderQueueFull
+
+
+def _audit():
+    return AuditResult(
+        id="abc12345",
+        query_value="ana@example.com",
+        email="ana@example.com",
+        timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        security_score=SecurityScore(
+            score=72, risk_level=RiskLevel.MEDIUM, breakdown={"breaches": 20},
+            issues_critical=0, issues_high=1, issues_medium=2, issues_low=0,
+        ),
+        recommendations=["Activá 2FA"],
+        ai_analysis="**Estado:** 🟡 Riesgo Medio",
+    )
+
+
+@pytest.mark.asyncio
+async def test_thread_mode_renders_pdf():
+    pool = PDFRenderPool(workers=0, max_pending=2)
+    pdf = await pool.render(_audit())
+    assert pdf.startswith(b"%PDF")
+    assert pool.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    pool = PDFRenderPool(workers=0, max_pending=1)
+    first = asyncio.ensure_future(pool.render(_audit()))
+    await asyncio.sleep(0)
+    with pytest.raises(RenderQueueFull):
+        await pool.render(_audit())
+    assert (await first).startswith(b"%PDF")
+
+
+@pytest.mark.asyncio
+async def test_process_pool_renders_to_file(tmp_path):
+    pool = PDFRenderPool(workers=1, max_pending=2)
+    try:
+        path = await pool.render_to_file(_audit(), str(tmp_path / "report.pdf"))
+    finally:
+        pool.shutdown()
+    with open(path, "rb") as f:
+        assert f.read(4) == b"%PDF"
@@ -0,0 +1,32 @@
+"""
+FK94 Security Platform - PDF Report Service Tests
+"""
+from unittest.mock import patch
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import TableStyle
+
+from app.models.schemas import RiskLevel
+from app.services.pdf_service import PDFReportService
+from benchmarks.bench_pdf_render import sample_audit
+
+
+def test_render_reuses_precompiled_styles():
+    service = PDFReportService()
+    with patch.object(ParagraphStyle, "__init__", side_effect=AssertionError("style built per render")), \
+            patch.object(TableStyle, "__init__", side_effect=AssertionError("table style built per render")):
+        pdf = service.generate_report(sample_audit())
+    assert pdf.startswith(b"%PDF")
+
+
+def test_static_flowables_are_copied_per_render():
+    service = PDFReportService()
+    assert service._flowable("title") is not service._static["title"]
+    first = service.generate_report(sample_audit())
+    assert service.generate_report(sample_audit()) == first
+
+
+def test_score_styles_exist_for_every_risk_level():
+    service = PDFReportService()
+    for level in RiskLevel:
+        assert service.styles[f"score_display_{level.value}"].textColor == service._get_score_color(level)
@@ -0,0 +1,191 @@
+"""
+FK94 Security Platform - Phone Batch Tests
+"""
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.models.schemas import PhoneBatchRequest
+from app.services import job_store, phone_batch, phone_intel
+from app.services.job_worker import JobWorker
+from app.services.phone_batch import parse_csv_numbers, prepare_numbers, run_phone_batch
+from app.services.rate_limiter import AsyncRateLimiter
+from app.services.truecaller_service import TruecallerResult
+
+
+@pytest.fixture
+def batch_env(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    job_store.init_db(db_path)
+    phone_intel._phone_cache.clear()
+    with patch.object(settings, "JOB_DB_PATH", db_path), \
+            patch.object(phone_batch, "_lookup_limiter", AsyncRateLimiter(1000, burst=100)):
+        yield db_path
+    phone_intel._phone_cache.clear()
+
+
+def _provider(tags_by_phone: dict):
+    calls = []
+
+    async def lookup(phone, country_code):
+        calls.append(phone)
+        await asyncio.sleep(0.005)
+        tags = tags_by_phone.get(phone, [])
+        return TruecallerResult(found=True, name="Owner", spam_score=8 if "scam" in tags else 0, tags=tags)
+
+    lookup.calls = calls
+    return lookup
+
+
+def test_parse_csv_uses_phone_column_or_first_column():
+    with_header = "name,Telefono\nAna,+54 9 11 5555-0001\nBruno,\n\nCarla,011 5555-0003\n"
+    assert parse_csv_numbers(with_header) == ["+54 9 11 5555-0001", "011 5555-0003"]
+    assert parse_csv_numbers("+14155550100,x\n(415) 555-0101\n") == ["+14155550100", "(415) 555-0101"]
+    assert parse_csv_numbers("") == []
+
+
+def test_prepare_numbers_normalizes_and_dedupes():
+    unique, invalid = prepare_numbers(["011 5555-1234", "+54 11 5555 1234", "123", "0054 11 5555 9999"], "AR")
+
+    assert [(e["index"], e["phone"]) for e in unique] == [(0, "+541155551234"), (3, "+541155559999")]
+    assert [(i["index"], i["error"]) for i in invalid] == [(2, "Invalid phone number")]
+
+
+@pytest.mark.asyncio
+async def test_phone_batch_screens_unique_numbers_and_reuses_cache(batch_env):
+    bot = _provider({"+541155550002": ["spam"], "+541155550003": ["scam"]})
+    job = job_store.create_job(batch_env, "phone_batch", {})
+    request = PhoneBatchRequest(phones=["011 5555-0001", "011 5555-0002", "+54 11 5555 0001", "011 5555-0003", "x"])
+
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot)]):
+        result = await run_phone_batch(request, job["id"], batch_env)
+        again = await run_phone_batch(request, job_store.create_job(batch_env, "phone_batch", {})["id"], batch_env)
+
+    assert result["summary"] == {
+        "requested": 5, "unique": 3, "invalid": 1, "screened": 3, "failed": 0,
+        "spam": 1, "scam": 1, "high_risk": 2,
+    }
+    assert [item["index"] for item in result["items"]] == [0, 1, 3, 4]
+    assert again["summary"] == result["summary"]
+    assert sorted(bot.calls) == ["+541155550001", "+541155550002", "+541155550003"]
+
+
+@pytest.mark.asyncio
+async def test_interrupted_phone_batch_resumes_from_checkpoint(batch_env):
+    bot = _provider({})
+    request = PhoneBatchRequest(phones=["011 5555-0001", "011 5555-0002", "011 5555-0003"])
+    job = job_store.create_job(batch_env, "phone_batch", request.model_dump())
+
+    # A previous worker checkpointed the first number, then died mid-run
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot)]):
+        partial = await run_phone_batch(PhoneBatchRequest(phones=request.phones[:1]), job["id"], batch_env)
+    job_store.update_job(batch_env, job["id"], status="running", result=partial)
+    phone_intel._phone_cache.clear()
+    bot.calls.clear()
+
+    worker = JobWorker(batch_env)
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot)]):
+        await worker.start()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if job_store.get_job(batch_env, job["id"])["status"] == "completed":
+                break
+        await worker.stop()
+
+    done = job_store.get_job(batch_env, job["id"])
+    assert done["status"] == "completed"
+    assert done["result"]["summary"]["screened"] == 3
+    assert sorted(bot.calls) == ["+541155550002", "+541155550003"]
+
+
+@pytest.mark.asyncio
+async def test_csv_upload_enqueues_job_and_items_are_paged(batch_env):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/api/v1/automation/phone/batch?country_code=US",
+            content="phone\n(415) 555-0100\n(415) 555-0101\n",
+            headers={"Content-Type": "text/csv"},
+        )
+        assert resp.status_code == 200
+        job_id = resp.json()["job_id"]
+        assert job_store.get_job(batch_env, job_id)["payload"] == {
+            "phones": ["(415) 555-0100", "(415) 555-0101"], "country_code": "US",
+        }
+
+        empty = await client.post(
+            "/api/v1/automation/phone/batch", content="phone\n", headers={"Content-Type": "text/csv"}
+        )
+        assert empty.status_code == 422
+
+        bot = _provider({})
+        with patch.object(phone_intel, "_providers", return_value=[("telegram", bot)]):
+            result = await run_phone_batch(PhoneBatchRequest(**job_store.get_job(batch_env, job_id)["payload"]),
+                                           job_id, batch_env)
+        job_store.update_job(batch_env, job_id, status="completed", result=result)
+
+        page = await client.get(f"/api/v1/automation/jobs/{job_id}/items?offset=1&limit=1")
+        assert page.status_code == 200
+        body = page.json()
+        assert (body["total"], body["offset"], body["limit"]) == (2, 1, 1)
+        assert [item["phone"] for item in body["items"]] == ["+14155550101"]
+        assert body["summary"]["screened"] == 2
+
+
+@pytest.mark.asyncio
+async def test_long_batch_does_not_block_other_jobs(batch_env):
+    release = asyncio.Event()
+
+    async def slow_batch(request, job_id, db_path):
+        await release.wait()
+        return {"summary": {}, "items": []}
+
+    batch = job_store.create_job(batch_env, "phone_batch", PhoneBatchRequest(phones=["011 5555-0001"]).model_dump())
+    audit = job_store.create_job(batch_env, "ai_analysis", {"audit_data": {}})
+
+    worker = JobWorker(batch_env)
+    with patch("app.services.job_worker.run_phone_batch", new=slow_batch), \
+            patch("app.services.deepseek_service.deepseek_service.analyze_audit", new=AsyncMock(return_value="ok")):
+        await worker.start()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if job_store.get_job(batch_env, audit["id"])["status"] == "completed":
+                break
+        assert job_store.get_job(batch_env, audit["id"])["status"] == "completed"
+        assert job_store.get_job(batch_env, batch["id"])["status"] == "running"
+
+        release.set()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if job_store.get_job(batch_env, batch["id"])["status"] == "completed":
+                break
+        await worker.stop()
+
+    assert job_store.get_job(batch_env, batch["id"])["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_written_off_the_event_loop(batch_env):
+    bot = _provider({})
+    job = job_store.create_job(batch_env, "phone_batch", {})
+    request = PhoneBatchRequest(phones=["011 5555-0001", "011 5555-0002"])
+    threads = []
+    real_update = job_store.update_job
+
+    def update_job(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return real_update(*args, **kwargs)
+
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot)]), \
+            patch.object(settings, "PHONE_BATCH_CHECKPOINT_SECONDS", 0), \
+            patch.object(job_store, "update_job", side_effect=update_job):
+        await run_phone_batch(request, job["id"], batch_env)
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    assert job_store.get_job_result(batch_env, job["id"])["summary"]["screened"] == 2
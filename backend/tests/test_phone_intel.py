@@ -0,0 +1,140 @@
+"""
+FK94 Security Platform - Phone Intel Tests
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import phone_intel
+from app.services.multi_audit_service import check_phone
+from app.services.truecaller_service import TruecallerResult
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    phone_intel._phone_cache.clear()
+    yield
+    phone_intel._phone_cache.clear()
+
+
+def _provider(result: TruecallerResult, delay: float = 0.0):
+    calls = []
+
+    async def lookup(phone, country_code):
+        calls.append(phone)
+        await asyncio.sleep(delay)
+        return result
+
+    lookup.calls = calls
+    return lookup
+
+
+@pytest.mark.parametrize("raw,country,expected", [
+    ("+54 9 11 5555-1234", "AR", "+5491155551234"),
+    ("0054 9 11 5555 1234", "AR", "+5491155551234"),
+    ("011 5555-1234", "AR", "+541155551234"),
+    ("(415) 555-0100", "US", "+14155550100"),
+    ("12345", "AR", None),
+    ("030 1234 5678", "DE", "03012345678"),  # no prefix table entry: digits as given
+    ("+49 30 1234 5678", "DE", "+493012345678"),
+    ("1234", "GB", None),
+])
+def test_normalize_e164(raw, country, expected):
+    assert phone_intel.normalize_e164(raw, country) == expected
+
+
+@pytest.mark.asyncio
+async def test_slow_provider_is_hedged_with_the_next():
+    bot = _provider(TruecallerResult(found=True, name="Bot"), delay=1.0)
+    api = _provider(TruecallerResult(found=True, name="Api"), delay=0.01)
+
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot), ("truecaller", api)]), \
+            patch.object(settings, "PHONE_HEDGE_DELAY_SECONDS", 0.05):
+        start = time.perf_counter()
+        result = await phone_intel.lookup_phone("+5491155551234")
+        elapsed = time.perf_counter() - start
+
+    assert result.name == "Api"
+    assert elapsed < 0.5
+    assert bot.calls == api.calls == ["+5491155551234"]
+
+
+@pytest.mark.asyncio
+async def test_fast_answer_skips_fallback_and_is_cached():
+    bot = _provider(TruecallerResult(found=True, name="Bot"))
+    api = _provider(TruecallerResult(found=True, name="Api"))
+
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot), ("truecaller", api)]):
+        first = await phone_intel.lookup_phone("+5491155551234")
+        second = await phone_intel.lookup_phone("+5491155551234")
+
+    assert first.name == second.name == "Bot"
+    assert len(bot.calls) == 1
+    assert api.calls == []
+
+
+@pytest.mark.asyncio
+async def test_not_found_falls_back_without_waiting_and_errors_are_not_cached():
+    bot = _provider(TruecallerResult(found=False, error="No response from bot"))
+    api = _provider(TruecallerResult(found=False))
+
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot), ("truecaller", api)]), \
+            patch.object(settings, "PHONE_HEDGE_DELAY_SECONDS", 5):
+        start = time.perf_counter()
+        result = await phone_intel.lookup_phone("+5491155551234")
+        assert time.perf_counter() - start < 1
+
+    assert result.found is False and result.error is None
+    assert "+5491155551234" in phone_intel._phone_cache
+
+    phone_intel._phone_cache.clear()
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot)]):
+        failed = await phone_intel.lookup_phone("+5491155551234")
+    assert failed.error == "No response from bot"
+    assert phone_intel._phone_cache == {}
+
+
+@pytest.mark.asyncio
+async def test_check_phone_reports_normalized_number():
+    bot = _provider(TruecallerResult(found=True, name="Ana", spam_score=6, tags=["spam"]))
+
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot)]):
+        result = await check_phone("011 5555-1234", "AR")
+        invalid = await check_phone("123", "AR")
+
+    assert result.phone == "+541155551234"
+    assert result.owner_name == "Ana"
+    assert result.risk_level.value == "high"
+    assert invalid.error == "Invalid phone number"
+
+
+@pytest.mark.asyncio
+async def test_check_phone_looks_up_countries_without_prefix_entry():
+    bot = _provider(TruecallerResult(found=True, name="Hans"))
+
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", bot)]):
+        result = await check_phone("030 1234 5678", "DE")
+
+    assert result.error is None and result.owner_name == "Hans"
+    assert bot.calls == ["03012345678"]
+
+
+@pytest.mark.asyncio
+async def test_local_numbers_are_cached_per_country():
+    async def lookup(phone, country_code):
+        await asyncio.sleep(0.01)
+        return TruecallerResult(found=True, name=f"Owner {country_code}")
+
+    with patch.object(phone_intel, "_providers", return_value=[("telegram", lookup)]):
+        de, gb = await asyncio.gather(
+            phone_intel.lookup_phone("0301234567", "DE"),
+            phone_intel.lookup_phone("0301234567", "GB"),
+        )
+        again = await phone_intel.lookup_phone("0301234567", "de")
+
+    assert (de.name, gb.name, again.name) == ("Owner DE", "Owner GB", "Owner DE")
+    assert phone_intel.is_cached("0301234567", "GB")
+    assert not phone_intel.is_cached("0301234567", "IT")
@@ -0,0 +1,137 @@
+"""
+FK94 Security Platform - Report Store Tests
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.schemas import AuditResult, RiskLevel, SecurityScore
+from app.services import report_store as report_store_module
+from app.services.pdf_renderer import PDFRenderPool
+from app.services.report_store import ReportStore, audit_digest
+
+
+def _audit(audit_id="abc12345"):
+    return AuditResult(
+        id=audit_id,
+        query_value="ana@example.com",
+        email="ana@example.com",
+        timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        security_score=SecurityScore(
+            score=72, risk_level=RiskLevel.MEDIUM, breakdown={"breaches": 20, "osint": 5},
+            issues_critical=0, issues_high=1, issues_medium=2, issues_low=0,
+        ),
+        recommendations=["Activá 2FA"],
+    )
+
+
+@pytest.fixture
+def thread_pool():
+    with patch.object(report_store_module, "pdf_render_pool", PDFRenderPool(workers=0, max_pending=8)):
+        yield
+
+
+def test_digest_ignores_dict_order_and_run_identity():
+    a = _audit()
+    b = _audit()
+    b.security_score.breakdown = {"osint": 5, "breaches": 20}
+    rerun = _audit("other").model_copy(update={"timestamp": datetime(2026, 1, 1, 18, 30, tzinfo=timezone.utc)})
+    next_day = _audit().model_copy(update={"timestamp": datetime(2026, 1, 2, tzinfo=timezone.utc)})
+    assert audit_digest(a) == audit_digest(b) == audit_digest(rerun)
+    assert audit_digest(a) != audit_digest(next_day)
+    assert audit_digest(a) != audit_digest(_audit().model_copy(update={"query_value": "bob@example.com"}))
+
+
+@pytest.mark.asyncio
+async def test_get_or_render_renders_once_and_is_invariant(tmp_path, thread_pool):
+    store = ReportStore(str(tmp_path), max_bytes=10**9)
+    (d1, p1), (d2, p2) = await asyncio.gather(store.get_or_render(_audit()), store.get_or_render(_audit()))
+    first_bytes = open(p1, "rb").read()
+    os.remove(p1)
+    _, p3 = await store.get_or_render(_audit())
+
+    assert d1 == d2 and p1 == p2 == p3
+    assert open(p3, "rb").read() == first_bytes
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    store = ReportStore(str(tmp_path), max_bytes=250)
+    digests = [f"{i:064x}" for i in range(3)]
+    for age, digest in enumerate(digests):
+        path = store.path_for(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+        os.utime(path, (1000 + age, 1000 + age))
+
+    assert store.evict() == 1
+    assert store.get(digests[0]) is None
+    assert store.get(digests[2]) is not None
+
+
+@pytest.mark.asyncio
+async def test_stored_report_endpoint_supports_etag_and_ranges(tmp_path):
+    store = ReportStore(str(tmp_path), max_bytes=10**9)
+    digest = "ab" * 32
+    path = store.path_for(digest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-0123456789")
+
+    transport = httpx.ASGITransport(app=app)
+    with patch("app.api.routes.report_store", store):
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            full = await client.get(f"/api/v1/report/pdf/{digest}")
+            cached = await client.get(f"/api/v1/report/pdf/{digest}", headers={"If-None-Match": f'"{digest}"'})
+            partial = await client.get(f"/api/v1/report/pdf/{digest}", headers={"Range": "bytes=5-8"})
+            suffix = await client.get(f"/api/v1/report/pdf/{digest}", headers={"Range": "bytes=-4"})
+            unsatisfiable = await client.get(f"/api/v1/report/pdf/{digest}", headers={"Range": "bytes=99-"})
+            missing = await client.get(f"/api/v1/report/pdf/{'cd' * 32}")
+            invalid = await client.get("/api/v1/report/pdf/not-a-digest")
+
+    assert full.status_code == 200
+    assert full.content == b"%PDF-0123456789"
+    assert full.headers["etag"] == f'"{digest}"'
+    assert cached.status_code == 304
+    assert partial.status_code == 206
+    assert partial.content == b"0123"
+    assert partial.headers["content-range"] == "bytes 5-8/15"
+    assert suffix.content == b"6789"
+    assert unsatisfiable.status_code == 416
+    assert missing.status_code == 404
+    assert invalid.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_repeated_pdf_requests_reuse_one_stored_report(tmp_path):
+    store = ReportStore(str(tmp_path), max_bytes=10**9)
+    pool = PDFRenderPool(workers=0, max_pending=8)
+    renders = []
+    real_render = pool.render_to_file
+
+    async def counting_render(audit, path):
+        renders.append(audit.id)
+        return await real_render(audit, path)
+
+    transport = httpx.ASGITransport(app=app)
+    with patch("app.api.routes.report_store", store), \
+            patch.object(report_store_module, "pdf_render_pool", pool), \
+            patch.object(pool, "render_to_file", side_effect=counting_render), \
+            patch("app.api.routes.osint_service.check_hibp_breaches", new=AsyncMock(return_value=None)), \
+            patch("app.api.routes.osint_service.check_dehashed", new=AsyncMock(return_value=None)), \
+            patch("app.api.routes.osint_service.full_osint_check", new=AsyncMock(return_value=None)), \
+            patch("app.api.routes.deepseek_service.analyze_audit", new=AsyncMock(return_value="Sin hallazgos")):
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/api/v1/report/pdf", json={"email": "ana@example.com"})
+            second = await client.post("/api/v1/report/pdf", json={"email": "ana@example.com"})
+
+    assert first.status_code == second.status_code == 200
+    digest = first.headers["x-report-digest"]
+    assert second.headers["x-report-digest"] == digest
+    assert first.content == second.content
+    assert renders == [digest[:12]]
@@ -2,18 +2,26 @@
 FK94 Security Platform - Stripe Service Tests
 Tests with mocked Stripe API calls.
 """
+import asyncio
+import time
+
 import pytest
 from unittest.mock import patch, MagicMock
 import stripe
 
+from app.core.config import settings
+from app.services import webhook_store
 from app.services.stripe_service import StripeService
 
 
 @pytest.fixture
-def stripe_svc():
+def stripe_svc(tmp_path):
+    db_path = str(tmp_path / "webhooks.sqlite3")
+    webhook_store.init_db(db_path)
     svc = StripeService()
     svc.is_configured = True
-    return svc
+    with patch.object(settings, "WEBHOOK_DB_PATH", db_path):
+        yield svc
 
 
 @pytest.fixture
@@ -53,7 +61,7 @@ async def test_subscription_unconfigured(unconfigured_svc):
 # === Webhook Handling ===
 
 @pytest.mark.asyncio
-async def test_webhook_checkout_completed(stripe_svc):
+async def test_process_checkout_completed(stripe_svc):
     """Checkout completed webhook is handled."""
     mock_event = {
         "type": "checkout.session.completed",
@@ -65,8 +73,7 @@ async def test_webhook_checkout_completed(stripe_svc):
         }
     }
 
-    with patch("stripe.Webhook.construct_event", return_value=mock_event):
-        result = await stripe_svc.handle_webhook(b"payload", "sig_header")
+    result = await stripe_svc.process_event(mock_event)
 
     assert result["handled"] is True
     assert result["action"] == "upgrade_to_pro"
@@ -75,45 +82,42 @@ async def test_webhook_checkout_completed(stripe_svc):
 
 
 @pytest.mark.asyncio
-async def test_webhook_subscription_deleted(stripe_svc):
+async def test_process_subscription_deleted(stripe_svc):
     """Subscription deleted webhook is handled."""
     mock_event = {
         "type": "customer.subscription.deleted",
         "data": {"object": {"customer": "cus_abc"}}
     }
 
-    with patch("stripe.Webhook.construct_event", return_value=mock_event):
-        result = await stripe_svc.handle_webhook(b"payload", "sig")
+    result = await stripe_svc.process_event(mock_event)
 
     assert result["handled"] is True
     assert result["action"] == "downgrade_to_free"
 
 
 @pytest.mark.asyncio
-async def test_webhook_subscription_updated_active(stripe_svc):
+async def test_process_subscription_updated_active(stripe_svc):
     """Subscription updated to active."""
     mock_event = {
         "type": "customer.subscription.updated",
         "data": {"object": {"customer": "cus_abc", "status": "active"}}
     }
 
-    with patch("stripe.Webhook.construct_event", return_value=mock_event):
-        result = await stripe_svc.handle_webhook(b"payload", "sig")
+    result = await stripe_svc.process_event(mock_event)
 
     assert result["handled"] is True
     assert result["action"] == "subscription_active"
 
 
 @pytest.mark.asyncio
-async def test_webhook_payment_failed(stripe_svc):
+async def test_process_payment_failed(stripe_svc):
     """Payment failed webhook."""
     mock_event = {
         "type": "invoice.payment_failed",
         "data": {"object": {"customer": "cus_abc"}}
     }
 
-    with patch("stripe.Webhook.construct_event", return_value=mock_event):
-        result = await stripe_svc.handle_webhook(b"payload", "sig")
+    result = await stripe_svc.process_event(mock_event)
 
     assert result["handled"] is True
     assert result["action"] == "payment_failed"
@@ -154,15 +158,14 @@ async def test_webhook_no_secret():
 
 
 @pytest.mark.asyncio
-async def test_webhook_unhandled_event(stripe_svc):
+async def test_process_unhandled_event(stripe_svc):
     """Unknown event type returns handled=False."""
     mock_event = {
         "type": "some.unknown.event",
         "data": {"object": {}}
     }
 
-    with patch("stripe.Webhook.construct_event", return_value=mock_event):
-        result = await stripe_svc.handle_webhook(b"payload", "sig")
+    result = await stripe_svc.process_event(mock_event)
 
     assert result["handled"] is False
 
@@ -215,3 +218,116 @@ async def test_create_checkout_session(stripe_svc):
 
     assert result["session_id"] == "cs_123"
     assert "url" in result
+
+
+def _pro_catalog(price_id="price_123"):
+    mock_product = MagicMock()
+    mock_product.id = "prod_123"
+    mock_product.name = "FK94 Pro"
+    mock_price = MagicMock()
+    mock_price.id = price_id
+    mock_price.unit_amount = 1000
+    mock_price.currency = "usd"
+    return MagicMock(data=[mock_product]), MagicMock(data=[mock_price])
+
+
+@pytest.mark.asyncio
+async def test_product_resolved_once_and_cached(stripe_svc):
+    """Concurrent checkouts share a single Product.list / Price.list lookup."""
+    products, prices = _pro_catalog()
+    mock_session = MagicMock(id="cs_1", url="https://checkout.stripe.com/cs_1")
+
+    with patch("stripe.Product.list", return_value=products) as product_list, \
+            patch("stripe.Price.list", return_value=prices) as price_list, \
+            patch("stripe.checkout.Session.create", return_value=mock_session) as create:
+        results = await asyncio.gather(*[
+            stripe_svc.create_checkout_session(f"u{i}@test.com", f"u{i}", "http://ok", "http://cancel")
+            for i in range(5)
+        ])
+
+    assert all(r["session_id"] == "cs_1" for r in results)
+    assert product_list.call_count == 1
+    assert price_list.call_count == 1
+    assert create.call_count == 5
+    assert create.call_args.kwargs["line_items"][0]["price"] == "price_123"
+
+
+@pytest.mark.asyncio
+async def test_sdk_calls_do_not_block_the_event_loop(stripe_svc):
+    """A slow Stripe round-trip runs in a worker thread, so other tasks keep going."""
+    def slow_list(**kwargs):
+        time.sleep(0.2)
+        return MagicMock(data=[])
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    with patch("stripe.Subscription.list", side_effect=slow_list):
+        await asyncio.gather(stripe_svc.get_customer_subscription("cus_abc"), ticker())
+
+    assert ticks == 10
+
+
+@pytest.mark.asyncio
+async def test_archived_price_is_re_resolved(stripe_svc):
+    """A checkout failing on a stale cached price invalidates the cache and retries once."""
+    old_products, old_prices = _pro_catalog("price_old")
+    new_products, new_prices = _pro_catalog("price_new")
+    mock_session = MagicMock(id="cs_2", url="https://checkout.stripe.com/cs_2")
+
+    with patch("stripe.Product.list", return_value=old_products), \
+            patch("stripe.Price.list", return_value=old_prices):
+        await stripe_svc.get_or_create_product()
+
+    stale = stripe.error.InvalidRequestError("No such price: price_old", "line_items")
+    with patch("stripe.Product.list", return_value=new_products), \
+            patch("stripe.Price.list", return_value=new_prices), \
+            patch("stripe.checkout.Session.create", side_effect=[stale, mock_session]) as create:
+        result = await stripe_svc.create_checkout_session("a@b.com", "u1", "http://ok", "http://cancel")
+
+    assert result["session_id"] == "cs_2"
+    assert create.call_args.kwargs["line_items"][0]["price"] == "price_new"
+
+
+@pytest.mark.asyncio
+async def test_webhook_price_event_invalidates_cache(stripe_svc):
+    products, prices = _pro_catalog()
+    with patch("stripe.Product.list", return_value=products), patch("stripe.Price.list", return_value=prices):
+        await stripe_svc.get_or_create_product()
+
+    mock_event = {"id": "evt_price", "type": "price.updated", "data": {"object": {"id": "price_123"}}}
+    result = await stripe_svc.process_event(mock_event)
+
+    assert result["action"] == "product_cache_invalidated"
+    assert stripe_svc._product is None
+
+
+@pytest.mark.asyncio
+async def test_checkout_product_lookup_error_returns_error(stripe_svc):
+    """A failing product/price lookup is reported, not retried or raised."""
+    failure = stripe.error.InvalidRequestError("Invalid API request", "product")
+    with patch("stripe.Product.list", side_effect=failure), \
+            patch("stripe.checkout.Session.create") as create:
+        result = await stripe_svc.create_checkout_session("a@b.com", "u1", "http://ok", "http://cancel")
+
+    assert result == {"error": "Invalid API request"}
+    create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_checkout_with_fresh_price_is_not_retried(stripe_svc):
+    products, prices = _pro_catalog()
+    failure = stripe.error.InvalidRequestError("Invalid email", "customer_email")
+    with patch("stripe.Product.list", return_value=products) as product_list, \
+            patch("stripe.Price.list", return_value=prices), \
+            patch("stripe.checkout.Session.create", side_effect=failure) as create:
+        result = await stripe_svc.create_checkout_session("bad", "u1", "http://ok", "http://cancel")
+
+    assert result == {"error": "Invalid email"}
+    assert create.call_count == 1
+    assert product_list.call_count == 1
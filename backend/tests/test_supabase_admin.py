@@ -0,0 +1,128 @@
+"""
+FK94 Security Platform - Supabase Admin Service Tests
+PostgREST is replaced with an httpx.MockTransport on the pooled client.
+"""
+import json
+import uuid
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import event_store
+from app.services.supabase_admin_service import SupabaseAdminService
+
+
+def _service(handler) -> SupabaseAdminService:
+    svc = SupabaseAdminService()
+    svc.base_url = "https://project.supabase.co"
+    svc.service_key = "service-key"
+    svc.is_configured = True
+    svc._client = httpx.AsyncClient(
+        base_url=svc.base_url, headers=svc._headers(), transport=httpx.MockTransport(handler)
+    )
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_groups_profiles_into_in_filters():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    updates = [{"user_id": f"u{i}", "plan": "pro", "audits_remaining": 999999} for i in range(5)]
+    updates += [{"user_id": "u9", "plan": "free", "audits_remaining": 5}]
+    svc = _service(handler)
+    with patch.object(settings, "SUPABASE_BATCH_SIZE", 3):
+        summary = await svc.bulk_update_profiles(updates)
+    await svc.close()
+
+    assert summary == {"updated": 6, "failed": 0, "requests": 3}
+    filters = [r.url.params["id"] for r in requests]
+    assert filters == ["in.(u0,u1,u2)", "in.(u3,u4)", "in.(u9)"]
+    assert json.loads(requests[-1].content) == {"plan": "free", "audits_remaining": 5}
+    assert requests[0].headers["apikey"] == "service-key"
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_with_jitter():
+    statuses = iter([503, 429, 204])
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    svc = _service(lambda request: httpx.Response(next(statuses)))
+    with patch("app.services.supabase_admin_service.asyncio.sleep", new=fake_sleep), \
+            patch.object(settings, "SUPABASE_RETRY_BASE_SECONDS", 1.0):
+        updated = await svc.update_profile_plan(user_id="u1", plan="pro")
+    await svc.close()
+
+    assert updated is True
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 1.0 and 0 <= sleeps[1] <= 2.0
+
+
+@pytest.mark.asyncio
+async def test_usage_sync_batches_events_and_resumes_from_cursor(tmp_path):
+    db_path = str(tmp_path / "events.sqlite3")
+    event_store.init_db(db_path)
+    user_id = str(uuid.uuid4())
+    for i in range(5):
+        event_store.track_event(db_path, "scan_completed", {"ip": "10.0.0.1"}, user_id=user_id)
+    event_store.track_event(db_path, "scan_completed", {}, user_id="not-a-uuid")
+    event_store.track_event(db_path, "page_view", {})  # anonymous: not usage
+
+    inserted = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        inserted.append(json.loads(request.content))
+        return httpx.Response(201)
+
+    svc = _service(handler)
+    with patch.object(settings, "SUPABASE_BATCH_SIZE", 2):
+        first = await svc.sync_usage(db_path, max_batches=1)
+        rest = await svc.sync_usage(db_path)
+        again = await svc.sync_usage(db_path)
+    await svc.close()
+
+    assert first == {"synced": 2, "skipped": 0, "requests": 1, "complete": False}
+    assert rest["synced"] == 3 and rest["skipped"] == 1 and rest["complete"] is True
+    assert again["synced"] == 0
+    rows = [row for batch in inserted for row in batch]
+    assert len(rows) == 5
+    assert len({row["id"] for row in rows}) == 5
+    assert rows[0] == {
+        "id": rows[0]["id"], "user_id": user_id, "endpoint": "scan_completed", "ip_address": "10.0.0.1",
+        "created_at": rows[0]["created_at"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_api_usage_insert_is_idempotent_across_retries():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(201)
+
+    async def fake_sleep(delay):
+        pass
+
+    rows = [{"id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "endpoint": "scan", "ip_address": None,
+             "created_at": "2026-01-01T00:00:00+00:00"}]
+    svc = _service(handler)
+    with patch("app.services.supabase_admin_service.asyncio.sleep", new=fake_sleep):
+        assert await svc.insert_api_usage(rows) is True
+    await svc.close()
+
+    assert len(requests) == 2
+    assert requests[0].content == requests[1].content
+    for request in requests:
+        assert request.url.params["on_conflict"] == "id"
+        assert "resolution=ignore-duplicates" in request.headers["prefer"]
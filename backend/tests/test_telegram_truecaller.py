@@ -0,0 +1,159 @@
+"""
+FK94 Security Platform - Telegram Truecaller Tests
+A fake Telethon client answers through the service's NewMessage handler.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.telegram_truecaller_service import TelegramTruecallerService
+
+
+class FakeBotClient:
+    """Replies "Name: <name>" for each number after `delay` seconds (None: never)."""
+
+    def __init__(self, service, names: dict, delay=0.05, quote=False):
+        self.service = service
+        self.names = names
+        self.delay = delay
+        self.quote = quote
+        self.sent = []
+        self._next_id = 100
+
+    def is_connected(self):
+        return True
+
+    async def send_message(self, entity, text):
+        self._next_id += 1
+        message_id = self._next_id
+        self.sent.append(text)
+        if self.delay is not None:
+            asyncio.get_running_loop().call_later(self.delay, self._reply, message_id, text)
+        return SimpleNamespace(id=message_id)
+
+    def _reply(self, message_id, text):
+        self._next_id += 1
+        message = SimpleNamespace(
+            id=self._next_id,
+            text=f"Name: {self.names[text]}\nCarrier: Personal",
+            reply_to_msg_id=message_id if self.quote else None,
+        )
+        asyncio.ensure_future(self.service._on_bot_message(SimpleNamespace(message=message)))
+
+
+def _service(**client_kwargs) -> tuple[TelegramTruecallerService, FakeBotClient]:
+    svc = TelegramTruecallerService()
+    svc.is_configured = True
+    client = FakeBotClient(svc, **client_kwargs)
+    svc._client = client
+    svc._bot = "Truecaller_bot"
+    return svc, client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_get_their_own_replies():
+    names = {"+5491100000001": "Ana", "+5491100000002": "Bruno", "+5491100000003": "Carla"}
+    svc, client = _service(names=names)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(svc.lookup(phone) for phone in names))
+    elapsed = time.perf_counter() - start
+
+    assert [r.name for r in results] == ["Ana", "Bruno", "Carla"]
+    assert client.sent == list(names)
+    assert elapsed < 1.0  # resolved on reply, not after a fixed sleep
+
+
+@pytest.mark.asyncio
+async def test_same_number_shares_one_round_trip():
+    svc, client = _service(names={"+5491100000001": "Ana"}, quote=True)
+
+    first, second = await asyncio.gather(svc.lookup("+5491100000001"), svc.lookup("+54 9 11 0000-0001"))
+
+    assert first.name == second.name == "Ana"
+    assert client.sent == ["+5491100000001"]
+
+
+@pytest.mark.asyncio
+async def test_lookup_times_out_and_ignores_late_reply():
+    names = {"+5491100000001": "Ana", "+5491100000002": "Bruno"}
+    svc, client = _service(names=names, delay=None, quote=True)
+
+    with patch.object(settings, "TELEGRAM_LOOKUP_TIMEOUT_SECONDS", 0.05):
+        timed_out = await svc.lookup("+5491100000001")
+    assert timed_out.error == "No response from bot"
+
+    # The bot's late answer to the first number must not resolve the second lookup
+    client.delay = 0.05
+    lookup = asyncio.create_task(svc.lookup("+5491100000002"))
+    await asyncio.sleep(0.01)
+    client._reply(101, "+5491100000001")
+    result = await lookup
+    assert result.name == "Bruno"
+
+
+class FakeTelethonClient:
+    """Stands in for telethon.TelegramClient; the first instance's health check fails."""
+    instances = []
+
+    def __init__(self, session, api_id, api_hash):
+        self.connected = False
+        self.handlers = []
+        self.healthy = bool(FakeTelethonClient.instances)
+        FakeTelethonClient.instances.append(self)
+
+    async def connect(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def is_user_authorized(self):
+        return True
+
+    async def get_input_entity(self, username):
+        return username
+
+    def add_event_handler(self, callback, event):
+        self.handlers.append(callback)
+
+    def remove_event_handler(self, callback):
+        self.handlers.remove(callback)
+
+    async def get_me(self):
+        if not self.healthy:
+            raise ConnectionError("connection reset")
+        return SimpleNamespace(id=1)
+
+    async def disconnect(self):
+        self.connected = False
+
+
+@pytest.mark.asyncio
+async def test_supervisor_connects_at_start_and_reconnects_after_failed_health_check():
+    FakeTelethonClient.instances = []
+    svc = TelegramTruecallerService()
+    svc.is_configured = True
+    svc.session = "session"
+
+    with patch("app.services.telegram_truecaller_service.TelegramClient", FakeTelethonClient), \
+            patch("app.services.telegram_truecaller_service.StringSession"), \
+            patch.object(settings, "TELEGRAM_HEALTH_INTERVAL_SECONDS", 0.02):
+        await svc.start()
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if svc.health()["connected"]:
+                break
+        health = svc.health()
+        await svc.close()
+
+    first, second = FakeTelethonClient.instances[:2]
+    assert health["connected"] is True and health["supervised"] is True
+    assert health["failures"] == 1
+    assert first.connected is False and first.handlers == []
+    assert second.connected is False  # closed on shutdown
+    assert svc.health() == {**health, "connected": False, "supervised": False}
@@ -0,0 +1,72 @@
+"""
+FK94 Security Platform - Tracing Tests
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.core import tracing
+from app.core.config import settings
+from app.models.schemas import AuditType, FullAuditRequest, MultiAuditRequest
+from app.services.audit_runner import run_full_audit, run_multi_audit
+from benchmarks.upstreams import StubUpstreams, install, parse_profiles
+
+ZERO = parse_profiles(["all=0"])
+
+
+@pytest.mark.asyncio
+async def test_full_audit_timings_cover_provider_calls():
+    with install(StubUpstreams(ZERO)), patch.object(settings, "AI_CACHE_ENABLED", False):
+        plain = await run_full_audit(FullAuditRequest(email="ana@example.com"))
+        result = await run_full_audit(FullAuditRequest(email="ana@example.com", include_timings=True))
+
+    assert plain.timings is None
+    spans = {s.name: s for s in result.timings.spans}
+    assert {"osint.hibp", "osint.dehashed", "osint.full", "osint.rdap", "multi.username",
+            "scoring", "ai.analyze_audit", "ai.provider"} <= set(spans)
+    assert spans["osint.rdap"].parent == "osint.full"
+    assert spans["multi.username"].parent == "osint.full"
+    assert spans["ai.provider"].parent == "ai.analyze_audit"
+    assert spans["ai.provider"].attributes["provider"] == "Moonshot"
+    assert spans["ai.analyze_audit"].attributes["cache"] == "disabled"
+    assert all(s.duration_ms is not None for s in result.timings.spans)
+    assert result.timings.total_ms >= spans["osint.full"].duration_ms
+
+
+@pytest.mark.asyncio
+async def test_wallet_timings_report_cache_hits():
+    with install(StubUpstreams(ZERO, history_size=20)), patch.object(settings, "AI_CACHE_ENABLED", False):
+        request = MultiAuditRequest(audit_type=AuditType.WALLET, value="0x" + "cd" * 20, include_timings=True)
+        first = await run_multi_audit(request)
+        second = await run_multi_audit(request)
+
+    names = [s.name for s in first.timings.spans]
+    assert {"multi.wallet", "wallet.ofac", "wallet.ofac_oracle", "chain.fetch", "chain.classify"} <= set(names)
+    assert first.timings.cache_hits == []
+    assert second.timings.cache_hits == ["wallet.ofac"]
+
+
+async def _gathered_stage():
+    with tracing.span("gathered"):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_spans_record_errors_and_are_noops_outside_a_trace():
+    @tracing.traced("failing")
+    async def failing():
+        raise ValueError("boom")
+
+    with tracing.span("outside") as span:
+        assert span is tracing._NOOP
+
+    with tracing.collect() as trace:
+        with pytest.raises(ValueError):
+            await failing()
+        await asyncio.gather(_gathered_stage(), _gathered_stage())
+
+    timings = trace.timings()
+    assert timings["spans"][0]["error"] == "ValueError"
+    assert [s["parent"] for s in timings["spans"][1:]] == [None, None]
+
@@ -0,0 +1,39 @@
+"""
+FK94 Security Platform - Truecaller Parser Tests
+Expected values in fixtures/truecaller_responses.json were recorded from the
+per-field regex parsers this module replaced.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from app.services.telegram_truecaller_service import telegram_truecaller_service
+from app.services.truecaller_parser import parse_api_response, parse_bot_text
+from app.services.truecaller_service import truecaller_service
+
+FIXTURES = json.loads((Path(__file__).parent / "fixtures" / "truecaller_responses.json").read_text())
+
+
+@pytest.mark.parametrize("case", FIXTURES["bot"], ids=lambda c: c["id"])
+def test_bot_text_matches_recorded_result(case):
+    result = telegram_truecaller_service._parse_bot_response(case["text"], "+5491155551234")
+    assert result.model_dump(include=set(case["expected"])) == case["expected"]
+
+
+@pytest.mark.parametrize("case", FIXTURES["api"], ids=lambda c: c["id"])
+def test_api_response_matches_recorded_result(case):
+    result = truecaller_service._parse_response(case["data"], "+5491155551234")
+    assert result.model_dump(exclude={"error"}) == case["expected"]
+
+
+def test_bot_value_keywords_still_tag():
+    parsed = parse_bot_text("Name: Spam Likely Business\nCarrier: Claro")
+    assert parsed["name"] == "Spam Likely Business"
+    assert parsed["tags"] == ["spam", "business"]
+    assert parsed["spam_score"] == 5
+
+
+def test_not_found_short_circuits():
+    assert parse_bot_text("Name: x\nNo results") == {"found": False}
+    assert parse_api_response({"data": None}) == {"found": False}
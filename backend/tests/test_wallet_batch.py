@@ -0,0 +1,133 @@
+"""
+FK94 Security Platform - Batch Wallet Screening Tests
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.models.schemas import RiskLevel, WalletBatchRequest, WalletResult
+from app.services import wallet_batch, wallet_deep_scan
+from app.services.wallet_batch import dedupe_addresses, run_wallet_batch
+
+ADDR_A = "0xaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+ADDR_B = "0xbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb"
+ADDR_C = "0xcccccccccccccccccccccccccccccccccccccccc"
+
+
+def _wallet_result(address, risk=RiskLevel.LOW, sanctioned=False):
+    return WalletResult(
+        address=address, chain="ethereum", risk_level=risk,
+        ofac_sanctioned=sanctioned, sanctions_check=sanctioned,
+    )
+
+
+def test_dedupe_addresses_is_case_insensitive_for_evm():
+    assert dedupe_addresses([ADDR_A, ADDR_A.upper().replace("0X", "0x"), ADDR_B, ADDR_A]) == [ADDR_A, ADDR_B]
+
+
+@pytest.mark.asyncio
+async def test_run_wallet_batch_respects_concurrency_and_orders_results():
+    in_flight = 0
+    peak = 0
+
+    async def fake_check(address, chain, chains):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if address == ADDR_C:
+            raise RuntimeError("upstream down")
+        return _wallet_result(address, RiskLevel.CRITICAL if address == ADDR_B else RiskLevel.LOW, address == ADDR_B)
+
+    addresses = [f"0x{i:040x}" for i in range(20)] + [ADDR_B, ADDR_C, ADDR_B]
+    with patch.object(wallet_batch, "check_wallet", new=fake_check), \
+            patch.object(wallet_batch, "_scan_slots", asyncio.Semaphore(4)):
+        result = await run_wallet_batch(WalletBatchRequest(addresses=addresses))
+
+    assert peak == 4
+    assert [item["address"] for item in result["items"]] == addresses[:-1]
+    assert result["summary"] == {
+        "requested": 23, "unique": 22, "screened": 21, "failed": 1, "sanctioned": 1, "high_risk": 1,
+    }
+    assert result["items"][-1]["error"] == "upstream down"
+
+
+@pytest.mark.asyncio
+async def test_check_ofac_eth_shares_concurrent_and_repeated_lookups():
+    calls = 0
+
+    async def fake_get(url, params=None, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"result": "0x" + "0" * 63 + "1"}
+        return response
+
+    wallet_deep_scan._ofac_cache.clear()
+    with patch("httpx.AsyncClient.get", new=AsyncMock(side_effect=fake_get)):
+        first = await asyncio.gather(*(wallet_deep_scan.check_ofac_eth(ADDR_A) for _ in range(5)))
+        again = await wallet_deep_scan.check_ofac_eth(ADDR_A.upper().replace("0X", "0x"))
+
+    assert first == [True] * 5
+    assert again is True
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_streams_ndjson():
+    async def fake_check(address, chain, chains):
+        return _wallet_result(address)
+
+    transport = httpx.ASGITransport(app=app)
+    with patch.object(wallet_batch, "check_wallet", new=fake_check), \
+            patch.object(settings, "ADMIN_API_KEY", "s3cret"):
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            response = await client.post(
+                "/api/v1/check/wallet/batch", json={"addresses": [ADDR_A, ADDR_B, ADDR_A]},
+                headers={"X-Admin-Key": "s3cret"},
+            )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["address"] for line in lines) == [ADDR_A, ADDR_B]
+    assert all(line["result"]["risk_level"] == "low" for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_rejects_invalid_address():
+    transport = httpx.ASGITransport(app=app)
+    with patch.object(settings, "ADMIN_API_KEY", "s3cret"):
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            response = await client.post(
+                "/api/v1/check/wallet/batch", json={"addresses": ["nope"]}, headers={"X-Admin-Key": "s3cret"}
+            )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_needs_key_and_caps_synchronous_size():
+    many = [f"0x{i:040x}" for i in range(1, 27)]
+    check = AsyncMock()
+    transport = httpx.ASGITransport(app=app)
+    with patch.object(wallet_batch, "check_wallet", new=check), \
+            patch.object(settings, "ADMIN_API_KEY", "s3cret"), \
+            patch.object(settings, "WALLET_BATCH_SYNC_MAX", 25):
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            anonymous = await client.post("/api/v1/check/wallet/batch", json={"addresses": [ADDR_A]})
+            too_many = await client.post(
+                "/api/v1/check/wallet/batch", json={"addresses": many}, headers={"X-Admin-Key": "s3cret"}
+            )
+
+    assert anonymous.status_code == 401
+    assert too_many.status_code == 422
+    assert "/automation/wallet/batch" in too_many.json()["detail"]
+    check.assert_not_called()
@@ -0,0 +1,324 @@
+"""
+FK94 Security Platform - Wallet Deep Scan Tests
+Tests transaction decoding and exchange/mixer classification.
+"""
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.wallet_deep_scan import (
+    BTC_PAGE_SIZE,
+    _decode_blockscout_internal,
+    _decode_blockscout_token_transfers,
+    _decode_blockscout_txs,
+    _decode_etherscan_txs,
+    classify_eth_columns,
+    cluster_btc_inputs,
+    deep_scan_btc,
+    deep_scan_eth,
+    merge_eth_columns,
+)
+
+WALLET = "0x1111111111111111111111111111111111111111"
+BINANCE = "0x28c6c06298d514db089934071355e5743bf21d60"
+COINBASE = "0x71660c4005ba85c37ccec55d0c4493e66fe775d3"
+TORNADO_1_ETH = "0x47ce0c6ed5b0ce3d3a51fdb1c52dc66a7c3c2936"
+RANDOM = "0x2222222222222222222222222222222222222222"
+USDT_CONTRACT = "0xdac17f958d2ee523a2206206994597c13d831ec7"
+
+
+def _blockscout_tx(tx_hash, sender, recipient, value, timestamp):
+    return {
+        "hash": tx_hash,
+        "from": {"hash": sender},
+        "to": {"hash": recipient},
+        "value": str(value),
+        "timestamp": timestamp,
+    }
+
+
+def _etherscan_tx(tx_hash, sender, recipient, value, timestamp):
+    return {
+        "hash": tx_hash,
+        "from": sender,
+        "to": recipient,
+        "value": str(value),
+        "timeStamp": str(timestamp),
+    }
+
+
+# === Decoding ===
+
+def test_decode_blockscout_handles_missing_fields():
+    cols = _decode_blockscout_txs([
+        {"hash": "0xabc", "from": None, "to": None, "value": "bad", "timestamp": None},
+    ])
+    assert cols.senders == [""]
+    assert cols.recipients == [""]
+    assert cols.values == [0]
+    assert cols.timestamps == [""]
+
+
+def test_decode_etherscan_lowercases_addresses():
+    cols = _decode_etherscan_txs([
+        _etherscan_tx("0xabc", WALLET.upper().replace("0X", "0x"), BINANCE, 10**18, 1700000000),
+    ])
+    assert cols.senders == [WALLET]
+    assert cols.values == [10**18]
+    assert cols.timestamps == [1700000000]
+
+
+# === Classification ===
+
+def test_classify_detects_exchanges_and_mixers():
+    cols = _decode_blockscout_txs([
+        _blockscout_tx("0x01", WALLET, BINANCE, 2 * 10**18, "2023-06-01T10:00:00.000000Z"),
+        _blockscout_tx("0x02", COINBASE, WALLET, 5 * 10**17, "2022-01-15T08:30:00.000000Z"),
+        _blockscout_tx("0x03", WALLET, TORNADO_1_ETH, 10**18, "2023-07-01T00:00:00.000000Z"),
+        _blockscout_tx("0x04", RANDOM, WALLET, 1, "2021-03-03T03:03:00.000000Z"),
+        _blockscout_tx("0x05", WALLET, BINANCE, 10**18, "2023-08-01T00:00:00.000000Z"),
+    ])
+
+    result = classify_eth_columns(cols, WALLET)
+
+    assert result["tx_count"] == 5
+    assert result["exchanges_detected"] == ["Binance", "Coinbase"]
+    assert [i.tx_hash for i in result["exchange_interactions"]] == ["0x01", "0x02", "0x05"]
+    assert result["exchange_interactions"][0].direction == "sent"
+    assert result["exchange_interactions"][0].value == "2.000000 ETH"
+    assert result["exchange_interactions"][1].direction == "received"
+    assert result["exchange_interactions"][1].timestamp == "2022-01-15 08:30"
+    assert result["exchange_volume"] == {"Binance": {"ETH": 3.0}, "Coinbase": {"ETH": 0.5}}
+    assert result["used_mixer"] is True
+    assert result["mixer_interactions"][0].startswith("sent via Tornado Cash 1 ETH")
+    assert result["counterparties"] == 4
+    assert result["first_tx_date"] == "2021-03-03 03:03"
+    assert result["last_tx_date"] == "2023-08-01 00:00"
+
+
+def test_classify_empty_history():
+    result = classify_eth_columns(_decode_etherscan_txs([]), WALLET)
+    assert result["tx_count"] == 0
+    assert result["exchange_interactions"] == []
+    assert result["used_mixer"] is False
+    assert result["first_tx_date"] is None
+
+
+def test_classify_large_history_only_builds_matched_interactions():
+    raw = [
+        _etherscan_tx(f"0x{i:064x}", WALLET, f"0x{i:040x}", i, 1600000000 + i)
+        for i in range(20_000)
+    ]
+    raw[12_345] = _etherscan_tx("0xhit", WALLET, BINANCE, 10**18, 1600012345)
+    cols = _decode_etherscan_txs(raw)
+
+    start = time.perf_counter()
+    result = classify_eth_columns(cols, WALLET)
+    elapsed = time.perf_counter() - start
+
+    assert len(result["exchange_interactions"]) == 1
+    assert result["exchange_interactions"][0].tx_hash == "0xhit"
+    assert result["counterparties"] == 20_000
+    # Generous bound: bulk classification of 20k rows should be far below this.
+    assert elapsed < 1.0
+
+
+# === Token transfers and internal transactions ===
+
+USDT = {"symbol": "USDT", "decimals": "6", "type": "ERC-20"}
+
+
+def _token_transfer(tx_hash, log_index, sender, recipient, value):
+    return {
+        "transaction_hash": tx_hash,
+        "log_index": log_index,
+        "from": {"hash": sender},
+        "to": {"hash": recipient},
+        "token": USDT,
+        "total": {"value": str(value), "decimals": "6"},
+        "timestamp": "2024-02-01T12:00:00.000000Z",
+    }
+
+
+def test_merge_deduplicates_by_hash_and_log_index():
+    transfers = [
+        _token_transfer("0xaa", 1, WALLET, BINANCE, 250_000_000),
+        _token_transfer("0xaa", 2, WALLET, RANDOM, 1_000_000),
+    ]
+    merged = merge_eth_columns([
+        _decode_blockscout_txs([_blockscout_tx("0xaa", WALLET, USDT_CONTRACT, 0, "2024-02-01T12:00:00Z")]),
+        _decode_blockscout_token_transfers(transfers),
+        # Overlapping page returned again by the API
+        _decode_blockscout_token_transfers(transfers[:1]),
+    ], WALLET)
+
+    assert list(zip(merged.hashes, merged.log_indexes)) == [("0xaa", ""), ("0xaa", "log:1"), ("0xaa", "log:2")]
+
+
+def test_merge_drops_rows_not_involving_address():
+    internal = [{
+        "transaction_hash": "0xbb", "index": 3, "value": "5",
+        "from": {"hash": RANDOM}, "to": {"hash": BINANCE},
+        "timestamp": "2024-02-01T12:00:00Z",
+    }]
+    merged = merge_eth_columns([_decode_blockscout_internal(internal)], WALLET)
+    assert merged.hashes == []
+
+
+def test_classify_merged_stream_detects_stablecoin_and_internal_mixer_flows():
+    internal = [{
+        "transaction_hash": "0xcc", "index": 0, "value": str(10**18),
+        "from": {"hash": TORNADO_1_ETH}, "to": {"hash": WALLET},
+        "timestamp": "2024-03-01T00:00:00Z",
+    }]
+    cols = merge_eth_columns([
+        _decode_blockscout_txs([_blockscout_tx("0xaa", WALLET, BINANCE, 10**18, "2024-01-01T00:00:00Z")]),
+        _decode_blockscout_token_transfers([_token_transfer("0xbb", 7, WALLET, BINANCE, 250_000_000)]),
+        _decode_blockscout_internal(internal),
+    ], WALLET)
+
+    result = classify_eth_columns(cols, WALLET)
+
+    assert result["tx_count"] == 3
+    assert [i.value for i in result["exchange_interactions"]] == ["1.000000 ETH", "250.000000 USDT"]
+    assert result["exchange_volume"] == {"Binance": {"ETH": 1.0, "USDT": 250.0}}
+    assert result["used_mixer"] is True
+    assert result["mixer_interactions"][0].startswith("received via Tornado Cash 1 ETH")
+
+
+def test_token_transfer_without_decimals_is_left_out_of_volume():
+    garbled = {**_token_transfer("0xbc", 8, BINANCE, WALLET, 10**18), "total": {"value": str(10**18)}}
+    cols = merge_eth_columns([
+        _decode_blockscout_token_transfers([_token_transfer("0xbb", 7, WALLET, BINANCE, 250_000_000), garbled]),
+    ], WALLET)
+
+    result = classify_eth_columns(cols, WALLET)
+
+    assert cols.decimals == [6, None]
+    assert [i.value for i in result["exchange_interactions"]] == ["250.000000 USDT", None]
+    assert result["exchange_volume"] == {"Binance": {"USDT": 250.0}}
+
+
+@pytest.mark.asyncio
+async def test_deep_scan_eth_fetches_all_streams():
+    listings = {
+        "transactions": [_blockscout_tx("0xaa", WALLET, RANDOM, 1, "2024-01-01T00:00:00Z")],
+        "token-transfers": [_token_transfer("0xbb", 7, WALLET, BINANCE, 100_000_000)],
+        "internal-transactions": [],
+    }
+
+    async def fake_get(url, params=None, **kwargs):
+        response = MagicMock()
+        response.status_code = 200
+        listing = url.rsplit("/", 1)[-1]
+        if listing in listings:
+            response.json.return_value = {"items": listings[listing], "next_page_params": None}
+        else:
+            response.json.return_value = {"coin_balance": str(2 * 10**18)}
+        return response
+
+    with patch("httpx.AsyncClient.get", new=AsyncMock(side_effect=fake_get)):
+        result = await deep_scan_eth(WALLET)
+
+    assert result["balance"] == "2.000000 ETH"
+    assert result["tx_count"] == 2
+    assert result["exchanges_detected"] == ["Binance"]
+    assert result["exchange_interactions"][0].value == "100.000000 USDT"
+    assert result["warnings"] == []
+
+
+# === BTC clustering ===
+
+BTC_TARGET = "1TargetAddrxxxxxxxxxxxxxxxxxxxxxx"
+BTC_BINANCE = "34xp4vRoCGJym3xR7yCVPFHoCNxv4Twseo"
+
+
+def _btc_tx(tx_hash, inputs, outputs, time_=1700000000):
+    return {
+        "hash": tx_hash,
+        "time": time_,
+        "inputs": [{"prev_out": {"addr": a, "value": 1000}} for a in inputs],
+        "out": [{"addr": a, "value": v} for a, v in outputs],
+    }
+
+
+def test_cluster_btc_inputs_merges_co_spent_addresses():
+    clusters = cluster_btc_inputs([
+        _btc_tx("t1", ["A", "B"], [("X", 1)]),
+        _btc_tx("t2", ["B", "C"], [("Y", 1)]),
+        _btc_tx("t3", ["D"], [("Z", 1)]),
+    ])
+    assert clusters.find("A") == clusters.find("C")
+    assert clusters.find("D") != clusters.find("A")
+    assert sorted(clusters.members("A")) == ["A", "B", "C"]
+
+
+def test_cluster_btc_inputs_skips_coinjoins():
+    clusters = cluster_btc_inputs([
+        _btc_tx("cj", ["A", "B", "C", "D", "E"], [("V", 100), ("W", 100), ("X", 100)]),
+    ])
+    assert "A" not in clusters
+
+
+@pytest.mark.asyncio
+async def test_deep_scan_btc_paginates_and_labels_clusters():
+    """Counterparty co-spent with a labelled exchange address is attributed to it."""
+    hot_wallet = "3UnlabelledExchangeHotWalletxxxxx"
+    pages = {
+        0: {
+            "n_tx": BTC_PAGE_SIZE + 1,
+            "final_balance": 150_000_000,
+            "txs": [_btc_tx(f"p0-{i}", ["1Other"], [(BTC_TARGET, 10)], 1600000000 + i)
+                    for i in range(BTC_PAGE_SIZE)],
+        },
+        BTC_PAGE_SIZE: {
+            "txs": [
+                _btc_tx("p1-0", [hot_wallet, BTC_BINANCE], [(BTC_TARGET, 5_000_000)], 1700000000),
+            ],
+        },
+    }
+
+    async def fake_get(url, params=None, **kwargs):
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = pages[params["offset"]]
+        return response
+
+    with patch("httpx.AsyncClient.get", new=AsyncMock(side_effect=fake_get)):
+        result = await deep_scan_btc(BTC_TARGET)
+
+    assert result["balance"] == "1.50000000 BTC"
+    assert result["tx_count"] == BTC_PAGE_SIZE + 1
+    assert result["exchanges_detected"] == ["Binance"]
+    assert {i.address for i in result["exchange_interactions"]} == {hot_wallet, BTC_BINANCE}
+    assert result["exchange_interactions"][0].value == "0.05000000 BTC"
+    assert result["first_tx_date"] == "2020-09-13 12:26"
+    assert result["last_tx_date"] == "2023-11-14 22:13"
+    assert result["warnings"] == []
+
+
+@pytest.mark.asyncio
+async def test_deep_scan_btc_counts_multi_input_withdrawal_once():
+    """A consolidated exchange withdrawal is one receipt, not one per input."""
+    hot_wallets = [f"3ExchangeInput{i:02d}xxxxxxxxxxxxxxxxx" for i in range(9)]
+    page = {
+        "n_tx": 2,
+        "final_balance": 7_000_000,
+        "txs": [
+            _btc_tx("w1", [BTC_BINANCE, *hot_wallets], [(BTC_TARGET, 5_000_000), ("1Change", 9)]),
+            _btc_tx("w2", [BTC_BINANCE], [(BTC_TARGET, 2_000_000)]),
+        ],
+    }
+
+    async def fake_get(url, params=None, **kwargs):
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = page
+        return response
+
+    with patch("httpx.AsyncClient.get", new=AsyncMock(side_effect=fake_get)):
+        result = await deep_scan_btc(BTC_TARGET)
+
+    assert result["exchange_volume"] == {"Binance": {"BTC": 0.07}}
+    assert len(result["exchange_interactions"]) == 11
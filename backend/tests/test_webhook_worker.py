@@ -0,0 +1,98 @@
+"""
+FK94 Security Platform - Webhook Inbox Tests
+"""
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.services import event_store, webhook_store
+from app.services.stripe_service import stripe_service
+from app.services.webhook_worker import WebhookWorker
+
+CHECKOUT_EVENT = {
+    "id": "evt_checkout_1",
+    "type": "checkout.session.completed",
+    "data": {"object": {"client_reference_id": "user_123", "customer": "cus_abc"}},
+}
+
+
+@pytest.fixture
+def inbox(tmp_path):
+    db_path = str(tmp_path / "webhooks.sqlite3")
+    events_path = str(tmp_path / "events.sqlite3")
+    webhook_store.init_db(db_path)
+    event_store.init_db(events_path)
+    with patch.object(settings, "WEBHOOK_DB_PATH", db_path), patch.object(settings, "EVENT_DB_PATH", events_path):
+        yield db_path
+
+
+@pytest.mark.asyncio
+async def test_webhook_is_stored_acked_and_deduplicated(inbox):
+    transport = httpx.ASGITransport(app=app)
+    with patch("stripe.Webhook.construct_event", return_value=CHECKOUT_EVENT), \
+            patch.object(stripe_service, "process_event", new=AsyncMock()) as process:
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/api/v1/stripe/webhook", content=b"{}", headers={"stripe-signature": "sig"})
+            second = await client.post("/api/v1/stripe/webhook", content=b"{}", headers={"stripe-signature": "sig"})
+
+    assert first.status_code == 200
+    assert first.json()["duplicate"] is False
+    assert second.json()["duplicate"] is True
+    process.assert_not_called()  # acknowledged before any processing
+    stored = webhook_store.get_event(inbox, "evt_checkout_1")
+    assert stored["status"] == "pending"
+    assert stored["payload"]["data"]["object"]["customer"] == "cus_abc"
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_event_and_tracks_billing(inbox):
+    webhook_store.record_event(inbox, "evt_checkout_1", "stripe", CHECKOUT_EVENT["type"], CHECKOUT_EVENT)
+
+    await WebhookWorker(inbox)._process_due_events()
+
+    stored = webhook_store.get_event(inbox, "evt_checkout_1")
+    assert stored["status"] == "processed"
+    assert stored["attempts"] == 1
+    assert stored["result"]["action"] == "upgrade_to_pro"
+    assert event_store.count_events(settings.EVENT_DB_PATH, "checkout_success") == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_event_is_retried_with_backoff_then_parked(inbox):
+    webhook_store.record_event(inbox, "evt_checkout_1", "stripe", CHECKOUT_EVENT["type"], CHECKOUT_EVENT)
+    worker = WebhookWorker(inbox)
+    failing = AsyncMock(side_effect=RuntimeError("Supabase profile update failed"))
+
+    with patch.object(stripe_service, "process_event", new=failing), \
+            patch.object(settings, "WEBHOOK_MAX_ATTEMPTS", 2), \
+            patch.object(settings, "WEBHOOK_RETRY_BASE_SECONDS", 30):
+        await worker._process_due_events()
+        stored = webhook_store.get_event(inbox, "evt_checkout_1")
+        assert stored["status"] == "pending"
+        delay = (datetime.fromisoformat(stored["next_attempt_at"]) - datetime.now(timezone.utc)).total_seconds()
+        assert 20 < delay <= 30
+
+        # Not due yet: nothing to claim
+        await worker._process_due_events()
+        assert failing.call_count == 1
+
+        webhook_store.mark_failed(inbox, "evt_checkout_1", "forced", datetime.now(timezone.utc))
+        await worker._process_due_events()
+
+    stored = webhook_store.get_event(inbox, "evt_checkout_1")
+    assert stored["status"] == "dead"
+    assert stored["attempts"] == 2
+    assert "Supabase" in stored["error"]
+
+
+def test_in_flight_events_are_requeued(inbox):
+    webhook_store.record_event(inbox, "evt_1", "stripe", "invoice.payment_failed", {})
+    assert [e["id"] for e in webhook_store.claim_due_events(inbox)] == ["evt_1"]
+    assert webhook_store.claim_due_events(inbox) == []
+
+    assert webhook_store.requeue_in_flight(inbox) == 1
+    assert webhook_store.count_events_by_status(inbox) == {"pending": 1}
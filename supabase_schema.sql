@@ -36,9 +36,15 @@ CREATE TABLE IF NOT EXISTS public.reports (
   user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE,
   audit_id UUID REFERENCES public.audits(id) ON DELETE CASCADE,
   file_url TEXT,
+  artifact_digest TEXT,  -- SHA-256 of the rendered AuditResult (GET /api/v1/report/pdf/{digest})
+  artifact_size INTEGER,
   created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Existing deployments: reports created before the artifact store
+ALTER TABLE public.reports ADD COLUMN IF NOT EXISTS artifact_digest TEXT;
+ALTER TABLE public.reports ADD COLUMN IF NOT EXISTS artifact_size INTEGER;
+
 -- API usage tracking (for rate limiting)
 CREATE TABLE IF NOT EXISTS public.api_usage (
   id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
@@ -52,6 +58,7 @@ CREATE TABLE IF NOT EXISTS public.api_usage (
 CREATE INDEX IF NOT EXISTS idx_audits_user_id ON public.audits(user_id);
 CREATE INDEX IF NOT EXISTS idx_audits_created_at ON public.audits(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_api_usage_user_created ON public.api_usage(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_artifact_digest ON public.reports(artifact_digest);
 
 -- Row Level Security (RLS)
 ALTER TABLE public.profiles ENABLE ROW LEVEL SECURITY;